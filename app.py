@@ -1,9 +1,24 @@
-import streamlit as st
-import pandas as pd
-import tempfile
+import io
+import logging
 import os
+import streamlit as st
 import time
-from whatsapp_helper import WhatsAppHelper
+from whatsapp_helper import (
+    BACKEND_CDP, BACKEND_SELENIUM, DEFAULT_PROFILE_DIR, STATUS_FAILED, STATUS_NOT_ON_WHATSAPP, STATUS_PENDING, STATUS_SENT
+)
+from attachments import ATTACHMENT_TYPES, Attachment
+from campaign_planner import format_duration
+from campaign_worker import get_campaign_runner
+from message_sender import MessageSender
+from session_pool import get_session_pool
+from upload_cache import get_upload_cache
+from metrics import metrics
+from message_template import MessageTemplate
+from phone_utils import STATUS_DUPLICATE, STATUS_INVALID
+from send_scheduler import RatePolicy
+from whatsapp_selectors import get_selector_registry
+
+logging.basicConfig(level=logging.INFO)
 
 st.set_page_config(
     page_title="WhatsApp Messenger Pro",
@@ -30,20 +45,61 @@ st.markdown("""
     </style>
 """, unsafe_allow_html=True)
 
-def save_uploaded_file(uploaded_file):
-    """Salva o arquivo carregado temporariamente"""
-    with tempfile.NamedTemporaryFile(delete=False, suffix=os.path.splitext(uploaded_file.name)[1]) as tmp:
-        tmp.write(uploaded_file.getvalue())
-        return tmp.name
-
-def process_phone_number(phone):
-    """Processa e valida o número de telefone"""
-    phone = str(phone).replace("+", "").replace(" ", "").replace("-", "").replace("(", "").replace(")", "")
-    if not phone.startswith("55"):
-        phone = "55" + phone
-    if len(phone) not in [12, 13]:  # 55 + DDD + número (8 ou 9 dígitos)
-        raise ValueError(f"Número inválido: {phone}")
-    return phone
+# Mensagens de exemplo exibidas no preview
+PREVIEW_MESSAGES = 3
+
+# Intervalo de atualização do painel de status enquanto um job está ativo (segundos)
+JOB_REFRESH_SECONDS = 1
+
+# st.rerun substituiu st.experimental_rerun no Streamlit 1.27
+_rerun = getattr(st, "rerun", None) or st.experimental_rerun
+
+def render_job_status(area, snapshot):
+    """Exibe o progresso de um job de campanha"""
+    counts = snapshot.get("counts", {})
+    summary = snapshot.get("summary", {})
+    total = snapshot.get("total")
+    processed = snapshot.get("processed", 0)
+    with area.container():
+        st.write(f"**Campanha #{snapshot['job_id']}** ({snapshot['filename']}) — {snapshot['state']}")
+        if total:
+            st.progress(min(processed / total, 1.0))
+        st.caption(snapshot["status_message"])
+        st.markdown(
+            f"- ✅ Enviadas: {counts.get(STATUS_SENT, 0)}\n"
+            f"- ⏳ Pendentes: {counts.get(STATUS_PENDING, 0)}\n"
+            f"- ❌ Falhas: {counts.get(STATUS_FAILED, 0)}\n"
+            f"- 📵 Sem WhatsApp: {counts.get(STATUS_NOT_ON_WHATSAPP, 0)}\n"
+            f"- 📋 Inválidos: {summary.get(STATUS_INVALID, 0)} | Duplicados: {summary.get(STATUS_DUPLICATE, 0)}"
+        )
+        if snapshot.get("report_file"):
+            st.success(f"📄 Relatório: {snapshot['report_file']}")
+
+def render_metrics(area):
+    """Exibe a latência por etapa (ms) e os contadores do caminho de envio"""
+    snapshot = metrics.snapshot()
+    with area.container():
+        if not snapshot["stages"]:
+            st.caption("Nenhuma métrica registrada ainda")
+            return
+        rows = []
+        for stage, summary in sorted(snapshot["stages"].items()):
+            rows.append({
+                "etapa": stage,
+                "n": summary["count"],
+                **{key: round(summary[key] * 1000, 1) for key in ("p50", "p95", "p99")}
+            })
+        st.dataframe(rows, hide_index=True)
+        for counter in snapshot["counters"]:
+            labels = ", ".join(f"{key}={value}" for key, value in counter["labels"].items())
+            st.caption(f"{counter['name']}{f' ({labels})' if labels else ''}: {counter['value']}")
+        registry = get_selector_registry()
+        st.caption(f"Seletores do WhatsApp Web: versão {registry.version}")
+        st.dataframe([
+            {"seletor": name, "buscas": stats["lookups"], "sem resultado": stats["misses"],
+             "ms": round(stats["mean_ms"], 2), "alternativas": ", ".join(f"{k} ({v})" for k, v in stats["hits"].items())}
+            for name, stats in sorted(registry.stats().items())
+        ], hide_index=True)
 
 def main():
     st.title("📱 WhatsApp Messenger Pro")
@@ -57,6 +113,21 @@ def main():
         st.subheader("Modo de Operação")
         headless_mode = st.checkbox("Modo Headless (sem interface)", value=False,
                                 help="Execute o Chrome em segundo plano")
+        keep_session = st.checkbox("Manter sessão do WhatsApp", value=True,
+                                help="Reaproveita o login entre campanhas, sem novo QR code")
+        profile_dir = st.text_input("Perfil do Chrome", value=DEFAULT_PROFILE_DIR,
+                                help="Diretório onde a sessão do WhatsApp Web é salva",
+                                disabled=not keep_session)
+        account_id = st.text_input("Conta / departamento (opcional)", value="",
+                                help="Cada conta usa seu próprio perfil do Chrome, limites e fila; "
+                                     "contas diferentes enviam em paralelo").strip()
+        backend = st.selectbox(
+            "Controle do navegador",
+            options=[BACKEND_SELENIUM, BACKEND_CDP],
+            format_func=lambda value: {BACKEND_SELENIUM: "Selenium (chromedriver)",
+                                       BACKEND_CDP: "DevTools Protocol (mais rápido)"}[value],
+            help="O DevTools Protocol controla o Chrome sem chromedriver; requer o pacote websocket-client"
+        )
         
         # Configurações de tempo
         st.subheader("Temporização")
@@ -75,13 +146,46 @@ def main():
             help="Tempo máximo de espera para carregamento de páginas"
         )
         
+        # Limites de envio
+        st.subheader("Limites de Envio")
+        per_minute = st.number_input("Máximo por minuto (0 = sem limite)", min_value=0, value=0, step=1)
+        per_hour = st.number_input("Máximo por hora (0 = sem limite)", min_value=0, value=0, step=1)
+        use_send_window = st.checkbox("Enviar apenas em horário comercial", value=False,
+                                help="Pausa os envios fora da janela de horário selecionada")
+        window_start, window_end = st.slider(
+            "Janela de envio (horas)",
+            min_value=0,
+            max_value=23,
+            value=(8, 20),
+            disabled=not use_send_window
+        )
+        rate_policy = RatePolicy(
+            interval=delay,
+            per_minute=per_minute or None,
+            per_hour=per_hour or None,
+            quiet_hours=(window_end, window_start) if use_send_window else None
+        )
+        
+        # Métricas de latência do envio
+        with st.expander("📈 Métricas de envio"):
+            metrics_area = st.empty()
+            render_metrics(metrics_area)
+            st.download_button("Prometheus", metrics.to_prometheus(), file_name="metrics.prom", mime="text/plain")
+            st.download_button("JSON", metrics.to_json(), file_name="metrics.json", mime="application/json")
+        
+        # Contas atendidas pelo pool
+        accounts = get_session_pool().accounts()
+        if accounts:
+            with st.expander("🏢 Contas"):
+                st.dataframe([account.snapshot() for account in accounts], hide_index=True)
+        
         # Informações e instruções
         st.info(
             "📋 **Instruções:**\n\n"
             "1. Faça upload de um arquivo Excel/CSV\n"
             "2. Selecione a coluna dos telefones\n"
             "3. Digite sua mensagem (use {variavel})\n"
-            "4. Escaneie o QR Code do WhatsApp\n"
+            "4. Escaneie o QR Code do WhatsApp (apenas no primeiro uso)\n"
             "5. Acompanhe o progresso do envio"
         )
         
@@ -106,97 +210,139 @@ def main():
         
         if uploaded_file is not None:
             try:
-                # Processa o arquivo
-                temp_file = save_uploaded_file(uploaded_file)
-                df = pd.read_excel(temp_file) if uploaded_file.name.endswith('.xlsx') else pd.read_csv(temp_file)
-                os.unlink(temp_file)
+                # Cabeçalho, amostra e contagem lidos da memória uma vez por arquivo (cache pelo hash)
+                data = uploaded_file.getvalue()
+                upload = get_upload_cache().get(data, uploaded_file.name)
+                columns = upload.columns
+                preview = upload.sample
+                total_rows = upload.total_rows
                 
                 st.success("✅ Arquivo carregado com sucesso!")
                 
                 # Preview dos dados
                 with st.expander("👀 Visualizar dados"):
-                    st.dataframe(df.head())
-                    st.info(f"Total de registros: {len(df)}")
+                    st.dataframe(preview)
+                    st.info(f"Total de registros: {total_rows if total_rows is not None else 'desconhecido'}")
                 
                 # Seleção da coluna de telefone
                 phone_column = st.selectbox(
                     "📱 Selecione a coluna com os números de telefone",
-                    df.columns
+                    columns
                 )
                 
                 # Campo para mensagem
                 st.subheader("✍️ Composição da Mensagem")
-                st.write("Campos disponíveis:", ", ".join([f"{{{col}}}" for col in df.columns]))
+                st.write("Campos disponíveis:", ", ".join([f"{{{col}}}" for col in columns]))
                 message = st.text_area(
                     "Digite sua mensagem",
                     height=150,
                     help="Use {coluna} para inserir valores do arquivo"
                 )
+                attachment_file = st.file_uploader(
+                    "📎 Anexo (opcional)",
+                    type=[extension.lstrip(".") for extension in ATTACHMENT_TYPES],
+                    help="Enviado a todos os contatos; a mensagem vira a legenda do anexo"
+                )
                 
                 # Botão de envio
                 if st.button("🚀 Iniciar Envio de Mensagens"):
-                    if not message:
+                    if not message and attachment_file is None:
                         st.error("⚠️ Por favor, digite uma mensagem")
                         return
                     
-                    # Inicializa o WhatsApp
-                    whatsapp = WhatsAppHelper(headless=headless_mode)
+                    # Compila o template e valida os campos antes de autenticar
+                    template = MessageTemplate(message)
+                    missing = template.missing_fields(columns)
+                    if missing:
+                        st.error(f"⚠️ Campos não encontrados no arquivo: {', '.join(missing)}")
+                        return
+
+                    # Anexo validado e codificado uma vez; o navegador o recebe uma vez por campanha
+                    process_options = {}
+                    if attachment_file is not None:
+                        try:
+                            process_options["attachment"] = Attachment(attachment_file.getvalue(), attachment_file.name)
+                        except ValueError as e:
+                            st.error(f"⚠️ {str(e)}")
+                            return
                     
-                    try:
-                        # Autenticação
-                        with st.spinner("🔄 Aguardando autenticação do WhatsApp..."):
-                            if not whatsapp.authenticate_whatsapp(timeout=timeout):
-                                st.error("❌ Falha na autenticação do WhatsApp")
-                                return
-                            st.success("✅ WhatsApp autenticado com sucesso!")
-                        
-                        # Prepara a barra de progresso
-                        progress_bar = st.progress(0)
-                        status_text = st.empty()
-                        error_count = 0
-                        success_count = 0
-                        
-                        # Processa cada linha
-                        total_rows = len(df)
-                        for index, row in df.iterrows():
-                            try:
-                                # Atualiza progresso
-                                progress = (index + 1) / total_rows
-                                progress_bar.progress(progress)
-                                
-                                # Processa o número
-                                phone = process_phone_number(row[phone_column])
-                                
-                                # Personaliza a mensagem
-                                personalized_message = message
-                                for col in df.columns:
-                                    if f"{{{col}}}" in message:
-                                        personalized_message = personalized_message.replace(f"{{{col}}}", str(row[col]))
-                                
-                                # Envia a mensagem
-                                status_text.info(f"📤 Enviando para: {phone}")
-                                if whatsapp.send_message(phone, personalized_message):
-                                    success_count += 1
-                                else:
-                                    error_count += 1
-                                
-                                # Aguarda o intervalo configurado
-                                time.sleep(delay)
-                                
-                            except Exception as e:
-                                error_count += 1
-                                st.error(f"Erro ao processar {phone}: {str(e)}")
-                        
-                        # Relatório final
-                        st.success(f"""
-                        ✨ Envio concluído!
-                        - ✅ Mensagens enviadas: {success_count}
-                        - ❌ Falhas: {error_count}
-                        - 📊 Taxa de sucesso: {(success_count/total_rows)*100:.1f}%
-                        """)
-                        
-                    finally:
-                        whatsapp.close()
+                    if account_id:
+                        # Campanha na fila da conta, com navegador e limites próprios
+                        pool = get_session_pool()
+                        pool.register(account_id, rate_policy=rate_policy, headless=headless_mode,
+                                      helper_options=dict(backend=backend), auth_timeout=timeout)
+                        job = pool.submit(account_id, data, uploaded_file.name,
+                                          phone_column, message, process_options=process_options)
+                    else:
+                        # Envia a campanha para o worker em segundo plano, que é dono do navegador
+                        job = get_campaign_runner().submit(
+                            data,
+                            uploaded_file.name,
+                            phone_column,
+                            message,
+                            sender_options=dict(
+                                delay=delay,
+                                headless=headless_mode,
+                                keep_alive=keep_session,
+                                user_data_dir=profile_dir if keep_session else None,
+                                rate_policy=rate_policy,
+                                auth_timeout=timeout,
+                                helper_options=dict(backend=backend)
+                            ),
+                            process_options=process_options
+                        )
+                    st.session_state["job_id"] = job.job_id
+                    st.session_state["job_account"] = account_id
+                    st.success(f"✅ Campanha #{job.job_id} enviada para a fila")
+
+                # Simulação sem navegador: duração, término e linhas com problema
+                if st.button("⏱️ Simular e Estimar Duração"):
+                    # Mesmo anexo validado do envio: tipo, tamanho e limite da legenda
+                    attachment = None
+                    if attachment_file is not None:
+                        try:
+                            attachment = Attachment(attachment_file.getvalue(), attachment_file.name)
+                        except ValueError as e:
+                            st.error(f"⚠️ {str(e)}")
+                            return
+                    reports_dir = os.path.join(get_session_pool().reports_dir, account_id) if account_id else None
+                    sender = MessageSender(delay=delay, rate_policy=rate_policy, reports_dir=reports_dir)
+                    with st.spinner("Simulando campanha..."):
+                        plan = sender.dry_run(io.BytesIO(data), phone_column, message, filename=uploaded_file.name,
+                                              attachment=attachment)
+                    if plan is None:
+                        st.error("⚠️ Arquivo ou mensagem inválidos")
+                    else:
+                        sends_col, duration_col, finish_col, rate_col = st.columns(4)
+                        sends_col.metric("Envios", plan.sends)
+                        duration_col.metric("Duração", format_duration(plan.duration_seconds))
+                        finish_col.metric("Término", plan.finish_at.strftime("%d/%m %H:%M"))
+                        rate_col.metric("Msg/hora", f"{plan.messages_per_hour:.0f}")
+                        st.caption(
+                            f"{plan.send_seconds:.1f}s por envio "
+                            f"({'medido em campanhas anteriores' if plan.measured else 'estimativa padrão'}) | "
+                            f"preparação dos dados: {format_duration(plan.prepare_seconds)}"
+                        )
+                        for warning in plan.warnings():
+                            st.warning(warning)
+                        if plan.flagged:
+                            with st.expander(f"🚩 Linhas com problema ({len(plan.flagged)} primeiras)"):
+                                st.dataframe(plan.flagged, hide_index=True)
+
+                # Links "click to chat" para e-mails e QR codes, sem abrir o navegador
+                if st.button("🔗 Gerar Links do WhatsApp"):
+                    if not message:
+                        st.error("⚠️ Por favor, digite uma mensagem")
+                        return
+                    with st.spinner("Gerando links..."):
+                        sender = MessageSender()
+                        sender.set_status_callback(st.info)
+                        links_file = sender.export_links(io.BytesIO(data), phone_column, message,
+                                                         filename=uploaded_file.name)
+                    if links_file:
+                        with open(links_file, 'rb') as f:
+                            st.download_button("📥 Baixar links", f.read(), file_name=os.path.basename(links_file),
+                                               mime="text/csv")
                         
             except Exception as e:
                 st.error(f"❌ Erro ao processar arquivo: {str(e)}")
@@ -204,17 +350,37 @@ def main():
     with col2:
         # Área de status e preview
         st.subheader("📊 Status")
-        st.info("Aguardando início do processamento...")
+        runner = get_session_pool() if st.session_state.get("job_account") else get_campaign_runner()
+        job = runner.get(st.session_state.get("job_id"))
+        if job is not None and job.active:
+            pause_col, resume_col, cancel_col = st.columns(3)
+            if pause_col.button("⏸️ Pausar"):
+                job.pause()
+            if resume_col.button("▶️ Retomar"):
+                job.resume()
+            if cancel_col.button("⏹️ Cancelar"):
+                job.cancel()
+        status_area = st.empty()
+        if job is None:
+            status_area.info("Aguardando início do processamento...")
+        else:
+            render_job_status(status_area, job.snapshot())
         
         # Preview da mensagem
         if 'message' in locals() and message:
             st.subheader("👁️ Preview da Mensagem")
-            if len(df) > 0:
-                preview_message = message
-                for col in df.columns:
-                    if f"{{{col}}}" in message:
-                        preview_message = preview_message.replace(f"{{{col}}}", str(df.iloc[0][col]))
-                st.code(preview_message)
+            # Renderiza apenas a amostra em cache, não o arquivo inteiro
+            try:
+                for text in MessageTemplate(message).render(preview.head(PREVIEW_MESSAGES)):
+                    st.code(text)
+            except ValueError as e:
+                st.warning(f"⚠️ {str(e)}")
+
+    # Enquanto o job está ativo, o script termina e é reexecutado a cada JOB_REFRESH_SECONDS:
+    # a thread do script fica livre entre as atualizações do painel
+    if job is not None and job.active:
+        time.sleep(JOB_REFRESH_SECONDS)
+        _rerun()
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,81 @@
+import base64
+import hashlib
+import os
+
+# Tipos aceitos como anexo: extensão -> tipo MIME
+ATTACHMENT_TYPES = {
+    ".jpg": "image/jpeg",
+    ".jpeg": "image/jpeg",
+    ".png": "image/png",
+    ".webp": "image/webp",
+    ".gif": "image/gif",
+    ".mp4": "video/mp4",
+    ".pdf": "application/pdf",
+    ".docx": "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+    ".xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+    ".csv": "text/csv",
+    ".txt": "text/plain",
+}
+
+# Assinatura no início do conteúdo, conferida para evitar arquivos renomeados ou corrompidos
+_SIGNATURES = {
+    ".jpg": (b"\xff\xd8\xff",),
+    ".jpeg": (b"\xff\xd8\xff",),
+    ".png": (b"\x89PNG\r\n\x1a\n",),
+    ".gif": (b"GIF87a", b"GIF89a"),
+    ".pdf": (b"%PDF",),
+    ".docx": (b"PK\x03\x04",),
+    ".xlsx": (b"PK\x03\x04",),
+}
+
+# Tamanho máximo aceito pelo WhatsApp (bytes): fotos e vídeos / documentos
+MAX_MEDIA_BYTES = 16 * 2 ** 20
+MAX_DOCUMENT_BYTES = 100 * 2 ** 20
+
+
+class Attachment:
+    def __init__(self, data: bytes, filename: str):
+        """
+        Arquivo enviado junto com a mensagem (que vira a legenda), validado, identificado
+        pelo hash e codificado uma única vez por campanha
+        Args:
+            data (bytes): Conteúdo do arquivo
+            filename (str): Nome do arquivo; a extensão define o tipo
+        Raises:
+            ValueError: Se o tipo não é aceito, o arquivo está vazio, excede o limite do
+                WhatsApp ou o conteúdo não corresponde à extensão
+        """
+        self.name = os.path.basename(filename)
+        extension = os.path.splitext(self.name)[1].lower()
+        if extension not in ATTACHMENT_TYPES:
+            raise ValueError(
+                f"Tipo de anexo não suportado: {extension or self.name} "
+                f"(aceitos: {', '.join(sorted(ATTACHMENT_TYPES))})"
+            )
+        if not data:
+            raise ValueError(f"Anexo vazio: {self.name}")
+        if not data.startswith(_SIGNATURES.get(extension, (b"",))):
+            raise ValueError(f"Conteúdo do anexo não corresponde à extensão {extension}: {self.name}")
+
+        self.mime = ATTACHMENT_TYPES[extension]
+        self.size = len(data)
+        limit = MAX_MEDIA_BYTES if self.is_media else MAX_DOCUMENT_BYTES
+        if self.size > limit:
+            raise ValueError(f"Anexo {self.name} excede o limite de {limit // 2 ** 20} MB")
+        self.digest = hashlib.blake2b(data, digest_size=16).hexdigest()
+        # Conteúdo já no formato transferido para a página; os bytes originais não são mantidos
+        self.base64 = base64.b64encode(data).decode("ascii")
+
+    @classmethod
+    def from_path(cls, path: str) -> "Attachment":
+        """Lê e valida o anexo a partir de um arquivo em disco"""
+        with open(path, 'rb') as f:
+            return cls(f.read(), path)
+
+    @property
+    def is_media(self) -> bool:
+        """Fotos e vídeos (limite menor e prévia com legenda); os demais tipos vão como documento"""
+        return self.mime.startswith(("image/", "video/"))
+
+    def __repr__(self):
+        return f"Attachment({self.name!r}, {self.size} bytes, {self.digest[:8]})"
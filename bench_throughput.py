@@ -0,0 +1,165 @@
+"""
+Benchmark de vazão do MessageSender contra o WhatsApp Web simulado (FakeWhatsAppDriver)
+
+Uso:
+    python bench_throughput.py                       # 1k, 10k e 100k contatos
+    python bench_throughput.py --sizes 1000 --memory
+    python bench_throughput.py --save baseline.json
+    python bench_throughput.py --check baseline.json --tolerance 0.2
+"""
+import argparse
+import csv
+import json
+import logging
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from fake_whatsapp import FAKE_URL, FakeWhatsAppDriver
+from message_sender import MessageSender
+from metrics import metrics
+from send_scheduler import RatePolicy
+from whatsapp_helper import NAVIGATION_APP, WhatsAppHelper
+
+DEFAULT_SIZES = (1000, 10000, 100000)
+
+# Fração de linhas com número malformado, repetido ou sem WhatsApp
+INVALID_RATE = 0.05
+DUPLICATE_RATE = 0.05
+NOT_ON_WHATSAPP_RATE = 0.05
+
+
+def generate_contacts(path, size, seed=42):
+    """Gera um CSV de contatos com números válidos, inválidos, repetidos e sem WhatsApp"""
+    rng = random.Random(seed)
+    dead = set()
+    phones = []
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(['telefone', 'nome', 'empresa'])
+        for index in range(size):
+            draw = rng.random()
+            if draw < INVALID_RATE:
+                phone = str(rng.randint(100, 99999))
+            elif draw < INVALID_RATE + DUPLICATE_RATE and phones:
+                phone = rng.choice(phones)
+            else:
+                phone = f"55{rng.randint(11, 99)}9{rng.randint(10000000, 99999999)}"
+                phones.append(phone)
+                if rng.random() < NOT_ON_WHATSAPP_RATE:
+                    dead.add(phone)
+            writer.writerow([phone, f"Contato {index}", f"Empresa {index % 100}"])
+    return dead
+
+
+def run_campaign(size, workdir, navigation, latencies, track_memory):
+    """Executa uma campanha completa e retorna as medições"""
+    contacts = os.path.join(workdir, f"contatos_{size}.csv")
+    dead = generate_contacts(contacts, size)
+
+    metrics.reset()
+    helper = WhatsAppHelper(
+        base_url=FAKE_URL,
+        navigation=navigation,
+        driver_factory=lambda options: FakeWhatsAppDriver(latencies=latencies, invalid_numbers=dead),
+    )
+    reports_dir = os.path.join(workdir, f"reports_{size}")
+    sender = MessageSender(whatsapp=helper, rate_policy=RatePolicy(interval=0), reports_dir=reports_dir)
+
+    if track_memory:
+        tracemalloc.start()
+    start = time.perf_counter()
+    results = sender.process_file(contacts, 'telefone', "Olá {nome}, temos uma oferta para a {empresa}!")
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1] if track_memory else None
+    if track_memory:
+        tracemalloc.stop()
+    helper.close()
+
+    snapshot = metrics.snapshot()
+    return {
+        "size": size,
+        "navigation": navigation,
+        "seconds": elapsed,
+        "browser_sends": len(results),
+        "rows_per_minute": size / elapsed * 60,
+        "messages_per_minute": len(results) / elapsed * 60,
+        "peak_memory_mb": peak / 2 ** 20 if peak is not None else None,
+        "stages": {
+            stage: {key: summary[key] for key in ("count", "p50", "p95", "p99")}
+            for stage, summary in snapshot["stages"].items()
+        },
+    }
+
+
+def print_result(result):
+    memory = f"{result['peak_memory_mb']:.1f} MB" if result["peak_memory_mb"] is not None else "-"
+    print(
+        f"\n{result['size']:>7} contatos ({result['navigation']}): {result['seconds']:.2f}s | "
+        f"{result['messages_per_minute']:.0f} msg/min | {result['rows_per_minute']:.0f} linhas/min | "
+        f"pico de memória: {memory}"
+    )
+    for stage, summary in sorted(result["stages"].items()):
+        quantiles = " ".join(
+            f"{key}={summary[key] * 1000:.2f}ms" for key in ("p50", "p95", "p99") if summary[key] is not None
+        )
+        print(f"    {stage:<18} n={summary['count']:<8} {quantiles}")
+
+
+def check_regressions(results, baseline_path, tolerance):
+    """Compara a vazão com uma execução de referência; retorna as regressões encontradas"""
+    with open(baseline_path, encoding='utf-8') as f:
+        baseline = {(item["size"], item["navigation"]): item for item in json.load(f)}
+    regressions = []
+    for result in results:
+        reference = baseline.get((result["size"], result["navigation"]))
+        if not reference:
+            continue
+        floor = reference["messages_per_minute"] * (1 - tolerance)
+        if result["messages_per_minute"] < floor:
+            regressions.append(
+                f"{result['size']} contatos: {result['messages_per_minute']:.0f} msg/min "
+                f"(referência {reference['messages_per_minute']:.0f}, mínimo {floor:.0f})"
+            )
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de vazão do envio de mensagens")
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(DEFAULT_SIZES))
+    parser.add_argument("--navigation", default=NAVIGATION_APP, help="app ou url")
+    parser.add_argument("--latency", type=float, default=0.0,
+                        help="Latência simulada de cada etapa do navegador (segundos)")
+    parser.add_argument("--memory", action="store_true", help="Mede o pico de memória (mais lento)")
+    parser.add_argument("--save", help="Grava os resultados em JSON")
+    parser.add_argument("--check", help="JSON de referência para detectar regressões de vazão")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Queda de vazão tolerada (0.2 = 20%%)")
+    args = parser.parse_args()
+
+    logging.getLogger().setLevel(logging.WARNING)
+    latencies = {stage: args.latency for stage in ("page_load", "chat_switch", "send_button", "confirm")}
+
+    results = []
+    with tempfile.TemporaryDirectory() as workdir:
+        for size in args.sizes:
+            result = run_campaign(size, workdir, args.navigation, latencies, args.memory)
+            print_result(result)
+            results.append(result)
+
+    if args.save:
+        with open(args.save, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+    if args.check:
+        regressions = check_regressions(results, args.check, args.tolerance)
+        if regressions:
+            print("\nRegressões de vazão:")
+            for regression in regressions:
+                print(f"    {regression}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,202 @@
+import logging
+import threading
+import time
+from typing import Optional
+
+from metrics import metrics
+from whatsapp_helper import STATUS_FAILED
+from whatsapp_selectors import SelectorHealthError
+
+logger = logging.getLogger(__name__)
+
+# Intervalo entre verificações do navegador e prazo para ele responder (segundos)
+DEFAULT_HEARTBEAT_INTERVAL = 60
+DEFAULT_HEARTBEAT_TIMEOUT = 10
+
+# Reciclagem preventiva: recarga da aba e reinício do navegador após N mensagens
+DEFAULT_RELOAD_AFTER = 200
+DEFAULT_RESTART_AFTER = 2000
+
+# Memória máxima do navegador (soma do RSS dos processos, em MB) antes do reinício
+DEFAULT_MAX_RSS_MB = 2048
+
+# Tentativas seguidas de reinício antes de desistir da campanha
+DEFAULT_MAX_RESTARTS = 3
+
+# Motivos de reinício (rótulo 'reason' da métrica browser_restarts; conjunto fixo)
+RESTART_UNRESPONSIVE = "sem_resposta"
+RESTART_RECYCLE = "reciclagem"
+RESTART_MEMORY = "memoria"
+RESTART_RELOAD_FAILED = "falha_recarga"
+RESTART_CRASHED = "queda_no_envio"
+
+_RESTART_REASONS = {
+    RESTART_UNRESPONSIVE: "sessão sem resposta",
+    RESTART_RECYCLE: "reciclagem periódica",
+    RESTART_MEMORY: "memória acima do limite",
+    RESTART_RELOAD_FAILED: "falha na recarga da aba",
+    RESTART_CRASHED: "navegador caiu durante o envio",
+}
+
+
+class BrowserRecoveryError(RuntimeError):
+    """O navegador não pôde ser reiniciado e autenticado"""
+
+
+class BrowserWatchdog:
+    def __init__(self, helper, auth_timeout: int = 120,
+                 heartbeat_interval: float = DEFAULT_HEARTBEAT_INTERVAL,
+                 heartbeat_timeout: float = DEFAULT_HEARTBEAT_TIMEOUT,
+                 reload_after: Optional[int] = DEFAULT_RELOAD_AFTER,
+                 restart_after: Optional[int] = DEFAULT_RESTART_AFTER,
+                 max_rss_mb: Optional[float] = DEFAULT_MAX_RSS_MB,
+                 max_restarts: int = DEFAULT_MAX_RESTARTS):
+        """
+        Supervisiona o navegador durante uma campanha: detecta sessões mortas ou travadas,
+        reinicia o navegador no mesmo perfil (sem novo QR code) e reenvia o contato em
+        andamento; recicla a aba e o navegador periodicamente para conter o uso de memória
+        Args:
+            helper: WhatsAppHelper ou CDPWhatsAppHelper já autenticado
+            auth_timeout (int): Tempo máximo de autenticação após um reinício (segundos)
+            heartbeat_interval (float): Intervalo mínimo entre verificações do navegador (segundos)
+            heartbeat_timeout (float): Prazo para o navegador responder à verificação (segundos)
+            reload_after (int): Recarrega a aba a cada N mensagens (None desativa)
+            restart_after (int): Reinicia o navegador a cada N mensagens (None desativa)
+            max_rss_mb (float): Reinicia o navegador acima desta memória (None desativa; requer psutil)
+            max_restarts (int): Tentativas seguidas de reinício antes de interromper a campanha
+        """
+        self.helper = helper
+        self.auth_timeout = auth_timeout
+        self.heartbeat_interval = heartbeat_interval
+        self.heartbeat_timeout = heartbeat_timeout
+        self.reload_after = reload_after
+        self.restart_after = restart_after
+        self.max_rss_mb = max_rss_mb
+        self.max_restarts = max_restarts
+        self.since_reload = 0
+        self.since_restart = 0
+        self.restarts = 0
+        self._last_heartbeat = time.monotonic()
+        self._psutil_missing = False
+
+    def heartbeat(self) -> bool:
+        """
+        Verifica se o navegador responde dentro de heartbeat_timeout
+        Returns:
+            bool: True se o navegador está ativo
+        """
+        result = {}
+        probe = threading.Thread(
+            target=lambda: result.setdefault("alive", self.helper.is_alive()), name="browser-heartbeat", daemon=True
+        )
+        probe.start()
+        probe.join(self.heartbeat_timeout)
+        self._last_heartbeat = time.monotonic()
+        alive = result.get("alive", False)
+        if not alive:
+            metrics.inc("heartbeats", result="sem_resposta" if probe.is_alive() else "morto")
+        return alive
+
+    def browser_rss_mb(self) -> Optional[float]:
+        """
+        Memória residente do navegador e de seus processos filhos
+        Returns:
+            float: RSS em MB, ou None se não for possível medir
+        """
+        pid = self.helper.browser_pid()
+        if pid is None:
+            return None
+        try:
+            import psutil
+        except ImportError:
+            if not self._psutil_missing:
+                logger.warning("psutil não instalado: reciclagem por memória desativada")
+                self._psutil_missing = True
+            return None
+        try:
+            root = psutil.Process(pid)
+            processes = [root] + root.children(recursive=True)
+        except psutil.Error:
+            return None
+        total = 0
+        for process in processes:
+            try:
+                total += process.memory_info().rss
+            except psutil.Error:
+                continue
+        return total / 2 ** 20
+
+    def restart(self, reason: str, detail: Optional[str] = None):
+        """
+        Reinicia o navegador no mesmo perfil e autentica de novo
+        Args:
+            reason (str): Código do motivo (RESTART_*), usado como rótulo nas métricas
+            detail (str): Informação adicional registrada apenas no log (ex.: texto do erro)
+        Raises:
+            BrowserRecoveryError: Se todas as tentativas falharem
+        """
+        description = _RESTART_REASONS.get(reason, reason)
+        logger.warning(f"Reiniciando o navegador: {description}" + (f" ({detail})" if detail else ""))
+        metrics.inc("browser_restarts", reason=reason if reason in _RESTART_REASONS else "outro")
+        for attempt in range(1, self.max_restarts + 1):
+            try:
+                self.helper.restart()
+                if self.helper.authenticate_whatsapp(timeout=self.auth_timeout):
+                    self.helper.check_selectors()
+                    self.since_reload = self.since_restart = 0
+                    self.restarts += 1
+                    self._last_heartbeat = time.monotonic()
+                    logger.info(f"Navegador reiniciado (tentativa {attempt})")
+                    return
+                logger.error(f"Falha ao autenticar após o reinício (tentativa {attempt})")
+            except SelectorHealthError:
+                raise
+            except Exception as e:
+                logger.error(f"Erro ao reiniciar o navegador (tentativa {attempt}): {str(e)}")
+            time.sleep(5 * attempt)
+        raise BrowserRecoveryError(f"Navegador não recuperado após {self.max_restarts} tentativas ({description})")
+
+    def _maintain(self):
+        """Verificações antes de cada envio: heartbeat periódico e reciclagem preventiva"""
+        if time.monotonic() - self._last_heartbeat >= self.heartbeat_interval and not self.heartbeat():
+            self.restart(RESTART_UNRESPONSIVE)
+            return
+        if self.restart_after and self.since_restart >= self.restart_after:
+            self.restart(RESTART_RECYCLE)
+            return
+        if self.max_rss_mb and self.since_restart and self.since_restart % 50 == 0:
+            rss = self.browser_rss_mb()
+            if rss is not None and rss > self.max_rss_mb:
+                self.restart(RESTART_MEMORY, f"{rss:.0f} MB")
+                return
+        if self.reload_after and self.since_reload >= self.reload_after:
+            logger.info(f"Recarregando a aba após {self.since_reload} mensagens")
+            metrics.inc("tab_reloads")
+            try:
+                self.helper.reload_page()
+                if not self.helper.authenticate_whatsapp(timeout=self.auth_timeout):
+                    raise RuntimeError("WhatsApp Web não carregou após a recarga")
+                self.since_reload = 0
+            except Exception as e:
+                self.restart(RESTART_RELOAD_FAILED, str(e))
+
+    def send_message_status(self, phone, message, attachment=None):
+        """
+        Envia uma mensagem pelo helper supervisionado; se o envio falhar porque o navegador
+        morreu, reinicia e reenvia o mesmo contato uma vez
+        Args:
+            phone (str): Número do telefone
+            message (str): Mensagem a ser enviada (legenda, quando houver anexo)
+            attachment (Attachment): Arquivo enviado junto com a mensagem
+        Returns:
+            str: Status do envio (ver WhatsAppHelper.send_message_status)
+        """
+        self._maintain()
+        status = self.helper.send_message_status(phone, message, attachment)
+        if status == STATUS_FAILED and not self.heartbeat():
+            self.restart(RESTART_CRASHED)
+            metrics.inc("requeued")
+            status = self.helper.send_message_status(phone, message, attachment)
+        self.since_reload += 1
+        self.since_restart += 1
+        return status
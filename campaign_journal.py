@@ -0,0 +1,233 @@
+import csv
+import importlib.util
+import os
+import sqlite3
+import time
+from typing import Dict, Iterator, List, Optional
+
+# Estado gravado antes de a mensagem ir para o navegador
+STATE_SENDING = "enviando"
+# Estado atribuído, na retomada, a envios interrompidos no meio (não são reenviados)
+STATE_INTERRUPTED = "interrompido"
+
+# Formatos aceitos nos relatórios; parquet requer o extra opcional (poetry install -E parquet)
+REPORT_FORMATS = ("csv", "parquet")
+
+# Quantidade de registros acumulados antes de gravar no banco
+DEFAULT_COMMIT_EVERY = 500
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS campaigns (
+    id TEXT PRIMARY KEY,
+    source TEXT,
+    phone_column TEXT,
+    template TEXT,
+    created_at REAL,
+    finished_at REAL
+);
+CREATE TABLE IF NOT EXISTS contacts (
+    campaign_id TEXT NOT NULL,
+    row_index INTEGER NOT NULL,
+    phone TEXT,
+    message TEXT,
+    state TEXT NOT NULL,
+    updated_at REAL,
+    PRIMARY KEY (campaign_id, row_index)
+);
+CREATE INDEX IF NOT EXISTS contacts_state ON contacts (campaign_id, state);
+"""
+
+_UPSERT = """
+INSERT INTO contacts (campaign_id, row_index, phone, message, state, updated_at)
+VALUES (?, ?, ?, ?, ?, ?)
+ON CONFLICT (campaign_id, row_index) DO UPDATE SET
+    phone = excluded.phone, message = excluded.message,
+    state = excluded.state, updated_at = excluded.updated_at
+"""
+
+
+def check_report_format(report_format: str):
+    """
+    Confere, antes de a campanha começar, se o formato pode ser gravado
+    Args:
+        report_format (str): Formato do arquivo ("csv" ou "parquet")
+    Raises:
+        ValueError: Se o formato não é aceito ou se pyarrow não está instalado para parquet
+    """
+    if report_format not in REPORT_FORMATS:
+        raise ValueError(f"Formato não suportado: {report_format} (aceitos: {', '.join(REPORT_FORMATS)})")
+    if report_format == "parquet" and importlib.util.find_spec("pyarrow") is None:
+        raise ValueError("Formato parquet requer o pacote pyarrow (poetry install -E parquet)")
+
+
+class CampaignJournal:
+    def __init__(self, path: str, commit_every: int = DEFAULT_COMMIT_EVERY):
+        """
+        Diário de campanhas em SQLite (modo WAL), à prova de queda do processo
+        Args:
+            path (str): Caminho do banco de dados
+            commit_every (int): Quantidade de registros acumulados antes de gravar
+        """
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self.commit_every = commit_every
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(_SCHEMA)
+        self._pending = []
+
+    def start_campaign(self, campaign_id: str, source: str = "", phone_column: str = "", template: str = ""):
+        """
+        Registra uma campanha nova ou reabre uma existente para retomada
+        Args:
+            campaign_id (str): Identificador da campanha
+            source (str): Nome do arquivo de contatos
+            phone_column (str): Coluna com os números de telefone
+            template (str): Template da mensagem
+        """
+        with self.conn:
+            self.conn.execute(
+                "INSERT OR IGNORE INTO campaigns (id, source, phone_column, template, created_at) VALUES (?, ?, ?, ?, ?)",
+                (campaign_id, source, phone_column, template, time.time())
+            )
+            # Envios interrompidos por uma queda não são repetidos para evitar duplicidade
+            self.conn.execute(
+                "UPDATE contacts SET state = ?, updated_at = ? WHERE campaign_id = ? AND state = ?",
+                (STATE_INTERRUPTED, time.time(), campaign_id, STATE_SENDING)
+            )
+
+    def finish_campaign(self, campaign_id: str):
+        """Grava os registros pendentes e marca a campanha como concluída"""
+        self.flush()
+        with self.conn:
+            self.conn.execute("UPDATE campaigns SET finished_at = ? WHERE id = ?", (time.time(), campaign_id))
+
+    def record(self, campaign_id: str, task: Dict):
+        """
+        Registra o estado final de uma tarefa (gravado em lote)
+        Args:
+            campaign_id (str): Identificador da campanha
+            task (Dict): Tarefa com 'index', 'phone', 'message' e 'status'
+        """
+        self._pending.append(
+            (campaign_id, int(task["index"]), task["phone"], task["message"], task["status"], time.time())
+        )
+        if len(self._pending) >= self.commit_every:
+            self.flush()
+
+    def mark_sending(self, campaign_id: str, task: Dict):
+        """
+        Grava imediatamente que a tarefa está indo para o navegador, junto com os
+        registros pendentes, para que uma queda nunca provoque reenvio
+        Args:
+            campaign_id (str): Identificador da campanha
+            task (Dict): Tarefa com 'index', 'phone' e 'message'
+        """
+        self._pending.append(
+            (campaign_id, int(task["index"]), task["phone"], task["message"], STATE_SENDING, time.time())
+        )
+        self.flush()
+
+    def flush(self):
+        """Grava os registros acumulados em uma única transação"""
+        if not self._pending:
+            return
+        with self.conn:
+            self.conn.executemany(_UPSERT, self._pending)
+        self._pending = []
+
+    def last_row(self, campaign_id: str) -> int:
+        """
+        Última linha do arquivo já registrada na campanha
+        Args:
+            campaign_id (str): Identificador da campanha
+        Returns:
+            int: Índice da linha, ou -1 se nada foi registrado
+        """
+        row = self.conn.execute(
+            "SELECT MAX(row_index) FROM contacts WHERE campaign_id = ?", (campaign_id,)
+        ).fetchone()
+        return row[0] if row[0] is not None else -1
+
+    def status_counts(self, campaign_id: str) -> Dict[str, int]:
+        """
+        Conta os contatos da campanha por estado
+        Args:
+            campaign_id (str): Identificador da campanha
+        Returns:
+            Dict[str, int]: Quantidade de contatos por estado
+        """
+        rows = self.conn.execute(
+            "SELECT state, COUNT(*) FROM contacts WHERE campaign_id = ? GROUP BY state", (campaign_id,)
+        )
+        return dict(rows.fetchall())
+
+    def campaigns(self) -> List[Dict]:
+        """
+        Lista as campanhas registradas, da mais recente para a mais antiga
+        Returns:
+            List[Dict]: Dados de cada campanha
+        """
+        cursor = self.conn.execute(
+            "SELECT id, source, phone_column, template, created_at, finished_at FROM campaigns ORDER BY created_at DESC"
+        )
+        columns = [description[0] for description in cursor.description]
+        return [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+    def iter_contacts(self, campaign_id: str, batch_size: int = 10000) -> Iterator[List[tuple]]:
+        """
+        Percorre os contatos da campanha em lotes, na ordem do arquivo
+        Args:
+            campaign_id (str): Identificador da campanha
+            batch_size (int): Quantidade de linhas por lote
+        Returns:
+            Iterator[List[tuple]]: Lotes de (linha, telefone, estado, mensagem)
+        """
+        cursor = self.conn.execute(
+            "SELECT row_index, phone, state, message FROM contacts WHERE campaign_id = ? ORDER BY row_index",
+            (campaign_id,)
+        )
+        while True:
+            rows = cursor.fetchmany(batch_size)
+            if not rows:
+                break
+            yield rows
+
+    def export(self, campaign_id: str, path: str, labels: Optional[Dict[str, str]] = None) -> str:
+        """
+        Exporta o relatório da campanha em CSV ou Parquet (pela extensão do arquivo)
+        Args:
+            campaign_id (str): Identificador da campanha
+            path (str): Arquivo de destino (.csv ou .parquet)
+            labels (Dict[str, str]): Texto exibido para cada estado no relatório
+        Returns:
+            str: Caminho do arquivo gerado
+        """
+        self.flush()
+        labels = labels or {}
+        header = ['Linha', 'Telefone', 'Status', 'Mensagem']
+
+        if path.endswith(".parquet"):
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+
+            schema = pa.schema([(header[0], pa.int64())] + [(name, pa.string()) for name in header[1:]])
+            with pq.ParquetWriter(path, schema) as writer:
+                for rows in self.iter_contacts(campaign_id):
+                    columns = list(zip(*[(i, p, labels.get(s, s), m) for i, p, s, m in rows]))
+                    writer.write_table(pa.Table.from_arrays([pa.array(c) for c in columns], schema=schema))
+            return path
+
+        with open(path, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.writer(f)
+            writer.writerow(header)
+            for rows in self.iter_contacts(campaign_id):
+                writer.writerows((i, p, labels.get(s, s), m) for i, p, s, m in rows)
+        return path
+
+    def close(self):
+        """Grava os registros pendentes e fecha o banco"""
+        self.flush()
+        self.conn.close()
@@ -0,0 +1,228 @@
+import json
+import logging
+import os
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+from metrics import metrics
+from phone_utils import STATUS_VALID
+from send_scheduler import RateLimiter, RatePolicy
+from whatsapp_helper import STATUS_FAILED
+
+logger = logging.getLogger(__name__)
+
+# Duração de um envio quando ainda não há medições (segundos)
+DEFAULT_SEND_SECONDS = 8.0
+
+# Abertura do navegador e autenticação quando ainda não há medições (segundos)
+DEFAULT_STARTUP_SECONDS = 30.0
+
+# Linhas com problema listadas no plano (as demais entram apenas na contagem)
+DEFAULT_FLAGGED_ROWS = 50
+
+# Tamanho máximo de uma mensagem de texto e de uma legenda de anexo (caracteres)
+MAX_MESSAGE_LENGTH = 65536
+MAX_CAPTION_LENGTH = 1024
+
+# Problemas das linhas que não chegam ao navegador ou que falhariam no envio
+ISSUE_EMPTY = "mensagem_vazia"
+ISSUE_TOO_LONG = "mensagem_longa"
+
+
+def load_latency_history(path: Optional[str] = None) -> Dict:
+    """
+    Latências medidas em campanhas anteriores
+    Args:
+        path (str): metrics.json exportado ao fim de cada campanha
+    Returns:
+        Dict: Snapshot de métricas ('stages' e 'counters'); usa as métricas do processo quando
+            elas já têm envios medidos, senão o arquivo, senão um snapshot vazio
+    """
+    snapshot = metrics.snapshot()
+    if snapshot["stages"].get("send_message", {}).get("count"):
+        return snapshot
+    if path and os.path.exists(path):
+        try:
+            with open(path, encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Histórico de métricas inválido em {path}: {str(e)}")
+    return {"stages": {}, "counters": []}
+
+
+def _mean(history: Dict, stage: str) -> Optional[float]:
+    summary = history.get("stages", {}).get(stage) or {}
+    return summary.get("mean") if summary.get("count") else None
+
+
+def failure_rate(history: Dict) -> float:
+    """Fração dos envios medidos que terminaram em 'falhou'"""
+    counts = {
+        counter["labels"].get("status"): counter["value"]
+        for counter in history.get("counters", []) if counter["name"] == "messages"
+    }
+    total = sum(counts.values())
+    return counts.get(STATUS_FAILED, 0) / total if total else 0.0
+
+
+def spacing(policy: RatePolicy, send_seconds: float) -> float:
+    """
+    Intervalo médio entre o início de dois envios em regime contínuo (após a rajada inicial)
+    Args:
+        policy (RatePolicy): Política de envio
+        send_seconds (float): Duração de um envio
+    Returns:
+        float: Segundos entre envios (o maior entre o intervalo, a duração do envio e os limites)
+    """
+    candidates = [policy.interval, send_seconds]
+    if policy.per_minute:
+        candidates.append(60 / policy.per_minute)
+    if policy.per_hour:
+        candidates.append(3600 / policy.per_hour)
+    return max(candidates)
+
+
+class _VirtualClock:
+    """Relógio da simulação: avança apenas quando a campanha simulada espera ou envia"""
+
+    def __init__(self, start: datetime):
+        self.start = start
+        self.elapsed = 0.0
+
+    def now(self) -> datetime:
+        return self.start + timedelta(seconds=self.elapsed)
+
+    def monotonic(self) -> float:
+        return self.elapsed
+
+
+def simulate(policy: RatePolicy, sends: int, send_seconds: float, startup_seconds: float = 0.0,
+             start: Optional[datetime] = None) -> datetime:
+    """
+    Horário de término da campanha, executando o RateLimiter sobre um relógio virtual: os
+    limites por minuto e por hora começam cheios (rajada inicial), como no envio real
+    Args:
+        policy (RatePolicy): Política de envio (intervalo, limites e horário de silêncio)
+        sends (int): Quantidade de envios
+        send_seconds (float): Duração de um envio
+        startup_seconds (float): Abertura do navegador e autenticação, antes do primeiro envio
+        start (datetime): Início previsto (padrão: agora)
+    Returns:
+        datetime: Horário em que o último envio termina
+    """
+    clock = _VirtualClock(start or datetime.now())
+    if not sends:
+        return clock.now()
+    clock.elapsed = startup_seconds
+    limiter = RateLimiter(policy, clock=clock.now, monotonic=clock.monotonic)
+    for _ in range(sends):
+        # Resíduos de arredondamento abaixo de 1 ms não avançam o relógio (evita laço infinito)
+        wait = limiter.wait_time()
+        while wait > 1e-3:
+            clock.elapsed += wait
+            wait = limiter.wait_time()
+        limiter.consume()
+        clock.elapsed += send_seconds
+    return clock.now()
+
+
+def format_duration(seconds: float) -> str:
+    """Duração legível, ex.: '2h 05min', '4min 10s'"""
+    seconds = int(round(seconds))
+    hours, rest = divmod(seconds, 3600)
+    minutes, seconds = divmod(rest, 60)
+    if hours:
+        return f"{hours}h {minutes:02d}min"
+    return f"{minutes}min {seconds:02d}s" if minutes else f"{seconds}s"
+
+
+class CampaignPlan:
+    def __init__(self, total_rows: int, summary: Dict[str, int], issues: Dict[str, int],
+                 flagged: List[Dict], prepare_seconds: float, policy: RatePolicy, history: Dict,
+                 start: Optional[datetime] = None):
+        """
+        Projeção de uma campanha a partir de uma simulação sem navegador
+        Args:
+            total_rows (int): Linhas lidas do arquivo
+            summary (Dict[str, int]): Números por status (válido, inválido, duplicado, sem WhatsApp)
+            issues (Dict[str, int]): Mensagens válidas que falhariam no envio, por problema
+            flagged (List[Dict]): Amostra das linhas com problema ('index', 'phone', 'status')
+            prepare_seconds (float): Tempo da simulação (leitura, normalização, cache e template)
+            policy (RatePolicy): Política de envio configurada
+            history (Dict): Métricas de campanhas anteriores (ver load_latency_history)
+            start (datetime): Início previsto (padrão: agora)
+        """
+        self.total_rows = total_rows
+        self.summary = summary
+        self.issues = issues
+        self.flagged = flagged
+        self.prepare_seconds = prepare_seconds
+        self.policy = policy
+        self.start = start or datetime.now()
+
+        measured = _mean(history, "send_message")
+        self.measured = measured is not None
+        self.send_seconds = measured if measured is not None else DEFAULT_SEND_SECONDS
+        startup = _mean(history, "setup_driver")
+        self.startup_seconds = startup if startup is not None else DEFAULT_STARTUP_SECONDS
+        self.failure_rate = failure_rate(history)
+
+        self.sends = max(0, summary.get(STATUS_VALID, 0) - sum(issues.values()))
+        self.spacing = spacing(policy, self.send_seconds)
+        self.finish_at = simulate(policy, self.sends, self.send_seconds, self.startup_seconds, self.start)
+        self.duration_seconds = (self.finish_at - self.start).total_seconds()
+        self.messages_per_hour = 3600 / self.spacing
+        self.expected_failures = round(self.sends * self.failure_rate)
+
+    @property
+    def prepare_per_row(self) -> float:
+        """Tempo de preparação por linha (segundos)"""
+        return self.prepare_seconds / self.total_rows if self.total_rows else 0.0
+
+    def warnings(self) -> List[str]:
+        """Alertas sobre a campanha planejada"""
+        alerts = []
+        if not self.measured:
+            alerts.append(
+                f"Sem medições anteriores: estimativa usa {DEFAULT_SEND_SECONDS:.0f}s por envio"
+            )
+        # Sem intervalo configurado, o ritmo é o do próprio navegador: não há com o que comparar
+        if self.policy.interval and self.prepare_per_row > self.spacing:
+            alerts.append(
+                f"Preparação dos dados ({self.prepare_per_row * 1000:.0f} ms por linha) mais lenta que o "
+                f"ritmo de envio ({self.spacing:.1f}s): ela vai limitar a vazão"
+            )
+        if self.policy.interval and self.send_seconds > self.policy.interval:
+            alerts.append(
+                f"Cada envio leva {self.send_seconds:.1f}s, mais que o intervalo configurado "
+                f"({self.policy.interval:.0f}s): o ritmo real será menor"
+            )
+        for issue, count in self.issues.items():
+            if count:
+                alerts.append(f"{count} mensagens com problema ({issue}) não seriam enviadas")
+        if self.expected_failures:
+            alerts.append(
+                f"Cerca de {self.expected_failures} falhas esperadas no navegador "
+                f"({self.failure_rate:.1%} nas campanhas anteriores)"
+            )
+        return alerts
+
+    def to_dict(self) -> Dict:
+        """Plano em formato serializável (JSON)"""
+        return {
+            "total_rows": self.total_rows,
+            "summary": self.summary,
+            "issues": self.issues,
+            "sends": self.sends,
+            "send_seconds": self.send_seconds,
+            "measured": self.measured,
+            "spacing_seconds": self.spacing,
+            "messages_per_hour": self.messages_per_hour,
+            "prepare_seconds": self.prepare_seconds,
+            "duration_seconds": self.duration_seconds,
+            "start": self.start.isoformat(timespec="seconds"),
+            "finish_at": self.finish_at.isoformat(timespec="seconds"),
+            "expected_failures": self.expected_failures,
+            "warnings": self.warnings(),
+            "flagged": self.flagged,
+        }
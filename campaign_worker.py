@@ -0,0 +1,193 @@
+import io
+import itertools
+import logging
+import queue
+import threading
+import time
+from typing import Dict, List, Optional
+
+from message_sender import MessageSender
+
+logger = logging.getLogger(__name__)
+
+# Estados de um job de campanha
+JOB_QUEUED = "na fila"
+JOB_RUNNING = "executando"
+JOB_PAUSED = "pausado"
+JOB_CANCELLED = "cancelado"
+JOB_DONE = "concluido"
+JOB_ERROR = "erro"
+
+_FINAL_STATES = (JOB_CANCELLED, JOB_DONE, JOB_ERROR)
+
+
+class CampaignJob:
+    def __init__(self, job_id: int, data: bytes, filename: str, phone_column: str, message_template: str,
+                 sender_options: Optional[Dict] = None, process_options: Optional[Dict] = None):
+        """
+        Campanha submetida ao worker em segundo plano
+        Args:
+            job_id (int): Identificador do job
+            data (bytes): Conteúdo do arquivo de contatos
+            filename (str): Nome do arquivo, usado para identificar o formato
+            phone_column (str): Nome da coluna com os números de telefone
+            message_template (str): Template da mensagem
+            sender_options (Dict): Argumentos repassados ao MessageSender
+            process_options (Dict): Argumentos extras de MessageSender.process_file
+        """
+        self.job_id = job_id
+        self.data = data
+        self.filename = filename
+        self.phone_column = phone_column
+        self.message_template = message_template
+        self.sender = MessageSender(**(sender_options or {}))
+        self.sender.set_status_callback(self._on_status)
+        self.process_options = process_options or {}
+        self.state = JOB_QUEUED
+        self.status_message = "Aguardando na fila..."
+        self.results = []
+        self.submitted_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+
+    def _on_status(self, message: str):
+        self.status_message = message
+
+    def pause(self):
+        """Pausa o envio após a mensagem em andamento"""
+        if self.state == JOB_RUNNING:
+            self.sender.resume_event.clear()
+            self.state = JOB_PAUSED
+
+    def resume(self):
+        """Retoma um envio pausado"""
+        if self.state == JOB_PAUSED:
+            self.sender.resume_event.set()
+            self.state = JOB_RUNNING
+
+    def cancel(self):
+        """Cancela o envio; o diário permite retomar a campanha depois"""
+        if self.state in _FINAL_STATES:
+            return
+        self.sender.stop_event.set()
+        self.sender.resume_event.set()
+        if self.state == JOB_QUEUED:
+            self.state = JOB_CANCELLED
+            self.finished_at = time.time()
+
+    def run(self):
+        """Executa a campanha (chamado pela thread do worker)"""
+        if self.state == JOB_CANCELLED:
+            return
+        self.state = JOB_RUNNING
+        self.started_at = time.time()
+        try:
+            self.results = self.sender.process_file(
+                io.BytesIO(self.data), self.phone_column, self.message_template,
+                filename=self.filename, **self.process_options
+            )
+            if self.sender.stop_event.is_set():
+                self.state = JOB_CANCELLED
+            elif self.sender.progress.get("finished"):
+                self.state = JOB_DONE
+            else:
+                # process_file registra o erro (ex.: falha na autenticação) e retorna sem concluir
+                self.state = JOB_ERROR
+        except Exception as e:
+            logger.error(f"Erro no job {self.job_id}: {str(e)}")
+            self.status_message = f"Erro: {str(e)}"
+            self.state = JOB_ERROR
+        finally:
+            self.finished_at = time.time()
+            self.data = None  # Libera a memória do arquivo
+
+    @property
+    def active(self) -> bool:
+        """True enquanto o job não chegou a um estado final"""
+        return self.state not in _FINAL_STATES
+
+    def snapshot(self) -> Dict:
+        """
+        Retorna uma cópia leve do progresso, segura para ler de outra thread
+        Returns:
+            Dict: Estado, mensagem de status e contadores da campanha
+        """
+        progress = dict(self.sender.progress)
+        progress["counts"] = dict(progress.get("counts", {}))
+        progress["summary"] = dict(progress.get("summary", {}))
+        return {
+            "job_id": self.job_id,
+            "filename": self.filename,
+            "state": self.state,
+            "status_message": self.status_message,
+            "submitted_at": self.submitted_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            **progress,
+        }
+
+
+class CampaignRunner:
+    def __init__(self):
+        """Fila de campanhas executadas uma a uma por uma thread em segundo plano"""
+        self._jobs = {}
+        self._queue = queue.Queue()
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def _ensure_thread(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._work, name="campaign-worker", daemon=True)
+            self._thread.start()
+
+    def _work(self):
+        while True:
+            job = self._queue.get()
+            try:
+                job.run()
+            finally:
+                self._queue.task_done()
+
+    def submit(self, data: bytes, filename: str, phone_column: str, message_template: str,
+               sender_options: Optional[Dict] = None, process_options: Optional[Dict] = None) -> CampaignJob:
+        """
+        Coloca uma campanha na fila de execução
+        Args:
+            data (bytes): Conteúdo do arquivo de contatos
+            filename (str): Nome do arquivo
+            phone_column (str): Nome da coluna com os números de telefone
+            message_template (str): Template da mensagem
+            sender_options (Dict): Argumentos repassados ao MessageSender
+            process_options (Dict): Argumentos extras de MessageSender.process_file
+        Returns:
+            CampaignJob: Job criado
+        """
+        with self._lock:
+            job = CampaignJob(next(self._ids), data, filename, phone_column, message_template,
+                              sender_options, process_options)
+            self._jobs[job.job_id] = job
+            self._ensure_thread()
+        self._queue.put(job)
+        return job
+
+    def get(self, job_id: int) -> Optional[CampaignJob]:
+        """Retorna o job pelo identificador"""
+        return self._jobs.get(job_id)
+
+    def jobs(self) -> List[CampaignJob]:
+        """Lista os jobs, do mais recente para o mais antigo"""
+        return sorted(self._jobs.values(), key=lambda job: job.job_id, reverse=True)
+
+
+_runner = None
+_runner_lock = threading.Lock()
+
+
+def get_campaign_runner() -> CampaignRunner:
+    """Retorna o executor de campanhas do processo (sobrevive aos reruns do Streamlit)"""
+    global _runner
+    with _runner_lock:
+        if _runner is None:
+            _runner = CampaignRunner()
+        return _runner
@@ -0,0 +1,607 @@
+import itertools
+import json
+import logging
+import os
+import shutil
+import subprocess
+import tempfile
+import threading
+import time
+from typing import Dict, Optional
+from urllib.parse import quote
+from urllib.request import Request, urlopen
+
+import whatsapp_helper as wh
+from metrics import metrics
+from whatsapp_selectors import SelectorHealthError
+
+logger = logging.getLogger(__name__)
+
+# Executáveis procurados no PATH quando chrome_binary não é informado
+CHROME_CANDIDATES = ("google-chrome", "google-chrome-stable", "chromium", "chromium-browser", "chrome")
+
+# Tempo máximo para o Chrome abrir a porta de depuração (segundos)
+LAUNCH_TIMEOUT = 30
+
+# Folga sobre os prazos internos dos scripts ao aguardar a resposta do Chrome (segundos)
+RESPONSE_MARGIN = 5
+
+# Resolve quando check() retorna um valor verdadeiro, reavaliando a cada mutação do DOM
+# (sem polling); resolve null ao fim do prazo
+_WAIT_FOR_JS = """
+const waitFor = (check, timeout) => new Promise(resolve => {
+    const initial = check();
+    if (initial) return resolve(initial);
+    let observer, timer;
+    const finish = value => { observer.disconnect(); clearTimeout(timer); resolve(value); };
+    observer = new MutationObserver(() => { const value = check(); if (value) finish(value); });
+    timer = setTimeout(() => finish(check() || null), timeout);
+    observer.observe(document, {childList: true, subtree: true, attributes: true, characterData: true});
+});
+const find = name => document.querySelector(selectors[name]);
+"""
+
+# Estado da tela inicial: QR code, lista de chats ou null ao fim do prazo
+_AUTH_STATE_JS = """
+async ({selectors, qrTimeout}) => {
+    __WAIT_FOR__
+    return await waitFor(() => (find('chat_list') && 'chat-list') || (find('qrcode') && 'qrcode'), qrTimeout);
+}
+"""
+
+# Aguarda a lista de chats e depois o fim da sincronização (barra de progresso)
+_AUTH_SYNC_JS = """
+async ({selectors, authTimeout, syncTimeout}) => {
+    __WAIT_FOR__
+    if (!await waitFor(() => find('chat_list'), authTimeout)) return null;
+    return (await waitFor(() => !find('sync_progress'), syncTimeout)) ? 'sincronizado' : 'sincronizando';
+}
+"""
+
+# Envio completo em uma única avaliação: abre o chat no app (opcional), insere o texto (ou cola
+# o anexo já guardado na página e escreve a legenda), aguarda o botão, clica e acompanha o
+# balão até o check do servidor
+_SEND_JS = """
+async ({phone, message, attachment, openChat, selectors, switchTimeout, sendTimeout, confirmTimeout, uploadTimeout}) => {
+    __WAIT_FOR__
+    function errorState() { __ERROR_STATE__ }
+    function outgoingState() { __OUTGOING_STATE__ }
+    function openChatLink() { __OPEN_CHAT__ }
+    function chatOpened() { __CHAT_OPENED__ }
+    function pasteAttachment() { __PASTE_ATTACHMENT__ }
+
+    const timings = {};
+    let started = performance.now();
+    const lap = stage => { const now = performance.now(); timings[stage] = (now - started) / 1000; started = now; };
+
+    if (openChat) {
+        openChatLink(phone);
+        const opened = await waitFor(
+            () => errorState(selectors.error_popup) || chatOpened(selectors.composer), switchTimeout
+        );
+        lap('navigate');
+        if (opened === 'sem_whatsapp') return {status: opened, timings};
+        if (!opened) return {fallback: 'chat_switch', timings};
+        if (!attachment) {
+            find('composer').focus();
+            if (!document.execCommand('insertText', false, message)) return {fallback: 'insert_text', timings};
+        }
+    }
+
+    const outgoing = () => outgoingState(before, selectors.outgoing_message, selectors.message_check);
+    let before;
+
+    if (attachment) {
+        const ready = await waitFor(() => errorState(selectors.error_popup) || find('composer'), sendTimeout);
+        if (ready === 'sem_whatsapp') return {status: ready, timings};
+        if (!ready) return {status: 'falhou', timeout: 'send_button', timings};
+        if (!pasteAttachment(attachment, selectors.composer)) return {status: 'falhou', unstaged: true, timings};
+        const caption = await waitFor(() => find('attachment_caption'), sendTimeout);
+        if (!caption) return {status: 'falhou', timeout: 'attachment_caption', timings};
+        if (message) {
+            caption.focus();
+            document.execCommand('insertText', false, message);
+        }
+        const send = await waitFor(() => find('attachment_send'), sendTimeout);
+        lap('attach');
+        if (!send) return {status: 'falhou', timeout: 'attachment_send', timings};
+        before = document.querySelectorAll(selectors.outgoing_message).length;
+        send.click();
+        await waitFor(() => outgoing() === 'enviado', uploadTimeout);
+        lap('attachment_upload');
+        return {status: outgoing() || 'falhou', timings};
+    }
+
+    const button = await waitFor(() => errorState(selectors.error_popup) || find('send_button'), sendTimeout);
+    lap('wait_send_button');
+    if (button === 'sem_whatsapp') return {status: button, timings};
+    if (!button) return {status: 'falhou', timeout: 'send_button', timings};
+
+    before = document.querySelectorAll(selectors.outgoing_message).length;
+    button.click();
+    await waitFor(() => outgoing() === 'enviado', confirmTimeout);
+    lap('confirm');
+    return {status: outgoing() || 'falhou', timings};
+}
+"""
+
+_SEND_JS = (
+    _SEND_JS.replace("__ERROR_STATE__", wh._ERROR_STATE_JS)
+    .replace("__OUTGOING_STATE__", wh._OUTGOING_STATE_JS)
+    .replace("__OPEN_CHAT__", wh._OPEN_CHAT_JS)
+    .replace("__CHAT_OPENED__", wh._CHAT_OPENED_JS)
+    .replace("__PASTE_ATTACHMENT__", wh._PASTE_ATTACHMENT_JS)
+)
+# Guarda o anexo na página e consulta se ele já está lá (ver BaseWhatsAppHelper.stage_attachment)
+_STAGE_ATTACHMENT_JS = """
+({digest, name, mime, data}) => { function stage() { __STAGE_ATTACHMENT__ } return stage(digest, name, mime, data); }
+""".replace("__STAGE_ATTACHMENT__", wh._STAGE_ATTACHMENT_JS)
+_ATTACHMENT_STAGED_JS = """
+({digest}) => { function staged() { __ATTACHMENT_STAGED__ } return staged(digest); }
+""".replace("__ATTACHMENT_STAGED__", wh._ATTACHMENT_STAGED_JS)
+# Clica no OK do popup de erro e aguarda ele sumir; false se continuar aberto
+_DISMISS_POPUP_JS = """
+async ({selectors, timeout}) => {
+    __WAIT_FOR__
+    function errorState() { __ERROR_STATE__ }
+    const button = find('error_popup_button');
+    if (button) button.click();
+    return !!(await waitFor(() => !errorState(selectors.error_popup), timeout));
+}
+""".replace("__ERROR_STATE__", wh._ERROR_STATE_JS)
+# Seletores (da lista informada) sem nenhum elemento na página
+_MISSING_SELECTORS_JS = """
+({selectors, names}) => names.filter(name => !document.querySelector(selectors[name]))
+"""
+
+_AUTH_STATE_JS, _AUTH_SYNC_JS, _SEND_JS, _DISMISS_POPUP_JS = (
+    script.replace("__WAIT_FOR__", _WAIT_FOR_JS)
+    for script in (_AUTH_STATE_JS, _AUTH_SYNC_JS, _SEND_JS, _DISMISS_POPUP_JS)
+)
+
+
+class CDPError(RuntimeError):
+    """Erro retornado pelo Chrome ou conexão de depuração encerrada"""
+
+
+class _EventWaiter:
+    def __init__(self, method: str):
+        self.method = method
+        self.event = threading.Event()
+        self.params = None
+
+    def wait(self, timeout: float) -> Optional[Dict]:
+        """Aguarda o evento; retorna seus parâmetros ou None ao fim do prazo"""
+        return self.params if self.event.wait(timeout) else None
+
+
+class CDPSession:
+    def __init__(self, ws_url: str, timeout: float = 30):
+        """
+        Conexão websocket com uma aba do Chrome (Chrome DevTools Protocol)
+        Args:
+            ws_url (str): Endereço webSocketDebuggerUrl da aba
+            timeout (float): Tempo máximo padrão de resposta de um comando (segundos)
+        """
+        try:
+            import websocket
+        except ImportError as e:
+            raise ImportError(
+                "O backend CDP requer o pacote websocket-client (poetry install -E cdp)"
+            ) from e
+
+        self.timeout = timeout
+        self._ws = websocket.create_connection(ws_url, timeout=timeout, suppress_origin=True)
+        self._ws.settimeout(None)
+        self._ids = itertools.count(1)
+        self._pending = {}
+        self._waiters = []
+        self._lock = threading.Lock()
+        self.closed = False
+        self._reader = threading.Thread(target=self._read, name="cdp-reader", daemon=True)
+        self._reader.start()
+
+    def _read(self):
+        """Despacha respostas para os comandos pendentes e eventos para quem os aguarda"""
+        try:
+            while True:
+                message = json.loads(self._ws.recv())
+                if "id" in message:
+                    with self._lock:
+                        pending = self._pending.pop(message["id"], None)
+                    if pending:
+                        pending[1] = message
+                        pending[0].set()
+                    continue
+                with self._lock:
+                    matched = [w for w in self._waiters if w.method == message.get("method")]
+                    self._waiters = [w for w in self._waiters if w not in matched]
+                for waiter in matched:
+                    waiter.params = message.get("params", {})
+                    waiter.event.set()
+        except Exception as e:
+            if not self.closed:
+                logger.warning(f"Conexão com o Chrome encerrada: {str(e)}")
+        finally:
+            self.closed = True
+            with self._lock:
+                pending, self._pending = list(self._pending.values()), {}
+            for event, _ in pending:
+                event.set()
+
+    def send(self, method: str, params: Optional[Dict] = None, timeout: Optional[float] = None) -> Dict:
+        """
+        Envia um comando e aguarda a resposta
+        Args:
+            method (str): Método do protocolo (ex.: Page.navigate)
+            params (Dict): Parâmetros do método
+            timeout (float): Tempo máximo de resposta (padrão: o da sessão)
+        Returns:
+            Dict: Campo 'result' da resposta
+        """
+        if self.closed:
+            raise CDPError("Conexão com o Chrome encerrada")
+        with self._lock:
+            message_id = next(self._ids)
+            pending = self._pending[message_id] = [threading.Event(), None]
+            self._ws.send(json.dumps({"id": message_id, "method": method, "params": params or {}}))
+        if not pending[0].wait(self.timeout if timeout is None else timeout):
+            with self._lock:
+                self._pending.pop(message_id, None)
+            raise TimeoutError(f"Tempo excedido aguardando resposta de {method}")
+        response = pending[1]
+        if response is None:
+            raise CDPError("Conexão com o Chrome encerrada")
+        if "error" in response:
+            raise CDPError(f"{method}: {response['error'].get('message')}")
+        return response.get("result", {})
+
+    def expect(self, method: str) -> _EventWaiter:
+        """Registra a espera por um evento antes de disparar o comando que o provoca"""
+        waiter = _EventWaiter(method)
+        with self._lock:
+            self._waiters.append(waiter)
+        return waiter
+
+    def call(self, function: str, args: Dict, timeout: Optional[float] = None):
+        """
+        Executa uma função JavaScript (assíncrona ou não) na página e retorna seu valor
+        Args:
+            function (str): Código da função, que recebe args como único argumento
+            args (Dict): Argumentos serializáveis em JSON
+            timeout (float): Tempo máximo de resposta (segundos)
+        Returns:
+            Valor retornado pela função (por valor)
+        """
+        result = self.send("Runtime.evaluate", {
+            "expression": f"({function})({json.dumps(args)})",
+            "awaitPromise": True,
+            "returnByValue": True,
+        }, timeout)
+        if "exceptionDetails" in result:
+            details = result["exceptionDetails"]
+            raise CDPError(details.get("exception", {}).get("description") or details.get("text"))
+        return result.get("result", {}).get("value")
+
+    def close(self):
+        self.closed = True
+        try:
+            self._ws.close()
+        except Exception:
+            pass
+
+
+class CDPWhatsAppHelper(wh.BaseWhatsAppHelper):
+    def __init__(self, headless=False, user_data_dir=None, send_timeout=20, confirm_timeout=10, sync_timeout=30,
+                 navigation=wh.NAVIGATION_APP, chat_switch_timeout=5, base_url=wh.WHATSAPP_URL, chrome_binary=None,
+                 selectors=None, upload_timeout=60, max_chat_switch_fallbacks=wh.MAX_CHAT_SWITCH_FALLBACKS):
+        """
+        Alternativa ao WhatsAppHelper que controla o Chrome direto pelo DevTools Protocol,
+        sem chromedriver: as esperas reagem a mutações do DOM e a eventos da página em vez de
+        polling, e cada envio é uma única avaliação de JavaScript
+        Args:
+            headless (bool): Se True, executa o Chrome em modo headless
+            user_data_dir (str): Diretório do perfil do Chrome (sessão reaproveitada entre execuções);
+                sem ele, um perfil temporário é criado e removido ao fechar
+            send_timeout (int): Tempo máximo de espera pelo botão de enviar (segundos)
+            confirm_timeout (int): Tempo máximo de espera pelo check de envio (segundos)
+            sync_timeout (int): Tempo máximo de espera pela sincronização inicial dos chats (segundos)
+            navigation (str): NAVIGATION_APP ou NAVIGATION_URL (ver WhatsAppHelper)
+            chat_switch_timeout (int): Tempo máximo para abrir o chat dentro do app (segundos)
+            base_url (str): Endereço do WhatsApp Web (ex.: o StandInServer de fake_whatsapp)
+            chrome_binary (str): Executável do Chrome (padrão: GALATEIA_CHROME_BINARY ou o PATH)
+            selectors (SelectorRegistry): Seletores do WhatsApp Web; os scripts usam as alternativas CSS
+            upload_timeout (int): Tempo máximo de espera pelo check de envio de um anexo (segundos)
+            max_chat_switch_fallbacks (int): Falhas seguidas da troca de chat antes de navegar
+                só pela URL (ver WhatsAppHelper)
+        """
+        self.session = None
+        self.process = None
+        self.chrome_binary = chrome_binary or os.getenv("GALATEIA_CHROME_BINARY")
+        self._temp_profile = None
+        super().__init__(headless, user_data_dir, send_timeout, confirm_timeout, sync_timeout, navigation,
+                         chat_switch_timeout, base_url, selectors, upload_timeout, max_chat_switch_fallbacks)
+
+    def _setup_driver(self):
+        """Abre o Chrome com a porta de depuração e conecta à aba principal"""
+        try:
+            binary = self.chrome_binary or next(filter(None, map(shutil.which, CHROME_CANDIDATES)), None)
+            if not binary:
+                raise FileNotFoundError("Chrome não encontrado; informe chrome_binary ou GALATEIA_CHROME_BINARY")
+
+            profile_dir = self.user_data_dir
+            if profile_dir:
+                os.makedirs(profile_dir, exist_ok=True)
+                logger.info(f"Usando perfil persistente do Chrome: {profile_dir}")
+            else:
+                profile_dir = self._temp_profile = tempfile.mkdtemp(prefix="galateia-cdp-")
+            profile_dir = os.path.abspath(profile_dir)
+
+            # O Chrome grava a porta escolhida neste arquivo; remove o de uma execução anterior
+            port_file = os.path.join(profile_dir, "DevToolsActivePort")
+            if os.path.exists(port_file):
+                os.remove(port_file)
+
+            args = [
+                binary,
+                "--remote-debugging-port=0",
+                f"--user-data-dir={profile_dir}",
+                "--no-first-run",
+                "--no-default-browser-check",
+                "--start-maximized",
+                "--disable-notifications",
+                "--disable-gpu",
+            ]
+            if self.headless:
+                args += ["--headless=new", "--window-size=1920,1080"]
+                logger.info("Modo headless ativado")
+            self.process = subprocess.Popen(
+                args + ["about:blank"], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+            )
+
+            port = self._wait_debug_port(port_file)
+            endpoint = f"http://127.0.0.1:{port}"
+            with urlopen(f"{endpoint}/json/list", timeout=5) as response:
+                targets = json.load(response)
+            page = next((target for target in targets if target.get("type") == "page"), None)
+            if page is None:
+                with urlopen(Request(f"{endpoint}/json/new?about:blank", method="PUT"), timeout=5) as response:
+                    page = json.load(response)
+
+            self.session = CDPSession(page["webSocketDebuggerUrl"])
+            self.session.send("Page.enable")
+            logger.info(f"Chrome conectado pelo DevTools Protocol na porta {port}")
+
+        except Exception as e:
+            logger.error(f"Erro ao configurar o Chrome (CDP): {str(e)}")
+            self.close()
+            raise
+
+    def _wait_debug_port(self, port_file: str) -> int:
+        """Aguarda o Chrome gravar a porta de depuração escolhida"""
+        deadline = time.monotonic() + LAUNCH_TIMEOUT
+        while time.monotonic() < deadline:
+            if self.process.poll() is not None:
+                raise CDPError(f"Chrome encerrou durante a inicialização (código {self.process.returncode})")
+            try:
+                with open(port_file, encoding='utf-8') as f:
+                    lines = f.read().splitlines()
+                if len(lines) >= 2:
+                    return int(lines[0])
+            except (OSError, ValueError):
+                pass
+            time.sleep(wh.POLL_INTERVAL)
+        raise CDPError(f"Tempo excedido ({LAUNCH_TIMEOUT}s) aguardando a porta de depuração do Chrome")
+
+    def _navigate(self, url: str, timeout: float) -> bool:
+        """
+        Carrega uma URL na aba e aguarda o evento de carregamento da página
+        Returns:
+            bool: True se a página terminou de carregar dentro do prazo
+        """
+        waiter = self.session.expect("Page.loadEventFired")
+        result = self.session.send("Page.navigate", {"url": url})
+        if result.get("errorText"):
+            raise CDPError(f"Falha ao abrir {url}: {result['errorText']}")
+        return waiter.wait(timeout) is not None
+
+    def _authenticate(self, timeout):
+        """Executa a autenticação (ver authenticate_whatsapp)"""
+        try:
+            if self.is_authenticated():
+                logger.info("WhatsApp Web já autenticado")
+                return True
+
+            logger.info("Iniciando autenticação do WhatsApp Web...")
+            self._navigate(self.base_url, 40)
+
+            logger.info("Aguardando QR code...")
+            state = self.session.call(_AUTH_STATE_JS, {
+                "selectors": self._css(), "qrTimeout": 40 * 1000,
+            }, timeout=40 + RESPONSE_MARGIN)
+            if state is None:
+                logger.error("Tempo excedido aguardando QR code aparecer")
+                return False
+            if state == "chat-list":
+                logger.info("Sessão restaurada do perfil do Chrome, sem QR code")
+                return True
+            logger.info("QR code exibido. Por favor, escaneie com seu celular.")
+
+            logger.info("Aguardando autenticação...")
+            synced = self.session.call(_AUTH_SYNC_JS, {
+                "selectors": self._css(), "authTimeout": timeout * 1000, "syncTimeout": self.sync_timeout * 1000,
+            }, timeout=timeout + self.sync_timeout + RESPONSE_MARGIN)
+            if synced is None:
+                logger.error(f"Tempo excedido ({timeout}s) aguardando autenticação")
+                return False
+            if synced != "sincronizado":
+                logger.warning(f"Sincronização dos chats ainda em andamento após {self.sync_timeout}s")
+            logger.info("WhatsApp Web autenticado com sucesso!")
+            return True
+
+        except Exception as e:
+            logger.error(f"Erro durante autenticação: {str(e)}")
+            return False
+
+    def _css(self) -> Dict[str, str]:
+        """Seletores CSS de cada nome do registro, no formato usado pelos scripts"""
+        return {name: self.selectors.css(name) for name in (
+            "qrcode", "chat_list", "sync_progress", "composer", "send_button",
+            "outgoing_message", "message_check", "error_popup", "error_popup_button", "attachment_caption",
+            "attachment_send",
+        )}
+
+    def _missing_selectors(self, names):
+        return self.session.call(_MISSING_SELECTORS_JS, {"selectors": self._css(), "names": list(names)}, timeout=5)
+
+    def _close_error_popup(self):
+        return self.session.call(_DISMISS_POPUP_JS, {
+            "selectors": self._css(), "timeout": self.chat_switch_timeout * 1000,
+        }, timeout=self.chat_switch_timeout + RESPONSE_MARGIN)
+
+    def _attachment_staged(self, attachment):
+        return self.session.call(_ATTACHMENT_STAGED_JS, {"digest": attachment.digest}, timeout=5)
+
+    def _store_attachment(self, attachment):
+        self.session.call(_STAGE_ATTACHMENT_JS, {
+            "digest": attachment.digest, "name": attachment.name,
+            "mime": attachment.mime, "data": attachment.base64,
+        }, timeout=self.upload_timeout)
+
+    def _run_send(self, phone, message, open_chat, attachment=None):
+        """Executa o script de envio na página (ver _SEND_JS)"""
+        timeout = (self.chat_switch_timeout if open_chat else 0) + self.send_timeout + self.confirm_timeout
+        if attachment is not None:
+            # Espera do campo de texto, da prévia e do upload no lugar do botão e do check
+            self.stage_attachment(attachment)
+            timeout += 2 * self.send_timeout + self.upload_timeout
+        return self.session.call(_SEND_JS, {
+            "phone": phone,
+            "message": message,
+            "attachment": attachment.digest if attachment is not None else None,
+            "openChat": open_chat,
+            "selectors": self._css(),
+            "switchTimeout": self.chat_switch_timeout * 1000,
+            "sendTimeout": self.send_timeout * 1000,
+            "confirmTimeout": self.confirm_timeout * 1000,
+            "uploadTimeout": self.upload_timeout * 1000,
+        }, timeout=timeout + RESPONSE_MARGIN)
+
+    def _send(self, phone, message, attachment=None):
+        """Executa o envio para um número já normalizado (ver send_message_status)"""
+        stage = "navigate"
+        timings = {}
+        try:
+            # Abre o chat dentro do app já carregado; em caso de falha, recarrega pela URL
+            result = None
+            if self.navigation == wh.NAVIGATION_APP and self.is_authenticated():
+                stage = "send_script"
+                result = self._run_send(phone, message, open_chat=True, attachment=attachment)
+                timings.update(result["timings"])
+                if result.get("fallback"):
+                    metrics.inc("fallbacks", stage="chat_switch")
+                    logger.warning(f"Falha ao abrir o chat de {phone} no app ({result['fallback']}), recarregando pela URL")
+                    self._chat_switch_failed()
+                    result = None
+                else:
+                    self._chat_switch_fallbacks = 0
+            if result is None:
+                stage = "navigate"
+                start = time.perf_counter()
+                text = "" if attachment else message
+                loaded = self._navigate(f"{self.base_url}/send?phone={phone}&text={quote(text)}", self.send_timeout)
+                timings["navigate"] = timings.get("navigate", 0.0) + time.perf_counter() - start
+                if not loaded:
+                    metrics.inc("timeouts", cause=stage)
+                    logger.error(f"Tempo excedido ao tentar enviar mensagem para {phone}")
+                    return wh.STATUS_FAILED
+                stage = "send_script"
+                result = self._run_send(phone, message, open_chat=False, attachment=attachment)
+                timings.update(result["timings"])
+
+            status = result["status"]
+            if result.get("timeout"):
+                metrics.inc("timeouts", cause=result["timeout"])
+                logger.error(f"Tempo excedido ao tentar enviar mensagem para {phone}")
+                self._verify_chat_selectors()
+            elif status != wh.STATUS_NOT_ON_WHATSAPP:
+                self._log_confirmation(phone, status)
+            return status
+
+        except SelectorHealthError:
+            raise
+        except TimeoutError:
+            metrics.inc("timeouts", cause=stage)
+            logger.error(f"Tempo excedido ao tentar enviar mensagem para {phone}")
+            return wh.STATUS_FAILED
+        except Exception as e:
+            metrics.inc("errors", stage=stage)
+            logger.error(f"Erro ao enviar mensagem para {phone}: {str(e)}")
+            return wh.STATUS_FAILED
+        finally:
+            # Etapas medidas dentro da página, com os mesmos nomes do WhatsAppHelper
+            for name, seconds in timings.items():
+                metrics.observe(name, seconds)
+
+    def reload_page(self):
+        """Recarrega o WhatsApp Web na mesma aba, liberando a memória acumulada pela página"""
+        self._navigate(self.base_url, 40)
+
+    def restart(self):
+        """Fecha o Chrome e abre outro com as mesmas opções (o perfil em disco mantém o login)"""
+        self.close()
+        with metrics.timer("setup_driver"):
+            self._setup_driver()
+
+    def browser_pid(self):
+        """
+        Processo do Chrome
+        Returns:
+            int: PID, ou None se o Chrome não estiver aberto
+        """
+        return self.process.pid if self.process else None
+
+    def is_alive(self):
+        """
+        Verifica se o navegador ainda responde
+        Returns:
+            bool: True se o Chrome está ativo
+        """
+        if not self.session or self.session.closed or self.process.poll() is not None:
+            return False
+        try:
+            self.session.call("() => 1", {}, timeout=5)
+            return True
+        except Exception:
+            return False
+
+    def is_authenticated(self):
+        """
+        Verifica, sem recarregar a página, se a lista de chats já está visível
+        Returns:
+            bool: True se o WhatsApp Web está autenticado
+        """
+        try:
+            return bool(self.session.call(
+                "({baseUrl, chatList}) => location.href.startsWith(baseUrl) && !!document.querySelector(chatList)",
+                {"baseUrl": self.base_url, "chatList": self.selectors.css("chat_list")}, timeout=5
+            ))
+        except Exception:
+            return False
+
+    def close(self):
+        """Fecha o navegador"""
+        if self.session:
+            self.session.close()
+            self.session = None
+        if self.process:
+            self.process.terminate()
+            try:
+                self.process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+            self.process = None
+            logger.info("Navegador fechado")
+        if self._temp_profile:
+            shutil.rmtree(self._temp_profile, ignore_errors=True)
+            self._temp_profile = None
@@ -0,0 +1,234 @@
+"""
+Execução de campanhas pela linha de comando, sem a interface Streamlit (cron, systemd)
+
+Uso:
+    galateia-bot contatos.csv --phone-column telefone --template-file mensagem.txt --headless
+    galateia-bot contatos.xlsx --phone-column telefone --message "Olá {nome}!" --check
+    galateia-bot contatos.csv --phone-column telefone --template-file mensagem.txt --per-hour 120 --dry-run
+    galateia-bot contatos.csv --phone-column telefone --template-file mensagem.txt --resume campanha_20240601_220000
+    galateia-bot contatos.csv --phone-column telefone --message "Olá {nome}!" --links --format parquet
+
+Os módulos pesados (pandas, Selenium) só são importados depois da leitura dos argumentos:
+--help responde de imediato e --check não carrega o navegador.
+"""
+import argparse
+import logging
+import os
+import signal
+import sys
+
+logger = logging.getLogger("galateia-bot")
+
+# Códigos de saída
+EXIT_OK = 0
+EXIT_FAILED = 1        # Arquivo, template ou autenticação inválidos, ou erro durante o envio
+EXIT_INTERRUPTED = 3   # Campanha interrompida por sinal; pode ser retomada com --resume
+
+
+def parse_hours(value: str):
+    """Converte '22-8' em (22, 8)"""
+    try:
+        start, end = (int(part) for part in value.split("-"))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"Horário inválido (use INICIO-FIM, ex.: 22-8): {value}")
+    if not (0 <= start < 24 and 0 <= end < 24):
+        raise argparse.ArgumentTypeError(f"Horas devem estar entre 0 e 23: {value}")
+    return start, end
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="galateia-bot", description="Envio de mensagens em lote pelo WhatsApp Web")
+    parser.add_argument("file", help="Arquivo de contatos (CSV ou Excel)")
+    parser.add_argument("--phone-column", required=True, help="Coluna com os números de telefone")
+    template = parser.add_mutually_exclusive_group(required=True)
+    template.add_argument("--template-file", help="Arquivo com o template da mensagem ({coluna} para personalizar)")
+    template.add_argument("--message", help="Template da mensagem")
+    parser.add_argument("--attachment", help="Arquivo enviado a todos os contatos (a mensagem vira a legenda)")
+
+    policy = parser.add_argument_group("ritmo de envio")
+    policy.add_argument("--delay", type=float, default=30, help="Intervalo entre envios (segundos)")
+    policy.add_argument("--per-minute", type=int, help="Máximo de envios por minuto")
+    policy.add_argument("--per-hour", type=int, help="Máximo de envios por hora")
+    policy.add_argument("--quiet-hours", type=parse_hours, help="Horário sem envios, ex.: 22-8")
+
+    campaign = parser.add_argument_group("campanha")
+    campaign.add_argument("--campaign-id", help="Identificador da campanha (padrão: gerado pela data/hora)")
+    campaign.add_argument("--resume", metavar="CAMPAIGN_ID", help="Retoma a campanha a partir da última linha registrada")
+    campaign.add_argument("--format", choices=("csv", "parquet"), default="csv",
+                          help="Formato do relatório (ou do arquivo de links)")
+    campaign.add_argument("--reports-dir", help="Diretório dos relatórios e do diário (padrão: ./reports)")
+    campaign.add_argument("--batch-size", type=int, help="Contatos lidos por lote")
+    campaign.add_argument("--check", action="store_true",
+                          help="Apenas valida arquivo, coluna, template e números, sem abrir o navegador")
+    campaign.add_argument("--dry-run", action="store_true",
+                          help="Simula a campanha sem navegador e estima duração, término e mensagens por hora")
+    campaign.add_argument("--links", action="store_true",
+                          help="Gera links click-to-chat (api.whatsapp.com/send) em vez de enviar, sem abrir o navegador")
+    campaign.add_argument("--output", help="Arquivo de links gerado com --links (padrão: reports/whatsapp_links_<data>)")
+
+    browser = parser.add_argument_group("navegador")
+    browser.add_argument("--headless", action="store_true", help="Executa o Chrome sem interface gráfica")
+    browser.add_argument("--profile", help="Perfil do Chrome que mantém a sessão (padrão: perfil temporário)")
+    browser.add_argument("--backend", choices=("selenium", "cdp"), default="selenium", help="Backend de automação")
+    browser.add_argument("--auth-timeout", type=int, default=120, help="Tempo máximo de autenticação (segundos)")
+
+    parser.add_argument("--log-level", default="INFO", choices=("DEBUG", "INFO", "WARNING", "ERROR"))
+    return parser
+
+
+def read_template(args) -> str:
+    if args.message is not None:
+        return args.message
+    with open(args.template_file, encoding='utf-8') as f:
+        return f.read().strip()
+
+
+def validate(args, message_template: str) -> bool:
+    """
+    Valida o arquivo e conta os números por status, sem abrir o navegador
+    Returns:
+        bool: True se a campanha pode ser enviada
+    """
+    from contact_reader import DEFAULT_BATCH_SIZE, count_rows, iter_normalized_batches, read_columns
+    from attachments import Attachment
+    from message_template import MessageTemplate
+    from number_cache import InvalidNumberCache
+    from phone_utils import STATUS_DUPLICATE, STATUS_INVALID, STATUS_VALID
+
+    columns = read_columns(args.file)
+    if args.phone_column not in columns:
+        logger.error(f"Coluna {args.phone_column} não encontrada (colunas: {', '.join(columns)})")
+        return False
+    template = MessageTemplate(message_template)
+    missing = template.missing_fields(columns)
+    if missing:
+        logger.error(f"Campos do template não encontrados no arquivo: {', '.join(missing)}")
+        return False
+    if args.attachment:
+        attachment = Attachment.from_path(args.attachment)
+        logger.info(f"Anexo válido: {attachment.name} ({attachment.mime}, {attachment.size} bytes)")
+
+    reports_dir = args.reports_dir or os.path.join(os.getcwd(), "reports")
+    invalid_cache = InvalidNumberCache(os.path.join(reports_dir, "invalid_numbers.json"))
+    statuses = (STATUS_VALID, STATUS_INVALID, STATUS_DUPLICATE)
+    summary = dict.fromkeys(statuses, 0)
+    batches = iter_normalized_batches(args.file, args.phone_column, summary,
+                                      batch_size=args.batch_size or DEFAULT_BATCH_SIZE, invalid_cache=invalid_cache)
+    for _ in batches:
+        pass
+    # Demais chaves: números recusados em campanhas anteriores, pelo motivo registrado no cache
+    known = sum(count for status, count in summary.items() if status not in statuses)
+
+    logger.info(
+        f"{count_rows(args.file)} contatos | válidos: {summary[STATUS_VALID]} | "
+        f"inválidos: {summary[STATUS_INVALID]} | duplicados: {summary[STATUS_DUPLICATE]} | "
+        f"sem WhatsApp (campanhas anteriores): {known}"
+    )
+    return summary[STATUS_VALID] > 0
+
+
+def create_sender(args):
+    """MessageSender configurado pelos argumentos"""
+    from message_sender import MessageSender
+    from send_scheduler import RatePolicy
+
+    sender = MessageSender(
+        delay=args.delay, headless=args.headless, user_data_dir=args.profile, auth_timeout=args.auth_timeout,
+        rate_policy=RatePolicy(interval=args.delay, per_minute=args.per_minute, per_hour=args.per_hour,
+                               quiet_hours=args.quiet_hours),
+        helper_options={"backend": args.backend}, reports_dir=args.reports_dir
+    )
+    sender.set_status_callback(logger.info)
+    return sender
+
+
+def dry_run(args, message_template: str) -> int:
+    """Simula a campanha e exibe a projeção; retorna o código de saída"""
+    from campaign_planner import format_duration
+
+    options = {"attachment": args.attachment}
+    if args.batch_size:
+        options["batch_size"] = args.batch_size
+    plan = create_sender(args).dry_run(args.file, args.phone_column, message_template, **options)
+    if plan is None:
+        return EXIT_FAILED
+    logger.info(
+        f"{plan.total_rows} linhas | envios: {plan.sends} | "
+        + " | ".join(f"{status}: {count}" for status, count in {**plan.summary, **plan.issues}.items() if count)
+    )
+    logger.info(
+        f"Duração estimada: {format_duration(plan.duration_seconds)} | término: {plan.finish_at:%d/%m/%Y %H:%M} | "
+        f"{plan.messages_per_hour:.0f} msg/h | {plan.send_seconds:.1f}s por envio | "
+        f"preparação: {format_duration(plan.prepare_seconds)}"
+    )
+    for warning in plan.warnings():
+        logger.warning(warning)
+    for row in plan.flagged:
+        logger.info(f"Linha {row['index']}: {row['phone']} ({row['status']})")
+    return EXIT_OK if plan.sends else EXIT_FAILED
+
+
+def run(args, message_template: str) -> int:
+    """Envia a campanha; retorna o código de saída"""
+    sender = create_sender(args)
+
+    interrupted = []
+
+    def stop(signum, frame):
+        # O envio em andamento termina e a campanha fica registrada para retomada
+        logger.warning("Sinal recebido: interrompendo a campanha após o envio em andamento")
+        interrupted.append(signum)
+        sender.stop_event.set()
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+
+    options = {"report_format": args.format, "campaign_id": args.resume or args.campaign_id,
+               "resume": bool(args.resume), "attachment": args.attachment}
+    if args.batch_size:
+        options["batch_size"] = args.batch_size
+    sender.process_file(args.file, args.phone_column, message_template, **options)
+
+    # Sem relatório (ex.: falha ao gravar) a campanha ainda conta como enviada: os envios ficam no diário
+    if not sender.progress.get("finished"):
+        return EXIT_FAILED
+    return EXIT_INTERRUPTED if interrupted else EXIT_OK
+
+
+def export_links(args, message_template: str) -> int:
+    """Gera o arquivo de links; retorna o código de saída"""
+    sender = create_sender(args)
+    options = {"output_format": args.format, "output_path": args.output}
+    if args.batch_size:
+        options["batch_size"] = args.batch_size
+    return EXIT_OK if sender.export_links(args.file, args.phone_column, message_template, **options) else EXIT_FAILED
+
+
+def main(argv=None) -> int:
+    args = build_parser().parse_args(argv)
+    logging.basicConfig(level=getattr(logging, args.log_level), format="%(asctime)s %(levelname)s %(message)s")
+
+    try:
+        if args.format == "parquet" and not (args.check or args.dry_run):
+            from campaign_journal import check_report_format
+
+            # Antes de ler o arquivo ou abrir o navegador
+            check_report_format(args.format)
+        message_template = read_template(args)
+        if args.check:
+            return EXIT_OK if validate(args, message_template) else EXIT_FAILED
+        if args.dry_run:
+            return dry_run(args, message_template)
+        if args.links:
+            return export_links(args, message_template)
+        return run(args, message_template)
+    except (OSError, ValueError) as e:
+        logger.error(str(e))
+        return EXIT_FAILED
+    except Exception as e:
+        logger.exception(f"Campanha interrompida: {str(e)}")
+        return EXIT_FAILED
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,194 @@
+import os
+from itertools import islice
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+import pandas as pd
+
+from metrics import metrics
+from phone_utils import STATUS_VALID, normalize_phones, summarize_phones
+
+# Quantidade de linhas entregues por lote ao loop de envio
+DEFAULT_BATCH_SIZE = 5000
+
+
+def _is_excel(source, filename: Optional[str] = None) -> bool:
+    """Verifica pela extensão se a fonte é uma planilha Excel"""
+    name = filename or getattr(source, "name", None) or (source if isinstance(source, str) else "")
+    return str(name).lower().endswith(".xlsx")
+
+
+def _rewind(source):
+    """Volta ao início quando a fonte é um buffer em memória"""
+    if hasattr(source, "seek"):
+        source.seek(0)
+    return source
+
+
+def _open_sheet(source):
+    """Abre a primeira aba da planilha em modo somente leitura"""
+    from openpyxl import load_workbook
+
+    workbook = load_workbook(_rewind(source), read_only=True, data_only=True)
+    return workbook, workbook.worksheets[0]
+
+
+def read_columns(source, filename: Optional[str] = None) -> List[str]:
+    """
+    Lê apenas o cabeçalho do arquivo de contatos
+    Args:
+        source: Caminho do arquivo ou buffer (ex.: arquivo enviado pelo Streamlit)
+        filename (str): Nome do arquivo, usado para identificar o formato
+    Returns:
+        List[str]: Nomes das colunas
+    """
+    if _is_excel(source, filename):
+        workbook, sheet = _open_sheet(source)
+        try:
+            header = next(sheet.iter_rows(max_row=1, values_only=True), ())
+        finally:
+            workbook.close()
+        return [str(value) for value in header if value is not None]
+    return [str(col) for col in pd.read_csv(_rewind(source), nrows=0).columns]
+
+
+def count_rows(source, filename: Optional[str] = None) -> Optional[int]:
+    """
+    Estima o total de registros sem carregar o arquivo na memória
+    Args:
+        source: Caminho do arquivo ou buffer
+        filename (str): Nome do arquivo, usado para identificar o formato
+    Returns:
+        int: Total de registros (sem o cabeçalho) ou None se não for possível estimar
+    """
+    if _is_excel(source, filename):
+        workbook, sheet = _open_sheet(source)
+        try:
+            return max(sheet.max_row - 1, 0) if sheet.max_row else None
+        finally:
+            workbook.close()
+
+    lines = 0
+    last = b"\n"
+    stream = open(source, "rb") if isinstance(source, (str, os.PathLike)) else _rewind(source)
+    try:
+        for block in iter(lambda: stream.read(1 << 20), b""):
+            if isinstance(block, str):
+                block = block.encode()
+            lines += block.count(b"\n")
+            last = block[-1:]
+    finally:
+        if stream is not source:
+            stream.close()
+        _rewind(source)
+    if last != b"\n":
+        lines += 1
+    return max(lines - 1, 0)
+
+
+def iter_contact_batches(
+    source,
+    filename: Optional[str] = None,
+    usecols: Optional[Sequence[str]] = None,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+) -> Iterator[pd.DataFrame]:
+    """
+    Lê o arquivo de contatos em lotes, sem carregá-lo inteiro na memória
+    Args:
+        source: Caminho do arquivo ou buffer
+        filename (str): Nome do arquivo, usado para identificar o formato
+        usecols (Sequence[str]): Colunas a carregar (None carrega todas)
+        batch_size (int): Quantidade de linhas por lote
+    Returns:
+        Iterator[pd.DataFrame]: Lotes com valores como texto (células vazias viram "") e
+            índice contínuo entre os lotes (posição da linha no arquivo)
+    """
+    usecols = list(dict.fromkeys(usecols)) if usecols else None
+
+    if not _is_excel(source, filename):
+        reader = pd.read_csv(_rewind(source), usecols=usecols, dtype=str, chunksize=batch_size)
+        with reader:
+            for batch in reader:
+                yield batch.fillna("")
+        return
+
+    workbook, sheet = _open_sheet(source)
+    try:
+        rows = sheet.iter_rows(values_only=True)
+        header = [str(value) if value is not None else "" for value in next(rows, ())]
+        columns = usecols or [name for name in header if name]
+        missing = [name for name in columns if name not in header]
+        if missing:
+            raise ValueError(f"Colunas não encontradas: {', '.join(missing)}")
+        positions = [header.index(name) for name in columns]
+
+        start = 0
+        while True:
+            batch = [
+                [row[pos] if pos < len(row) else None for pos in positions]
+                for row in islice(rows, batch_size)
+            ]
+            if not batch:
+                break
+            df = pd.DataFrame(batch, columns=columns, index=pd.RangeIndex(start, start + len(batch)), dtype=object)
+            yield df.astype(str).where(df.notna(), "")
+            start += len(batch)
+    finally:
+        workbook.close()
+
+
+def iter_normalized_batches(
+    source,
+    phone_column: str,
+    summary: Dict[str, int],
+    fields: Sequence[str] = (),
+    filename: Optional[str] = None,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    invalid_cache=None,
+) -> Iterator[Tuple[pd.DataFrame, pd.DataFrame]]:
+    """
+    Lê o arquivo em lotes com os números normalizados, sem repetição entre os lotes
+    Args:
+        source: Caminho do arquivo ou buffer
+        phone_column (str): Nome da coluna com os números de telefone
+        summary (Dict[str, int]): Contagem de números por status (atualizada no lugar); os
+            números encontrados no cache são contados pelo motivo registrado
+        fields (Sequence[str]): Demais colunas a carregar (ex.: campos do template)
+        filename (str): Nome do arquivo, quando source for um buffer
+        batch_size (int): Quantidade de contatos lidos por lote
+        invalid_cache (InvalidNumberCache): Números que o WhatsApp já recusou
+    Returns:
+        Iterator[Tuple[pd.DataFrame, pd.DataFrame]]: Cada lote lido e o resultado de
+            normalize_phones, em que os números do cache recebem o motivo como status
+    """
+    seen = set()
+    for batch in iter_contact_batches(source, filename, usecols=[phone_column, *fields], batch_size=batch_size):
+        with metrics.timer("normalize_phones"):
+            normalized = normalize_phones(batch[phone_column], seen)
+        for status, count in summarize_phones(normalized).items():
+            if status in summary:
+                summary[status] += count
+        if invalid_cache is not None and len(invalid_cache):
+            valid = normalized["status"] == STATUS_VALID
+            known = invalid_cache.lookup(normalized.loc[valid, "phone"]).dropna()
+            normalized.loc[known.index, "status"] = known
+            summary[STATUS_VALID] -= len(known)
+            for reason, count in known.value_counts().items():
+                summary[reason] = summary.get(reason, 0) + int(count)
+        yield batch, normalized
+
+
+def read_preview(source, filename: Optional[str] = None, rows: int = 5) -> pd.DataFrame:
+    """
+    Lê as primeiras linhas do arquivo para visualização
+    Args:
+        source: Caminho do arquivo ou buffer
+        filename (str): Nome do arquivo, usado para identificar o formato
+        rows (int): Quantidade de linhas
+    Returns:
+        pd.DataFrame: Primeiras linhas do arquivo
+    """
+    batch = next(iter_contact_batches(source, filename, batch_size=rows), None)
+    if batch is None:
+        return pd.DataFrame(columns=read_columns(source, filename))
+    return batch
+
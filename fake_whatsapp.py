@@ -0,0 +1,376 @@
+"""
+Simuladores do WhatsApp Web para testes e benchmarks sem celular nem internet:
+
+- FakeWhatsAppDriver: driver em memória que implementa o subconjunto da API do
+  Selenium usado pelo WhatsAppHelper (get, find_element(s), execute_script, quit)
+- StandInServer: página HTML/JS servida em localhost que reproduz os estados de
+  QR code, lista de chats, composição e erro, para uso com um Chrome de verdade
+"""
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Iterable, Optional
+from urllib.parse import parse_qs, unquote, urlparse
+
+from selenium.common.exceptions import NoSuchElementException, WebDriverException
+from selenium.webdriver.common.keys import Keys
+
+import whatsapp_helper as wh
+from whatsapp_selectors import SelectorRegistry, get_selector_registry
+
+FAKE_URL = "http://fake.whatsapp.local"
+
+# Latências simuladas por etapa (segundos)
+DEFAULT_LATENCIES = {
+    "qr": 0.0,           # Tempo até o QR code ser "escaneado"
+    "page_load": 0.0,    # Recarga completa da página (driver.get)
+    "chat_switch": 0.0,  # Troca de chat dentro do app
+    "send_button": 0.0,  # Botão de enviar aparece após abrir o chat
+    "confirm": 0.0,      # Check do servidor após o clique
+    "upload": 0.0,       # Upload de um anexo até o check do servidor
+}
+
+
+class FakeElement:
+    def __init__(self, driver: "FakeWhatsAppDriver", name: str):
+        self.driver = driver
+        self.name = name
+
+    def click(self):
+        self.driver._click(self.name)
+
+    def send_keys(self, *keys):
+        # Shift+Enter quebra a linha no campo de texto; demais teclas especiais são ignoradas
+        if keys == (Keys.SHIFT, Keys.ENTER):
+            self.driver._type("\n")
+            return
+        self.driver._type("".join(key for key in keys if key not in (Keys.SHIFT, Keys.ENTER)))
+
+
+class FakeWhatsAppDriver:
+    def __init__(self, base_url: str = FAKE_URL, latencies: Optional[Dict[str, float]] = None,
+                 invalid_numbers: Iterable[str] = (), logged_in: bool = True,
+                 selectors: Optional[SelectorRegistry] = None):
+        """
+        Driver em memória que simula o WhatsApp Web
+        Args:
+            base_url (str): Endereço simulado (use o mesmo base_url no WhatsAppHelper)
+            latencies (Dict[str, float]): Latências por etapa (ver DEFAULT_LATENCIES)
+            invalid_numbers (Iterable[str]): Números que exibem o popup de número inválido
+            logged_in (bool): Se False, exibe o QR code antes da lista de chats
+            selectors (SelectorRegistry): Seletores reconhecidos (use o mesmo registro do WhatsAppHelper)
+        """
+        self.base_url = base_url
+        self.latencies = {**DEFAULT_LATENCIES, **(latencies or {})}
+        self.invalid_numbers = set(invalid_numbers)
+        self.logged_in = logged_in
+        self._current_url = "about:blank"
+        self.loaded_at = None
+        self.chat = None
+        self.chat_token = None
+        self.chat_ready_at = None
+        self.error_popup = False
+        self.composer = ""
+        self.outgoing = {}  # Telefone -> [(texto, horário do check)]
+        self.sent = []      # (telefone, texto) de cada clique em enviar, para conferência
+        self.attachments = {}  # Hash -> nome dos anexos guardados na página (perdidos ao recarregar)
+        self.transfers = 0     # Quantas vezes um anexo foi transferido para a página
+        self.preview = None    # Hash do anexo na prévia de envio
+        self.caption = ""
+        self._previous_token = None
+        self.alive = True
+        # Seletor do registro -> nome do elemento simulado
+        self.selectors = selectors or get_selector_registry()
+        self._elements = {
+            locator: name
+            for name in ("qrcode", "chat_list", "sync_progress", "send_button", "outgoing_message", "composer",
+                         "attachment_caption", "attachment_send", "error_popup_button")
+            for locator in self.selectors.locators(name)
+        }
+
+    # --- API do Selenium ---
+
+    @property
+    def current_url(self) -> str:
+        """Endereço da aba; como no Selenium, falha depois que a sessão foi encerrada"""
+        self._check_alive()
+        return self._current_url
+
+    def get(self, url: str):
+        self._check_alive()
+        time.sleep(self.latencies["page_load"])
+        self._current_url = url
+        self.loaded_at = time.monotonic()
+        self.chat = None
+        self.error_popup = False  # A recarga descarta o popup, como no WhatsApp Web
+        self.composer = ""
+        self.attachments = {}
+        parsed = urlparse(url)
+        if parsed.path.rstrip("/") == "/send":
+            query = parse_qs(parsed.query)
+            self._open_chat(query.get("phone", [""])[0])
+            self.composer = unquote(query.get("text", [""])[0])
+
+    def find_elements(self, by: str, value: str):
+        self._check_alive()
+        now = time.monotonic()
+        name = self._elements.get((by, value))
+        if name == "qrcode":
+            return [FakeElement(self, "qrcode")] if self._page_loaded() and not self._authenticated(now) else []
+        if name == "chat_list":
+            return [FakeElement(self, "chat-list")] if self._authenticated(now) else []
+        if name == "send_button":
+            ready = self._chat_ready(now) and self.composer and now >= self.chat_ready_at + self.latencies["send_button"]
+            return [FakeElement(self, "send")] if ready else []
+        if name == "outgoing_message":
+            return [FakeElement(self, "bubble") for _ in self.outgoing.get(self.chat, [])]
+        if name == "composer":
+            return [FakeElement(self, "composer")] if self._chat_ready(now) else []
+        if name == "attachment_caption":
+            return [FakeElement(self, "caption")] if self.preview else []
+        if name == "attachment_send":
+            return [FakeElement(self, "attachment-send")] if self.preview else []
+        if name == "error_popup_button":
+            return [FakeElement(self, "popup-ok")] if self.error_popup else []
+        return []
+
+    def find_element(self, by: str, value: str):
+        elements = self.find_elements(by, value)
+        if not elements:
+            raise NoSuchElementException(f"Elemento não encontrado: {value}")
+        return elements[0]
+
+    def execute_script(self, script: str, *args):
+        self._check_alive()
+        now = time.monotonic()
+        if script == wh._ERROR_STATE_JS:
+            return wh.STATUS_NOT_ON_WHATSAPP if self.error_popup else None
+        if script == wh._DISMISS_POPUP_JS:
+            popup, self.error_popup = self.error_popup, False
+            return popup
+        if script == wh._OPEN_CHAT_JS:
+            self._previous_token = self.chat_token
+            self._open_chat(args[0], self.latencies["chat_switch"])
+            return None
+        if script == wh._CHAT_OPENED_JS:
+            return self._chat_ready(now) and self.chat_token is not self._previous_token
+        if script == wh._OUTGOING_STATE_JS:
+            bubbles = self.outgoing.get(self.chat, [])
+            if len(bubbles) <= args[0]:
+                return None
+            return wh.STATUS_SENT if now >= bubbles[-1][1] else wh.STATUS_PENDING
+        if script == wh._STAGE_ATTACHMENT_JS:
+            self.attachments[args[0]] = args[1]
+            self.transfers += 1
+            return len(args[3]) * 3 // 4
+        if script == wh._ATTACHMENT_STAGED_JS:
+            return args[0] in self.attachments
+        if script == wh._PASTE_ATTACHMENT_JS:
+            if args[0] not in self.attachments or not self._chat_ready(now):
+                return False
+            self.preview = args[0]
+            self.caption = ""
+            return True
+        if "insertText" in script:
+            if self.preview:
+                self.caption += args[1]
+            else:
+                self._type(args[1])
+            return True
+        if script.strip() == "return 1":
+            return 1
+        return None
+
+    def quit(self):
+        self.alive = False
+
+    # --- Estado simulado ---
+
+    def _check_alive(self):
+        if not self.alive:
+            raise WebDriverException("Sessão do navegador encerrada")
+
+    def _page_loaded(self) -> bool:
+        return self.loaded_at is not None and self._current_url.startswith(self.base_url)
+
+    def _authenticated(self, now: float) -> bool:
+        if not self._page_loaded():
+            return False
+        return self.logged_in or now >= self.loaded_at + self.latencies["qr"]
+
+    def _chat_ready(self, now: float) -> bool:
+        return self.chat is not None and not self.error_popup and now >= self.chat_ready_at
+
+    def _open_chat(self, phone: str, delay: float = 0.0):
+        self.composer = ""
+        self.preview = None
+        if phone in self.invalid_numbers:
+            self.error_popup = True
+            self.chat = None
+            return
+        # O popup de um número anterior continua na tela até alguém clicar em OK
+        self.chat = phone
+        # Cada abertura gera um painel novo, como o #main do WhatsApp Web
+        self.chat_token = object()
+        self.chat_ready_at = time.monotonic() + delay
+
+    def _type(self, text: str):
+        self.composer += text
+
+    def _click(self, name: str):
+        if name == "popup-ok":
+            self.error_popup = False
+        if name == "send" and self.composer:
+            confirmed_at = time.monotonic() + self.latencies["confirm"]
+            self.outgoing.setdefault(self.chat, []).append((self.composer, confirmed_at))
+            self.sent.append((self.chat, self.composer))
+            self.composer = ""
+        if name == "attachment-send" and self.preview:
+            text = f"[{self.attachments[self.preview]}] {self.caption}".rstrip()
+            confirmed_at = time.monotonic() + self.latencies["upload"]
+            self.outgoing.setdefault(self.chat, []).append((text, confirmed_at))
+            self.sent.append((self.chat, text))
+            self.preview = None
+            self.caption = ""
+
+
+_STAND_IN_HTML = """<!DOCTYPE html>
+<html lang="pt-br">
+<head><meta charset="utf-8"><title>WhatsApp Web (simulador)</title></head>
+<body>
+<div id="app"></div>
+<script>
+const config = __CONFIG__;
+const app = document.getElementById('app');
+const sleep = ms => new Promise(resolve => setTimeout(resolve, ms));
+
+function showPopup() {
+    app.querySelector('#main')?.remove();
+    const popup = document.createElement('div');
+    popup.setAttribute('data-animate-modal-popup', 'true');
+    popup.innerHTML = '<span>O número de telefone compartilhado por URL é inválido.</span><button>OK</button>';
+    popup.querySelector('button').onclick = () => popup.remove();
+    app.appendChild(popup);
+}
+
+async function openChat(phone, text) {
+    // O popup de um número anterior continua na tela até alguém clicar em OK
+    app.querySelector('#main')?.remove();
+    await sleep(config.latencies.chat_switch * 1000);
+    if (config.invalid_numbers.includes(phone)) { showPopup(); return; }
+    const main = document.createElement('div');
+    main.id = 'main';
+    main.innerHTML = '<div class="messages"></div><footer><div contenteditable="true"></div></footer>';
+    app.appendChild(main);
+    const composer = main.querySelector('footer div[contenteditable="true"]');
+    composer.innerText = text || '';
+    const refresh = async () => {
+        main.querySelector('button[data-testid="compose-btn-send"]')?.remove();
+        if (!composer.innerText) return;
+        await sleep(config.latencies.send_button * 1000);
+        const button = document.createElement('button');
+        button.setAttribute('data-testid', 'compose-btn-send');
+        button.onclick = async () => {
+            const bubble = document.createElement('div');
+            bubble.className = 'message-out';
+            bubble.innerHTML = '<span class="text"></span><span data-icon="msg-time"></span>';
+            bubble.querySelector('.text').innerText = composer.innerText;
+            main.querySelector('.messages').appendChild(bubble);
+            composer.innerText = '';
+            button.remove();
+            await sleep(config.latencies.confirm * 1000);
+            bubble.querySelector('[data-icon]').setAttribute('data-icon', 'msg-check');
+        };
+        main.querySelector('footer').appendChild(button);
+    };
+    composer.addEventListener('input', refresh);
+    refresh();
+}
+
+async function boot() {
+    await sleep(config.latencies.page_load * 1000);
+    if (!config.logged_in && !sessionStorage.getItem('scanned')) {
+        const qr = document.createElement('div');
+        qr.setAttribute('data-testid', 'qrcode');
+        app.appendChild(qr);
+        await sleep(config.latencies.qr * 1000);
+        qr.remove();
+        sessionStorage.setItem('scanned', '1');
+    }
+    const list = document.createElement('div');
+    list.setAttribute('data-testid', 'chat-list');
+    app.appendChild(list);
+    const params = new URLSearchParams(location.search);
+    if (location.pathname.replace(/\\/$/, '') === '/send') {
+        openChat(params.get('phone') || '', params.get('text') || '');
+    }
+}
+
+// Links wa.me abrem o chat dentro do app, sem recarregar a página
+document.addEventListener('click', event => {
+    const link = event.target.closest && event.target.closest('a[href^="https://wa.me/"]');
+    if (!link) return;
+    event.preventDefault();
+    openChat(link.href.split('/').pop(), '');
+}, true);
+
+boot();
+</script>
+</body>
+</html>
+"""
+
+
+class StandInServer:
+    def __init__(self, port: int = 0, latencies: Optional[Dict[str, float]] = None,
+                 invalid_numbers: Iterable[str] = (), logged_in: bool = True):
+        """
+        Servidor local com uma página que imita o WhatsApp Web
+        Args:
+            port (int): Porta do servidor (0 escolhe uma porta livre)
+            latencies (Dict[str, float]): Latências por etapa (ver DEFAULT_LATENCIES)
+            invalid_numbers (Iterable[str]): Números que exibem o popup de número inválido
+            logged_in (bool): Se False, exibe o QR code antes da lista de chats
+        """
+        config = {
+            "latencies": {**DEFAULT_LATENCIES, **(latencies or {})},
+            "invalid_numbers": list(invalid_numbers),
+            "logged_in": logged_in,
+        }
+        page = _STAND_IN_HTML.replace("__CONFIG__", json.dumps(config)).encode("utf-8")
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                self.send_response(200)
+                self.send_header("Content-Type", "text/html; charset=utf-8")
+                self.send_header("Content-Length", str(len(page)))
+                self.end_headers()
+                self.wfile.write(page)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", port), Handler)
+        self.thread = None
+
+    @property
+    def url(self) -> str:
+        """Endereço a usar como base_url do WhatsAppHelper"""
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "StandInServer":
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
@@ -0,0 +1,91 @@
+import os
+from functools import partial
+from typing import Dict, Iterable, Iterator, Optional
+from urllib.parse import quote
+
+import pandas as pd
+
+from campaign_journal import check_report_format
+from contact_reader import DEFAULT_BATCH_SIZE, iter_normalized_batches
+from message_template import MessageTemplate
+from metrics import metrics
+from number_cache import InvalidNumberCache
+from phone_utils import STATUS_VALID
+
+# Link "click to chat": abre a conversa com a mensagem preenchida, sem automação do navegador
+CLICK_TO_CHAT_URL = "https://api.whatsapp.com/send?phone="
+
+# Colunas do arquivo de links (mesmo formato dos relatórios whatsapp_links_*.csv)
+LINK_COLUMNS = ["phone", "message", "whatsapp_link"]
+
+# Codificação de URL completa: espaços, '&', '#', '/' e acentos (UTF-8) viram %XX
+quote_text = partial(quote, safe="")
+
+
+def iter_link_batches(source, phone_column: str, template: MessageTemplate, summary: Dict[str, int],
+                      filename: Optional[str] = None, batch_size: int = DEFAULT_BATCH_SIZE,
+                      invalid_cache: Optional[InvalidNumberCache] = None) -> Iterator[pd.DataFrame]:
+    """
+    Lê o arquivo em lotes e gera os links de cada lote, com números normalizados e sem repetição
+    Args:
+        source: Caminho do arquivo ou buffer
+        phone_column (str): Nome da coluna com os números de telefone
+        template (MessageTemplate): Template compilado da mensagem
+        summary (Dict[str, int]): Contagem de números por status (atualizada no lugar)
+        filename (str): Nome do arquivo, quando source for um buffer
+        batch_size (int): Quantidade de contatos lidos por lote
+        invalid_cache (InvalidNumberCache): Números que o WhatsApp já recusou, deixados de fora
+    Returns:
+        Iterator[pd.DataFrame]: Lotes com as colunas LINK_COLUMNS (apenas números válidos)
+    """
+    batches = iter_normalized_batches(
+        source, phone_column, summary, template.fields, filename, batch_size, invalid_cache
+    )
+    for batch, normalized in batches:
+        valid = normalized["status"] == STATUS_VALID
+        if not valid.any():
+            continue
+
+        contacts = batch.loc[valid]
+        phones = normalized.loc[valid, "phone"]
+        with metrics.timer("render_links"):
+            messages = template.render(contacts)
+            encoded = template.render(contacts, escape=quote_text)
+            links = CLICK_TO_CHAT_URL + phones + "&text=" + encoded
+        yield pd.DataFrame({"phone": phones, "message": messages, "whatsapp_link": links})
+
+
+def write_links(batches: Iterable[pd.DataFrame], path: str) -> int:
+    """
+    Grava os lotes de links à medida que são gerados, em CSV ou Parquet (pela extensão do arquivo)
+    Args:
+        batches (Iterable[pd.DataFrame]): Lotes gerados por iter_link_batches
+        path (str): Arquivo de destino (.csv ou .parquet)
+    Returns:
+        int: Quantidade de links gravados
+    Raises:
+        ValueError: Se o destino é .parquet e pyarrow não está instalado (conferido antes
+            de consumir o primeiro lote)
+    """
+    check_report_format("parquet" if path.endswith(".parquet") else "csv")
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    written = 0
+
+    if path.endswith(".parquet"):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        schema = pa.schema([(name, pa.string()) for name in LINK_COLUMNS])
+        with pq.ParquetWriter(path, schema) as writer:
+            for batch in batches:
+                writer.write_table(pa.Table.from_pandas(batch, schema=schema, preserve_index=False))
+                written += len(batch)
+        return written
+
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        f.write(",".join(LINK_COLUMNS) + "\n")
+        for batch in batches:
+            batch.to_csv(f, header=False, index=False)
+            written += len(batch)
+    return written
@@ -1,27 +1,128 @@
-import pandas as pd
 from datetime import datetime
-import urllib.parse
-from typing import Optional, List, Dict
-import os
-import csv
-from whatsapp_helper import WhatsAppHelper
+import threading
 import time
+from typing import Optional, List, Dict, Iterator
+import os
+from whatsapp_helper import (
+    DEFAULT_PROFILE_DIR, STATUS_FAILED, STATUS_NOT_ON_WHATSAPP, STATUS_PENDING, STATUS_SENT,
+    WhatsAppHelper, create_helper, get_shared_helper
+)
+from attachments import Attachment
+from browser_watchdog import BrowserRecoveryError, BrowserWatchdog
+from campaign_planner import (
+    DEFAULT_FLAGGED_ROWS, ISSUE_EMPTY, ISSUE_TOO_LONG, MAX_CAPTION_LENGTH, MAX_MESSAGE_LENGTH, CampaignPlan,
+    format_duration, load_latency_history
+)
+from campaign_journal import STATE_INTERRUPTED, STATE_SENDING, CampaignJournal, check_report_format
+from contact_reader import DEFAULT_BATCH_SIZE, iter_normalized_batches, read_columns
+from link_export import iter_link_batches, write_links
+from message_template import MessageTemplate
+from metrics import metrics
+from number_cache import InvalidNumberCache
+from send_scheduler import RateLimiter, RatePolicy, SendScheduler
+from whatsapp_selectors import SelectorHealthError
+from phone_utils import (
+    STATUS_DUPLICATE, STATUS_INVALID, STATUS_VALID, format_phone
+)
+
+# Texto gravado no relatório para cada status de envio
+SEND_STATUS_LABELS = {
+    STATUS_SENT: "Enviado",
+    STATUS_PENDING: "Pendente",
+    STATUS_FAILED: "Erro no envio",
+    STATUS_INVALID: "Erro: Número inválido",
+    STATUS_DUPLICATE: "Erro: Número duplicado",
+    STATUS_NOT_ON_WHATSAPP: "Erro: Número sem WhatsApp",
+    STATE_SENDING: "Enviando",
+    STATE_INTERRUPTED: "Erro: Envio interrompido",
+}
+
+
+def iter_send_tasks(source, phone_column: str, template: MessageTemplate, summary: Dict[str, int],
+                    filename: Optional[str] = None, batch_size: int = DEFAULT_BATCH_SIZE,
+                    invalid_cache: Optional[InvalidNumberCache] = None) -> Iterator[Dict]:
+    """
+    Lê o arquivo em lotes e gera uma tarefa de envio por linha
+    Args:
+        source: Caminho do arquivo ou buffer
+        phone_column (str): Nome da coluna com os números de telefone
+        template (MessageTemplate): Template compilado da mensagem
+        summary (Dict[str, int]): Contagem de números por status (atualizada no lugar)
+        filename (str): Nome do arquivo, quando source for um buffer
+        batch_size (int): Quantidade de contatos lidos por lote
+        invalid_cache (InvalidNumberCache): Números que o WhatsApp já recusou, pulados antes do envio
+    Returns:
+        Iterator[Dict]: Tarefas com 'index', 'phone' e 'message'; números descartados na
+            normalização ou no cache já saem com 'status' (inválido, duplicado ou sem WhatsApp)
+    """
+    batches = iter_normalized_batches(
+        source, phone_column, summary, template.fields, filename, batch_size, invalid_cache
+    )
+    for batch, normalized in batches:
+        valid = normalized["status"] == STATUS_VALID
+        with metrics.timer("render_template"):
+            messages = template.render(batch.loc[valid])
+
+        for index, phone, status in zip(normalized.index, normalized["phone"], normalized["status"]):
+            if status == STATUS_VALID:
+                yield {"index": index, "phone": phone, "message": messages[index], "status": None}
+            else:
+                yield {"index": index, "phone": phone or batch.at[index, phone_column], "message": "", "status": status}
+
 
 class MessageSender:
-    def __init__(self, delay: int = 30):
+    def __init__(self, delay: int = 30, whatsapp: Optional[WhatsAppHelper] = None,
+                 keep_alive: bool = False, user_data_dir: Optional[str] = None, headless: bool = False,
+                 rate_policy: Optional[RatePolicy] = None, auth_timeout: int = 120,
+                 helper_options: Optional[Dict] = None, reports_dir: Optional[str] = None,
+                 rate_limiter: Optional[RateLimiter] = None, watchdog_options: Optional[Dict] = None):
         """
         Inicializa o enviador de mensagens
         Args:
-            delay (int): Tempo de espera entre mensagens em segundos
+            delay (int): Tempo entre o início de dois envios em segundos
+            whatsapp (WhatsAppHelper): Navegador já autenticado a reutilizar (não é fechado ao final)
+            keep_alive (bool): Se True, usa o navegador compartilhado e o mantém aberto entre jobs
+            user_data_dir (str): Perfil do Chrome para manter a sessão (None usa um perfil temporário,
+                exceto com keep_alive, que usa o perfil padrão)
+            headless (bool): Se True, executa o Chrome em modo headless
+            rate_policy (RatePolicy): Limites de envio (padrão: apenas o intervalo de delay)
+            auth_timeout (int): Tempo máximo de espera pela autenticação em segundos
+            helper_options (Dict): Argumentos extras do helper (ex.: backend, base_url, driver_factory)
+            reports_dir (str): Diretório dos relatórios e do diário (padrão: ./reports)
+            rate_limiter (RateLimiter): Limitador compartilhado entre campanhas (ex.: o da conta
+                no SessionPool); substitui o criado a partir de rate_policy
+            watchdog_options (Dict): Argumentos do BrowserWatchdog (ex.: reload_after, max_rss_mb)
         """
         self.delay = delay
+        self.rate_policy = rate_policy or RatePolicy(interval=delay)
+        self.rate_limiter = rate_limiter
         self.status_callback = None
-        self.whatsapp = None
+        self.whatsapp = whatsapp
+        self.keep_alive = keep_alive
+        self.user_data_dir = user_data_dir
+        self.headless = headless
+        self.auth_timeout = auth_timeout
+        self.helper_options = helper_options or {}
+        self.watchdog_options = watchdog_options or {}
+        # Controle externo da execução: stop_event cancela, resume_event desligado pausa
+        self.stop_event = threading.Event()
+        self.resume_event = threading.Event()
+        self.resume_event.set()
+        # Último estado conhecido da campanha, lido por quem acompanha o envio em outra thread
+        self.progress = {}
+        # Só fecha ao final o navegador que este enviador criou
+        self._owns_whatsapp = False
         
         # Diretório para salvar os relatórios
-        self.reports_dir = os.path.join(os.getcwd(), "reports")
+        self.reports_dir = reports_dir or os.path.join(os.getcwd(), "reports")
         if not os.path.exists(self.reports_dir):
             os.makedirs(self.reports_dir)
+        # Diário das campanhas, usado para retomada e geração dos relatórios
+        self.journal_path = os.path.join(self.reports_dir, "campaigns.db")
+        # Últimas métricas de latência, usadas para estimar a duração das próximas campanhas
+        self.metrics_path = os.path.join(self.reports_dir, "metrics.json")
+        # Números recusados pelo WhatsApp em campanhas anteriores
+        self.invalid_cache = InvalidNumberCache(os.path.join(self.reports_dir, "invalid_numbers.json"))
 
     def set_status_callback(self, callback):
         """Define uma função de callback para atualização de status"""
@@ -40,97 +141,355 @@ class MessageSender:
         Returns:
             str: Número formatado ou None se inválido
         """
-        # Remove caracteres não numéricos
-        phone = ''.join(filter(str.isdigit, str(phone)))
-        
-        # Verifica se o número tem pelo menos 10 dígitos
-        if len(phone) < 10:
-            return None
-            
-        # Adiciona código do país se necessário
-        if not phone.startswith('55'):
-            phone = '55' + phone
-            
-        return phone
+        return format_phone(phone)
 
     def initialize_whatsapp(self):
         """Inicializa e autentica o WhatsApp Web"""
-        if self.whatsapp is None:
+        if self.whatsapp is None or (self.keep_alive and not self.whatsapp.is_alive()):
             self._update_status("Iniciando WhatsApp Web...")
-            self.whatsapp = WhatsAppHelper()
-            if not self.whatsapp.authenticate_whatsapp():
-                self._update_status("Erro ao autenticar WhatsApp Web")
-                return False
-            self._update_status("WhatsApp Web autenticado com sucesso!")
-            return True
+            if self.keep_alive:
+                self.whatsapp = get_shared_helper(
+                    headless=self.headless, user_data_dir=self.user_data_dir or DEFAULT_PROFILE_DIR,
+                    **self.helper_options
+                )
+            else:
+                self.whatsapp = create_helper(
+                    headless=self.headless, user_data_dir=self.user_data_dir, **self.helper_options
+                )
+                self._owns_whatsapp = True
+        if not self.whatsapp.authenticate_whatsapp(timeout=self.auth_timeout):
+            self._update_status("Erro ao autenticar WhatsApp Web")
+            return False
+        # Interrompe antes do primeiro envio se a interface mudou
+        self.whatsapp.check_selectors()
+        self._update_status("WhatsApp Web autenticado com sucesso!")
         return True
 
-    def process_file(self, file_path: str, phone_column: str, message_template: str) -> List[Dict]:
+    def process_file(self, file_path, phone_column: str, message_template: str,
+                     filename: Optional[str] = None, batch_size: int = DEFAULT_BATCH_SIZE,
+                     campaign_id: Optional[str] = None, resume: bool = False,
+                     report_format: str = "csv", attachment=None) -> List[Dict]:
         """
         Processa o arquivo e envia as mensagens
         Args:
-            file_path (str): Caminho do arquivo
+            file_path: Caminho do arquivo ou buffer com o conteúdo enviado
             phone_column (str): Nome da coluna com os números de telefone
             message_template (str): Template da mensagem
+            filename (str): Nome do arquivo, quando file_path for um buffer
+            batch_size (int): Quantidade de contatos lidos por lote
+            campaign_id (str): Identificador da campanha no diário (padrão: gerado pela data/hora)
+            resume (bool): Se True, continua a campanha a partir da última linha registrada
+            report_format (str): Formato do relatório exportado ao final ("csv" ou "parquet")
+            attachment: Arquivo enviado a todos os contatos (Attachment ou caminho); a mensagem
+                de cada contato vira a legenda. É lido e validado uma vez e transferido ao
+                navegador uma vez, sendo reaproveitado em todos os envios
         Returns:
-            List[Dict]: Lista com resultados do processamento
+            List[Dict]: Resultado de cada envio feito no navegador ('index', 'phone',
+                'message' e 'status'); o resultado completo fica no diário da campanha
+        Raises:
+            SelectorHealthError: Se a interface do WhatsApp Web não corresponde aos seletores
+            BrowserRecoveryError: Se o navegador caiu e não pôde ser reiniciado
         """
+        journal = None
+        self.progress = {}
         try:
+            # Valida o cabeçalho e o template antes de abrir o navegador
+            columns = read_columns(file_path, filename)
+            if phone_column not in columns:
+                self._update_status(f"Erro: Coluna {phone_column} não encontrada")
+                return []
+            template = MessageTemplate(message_template)
+            missing = template.missing_fields(columns)
+            if missing:
+                self._update_status(f"Erro: Campos não encontrados: {', '.join(missing)}")
+                return []
+            if isinstance(attachment, str):
+                try:
+                    attachment = Attachment.from_path(attachment)
+                except (OSError, ValueError) as e:
+                    self._update_status(f"Erro: Anexo inválido: {str(e)}")
+                    return []
+            try:
+                check_report_format(report_format)
+            except ValueError as e:
+                self._update_status(f"Erro: {str(e)}")
+                return []
+
+            # Relatório prévio: válidos, inválidos, duplicados e sem WhatsApp antes de abrir o navegador
+            summary = self._count_phones(file_path, phone_column, filename, batch_size)
+            total = summary.pop("total")
+            self.progress = {"total": total, "summary": summary, "finished": False}
+            self._report_summary(summary)
+            if not summary[STATUS_VALID]:
+                self._update_status("Erro: Nenhum número válido para envio")
+                return []
+
             # Inicializa WhatsApp Web se ainda não foi feito
             if not self.initialize_whatsapp():
                 return []
 
-            # Lê o arquivo
-            df = pd.read_excel(file_path) if file_path.endswith('.xlsx') else pd.read_csv(file_path)
             results = []
-            total = len(df)
+
+            # Abre o diário da campanha (retomando do ponto em que parou, se pedido)
+            campaign_id = campaign_id or f"campanha_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+            journal = CampaignJournal(self.journal_path)
+            source_name = filename or (file_path if isinstance(file_path, str) else getattr(file_path, "name", ""))
+            journal.start_campaign(campaign_id, source_name, phone_column, message_template)
+            last_row = journal.last_row(campaign_id) if resume else -1
+            processed = last_row + 1
+            counts = {}
+            self.progress = {
+                "campaign_id": campaign_id, "total": total, "processed": processed,
+                "counts": counts, "summary": summary, "last_phone": None, "report_file": None,
+                "finished": False
+            }
+            if last_row >= 0:
+                self._update_status(f"Retomando campanha {campaign_id} a partir da linha {last_row + 1}...")
             
             self._update_status(f"Iniciando processamento de {total} contatos...")
-            
-            # Cria o arquivo de relatório
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            report_file = os.path.join(self.reports_dir, f"report_{timestamp}.csv")
-            
-            with open(report_file, 'w', newline='', encoding='utf-8') as f:
-                writer = csv.writer(f)
-                writer.writerow(['Telefone', 'Status', 'Mensagem'])
+
+            # Supervisiona o navegador: reinicia se ele cair e recicla a aba periodicamente
+            watchdog = BrowserWatchdog(self.whatsapp, auth_timeout=self.auth_timeout, **self.watchdog_options)
+
+            def send(task):
+                journal.mark_sending(campaign_id, task)
+                task["sent_to_browser"] = True
+                return watchdog.send_message_status(task["phone"], task["message"], attachment)
+
+            def on_result(task):
+                nonlocal processed
+                with metrics.timer("report_write"):
+                    journal.record(campaign_id, task)
+                if task.get("sent_to_browser"):
+                    results.append(task)
+                    if task["status"] == STATUS_NOT_ON_WHATSAPP:
+                        self.invalid_cache.add(task["phone"], task["status"])
+                        # Recusado pelo WhatsApp no envio: deixa de contar como válido
+                        summary[STATUS_VALID] -= 1
+                        summary[STATUS_NOT_ON_WHATSAPP] += 1
+                processed += 1
+                # Cache gravado junto com os lotes do diário (save não grava se nada mudou) e no fim
+                if processed % journal.commit_every == 0:
+                    self.invalid_cache.save()
+                counts[task["status"]] = counts.get(task["status"], 0) + 1
+                self.progress.update(processed=processed, last_phone=task["phone"])
                 
-                # Processa cada linha
-                for index, row in df.iterrows():
-                    phone = self._format_phone(row[phone_column])
-                    if not phone:
-                        status = "Erro: Número inválido"
-                        writer.writerow([row[phone_column], status, ""])
-                        continue
+                # Atualiza status
+                if total:
+                    progress = (min(processed, total) / total) * 100
+                    self._update_status(f"Progresso: {progress:.1f}% ({processed}/{total})")
+                else:
+                    self._update_status(f"Progresso: {processed} contatos")
 
-                    # Formata a mensagem
-                    try:
-                        message = message_template.format(**row.to_dict())
-                    except KeyError as e:
-                        status = f"Erro: Campo {str(e)} não encontrado"
-                        writer.writerow([phone, status, ""])
-                        continue
+            # Leitura, normalização e template rodam em pipeline com a espera entre envios; o resumo
+            # já veio do relatório prévio, então a contagem desta passada é descartada
+            tasks = iter_send_tasks(
+                file_path, phone_column, template, dict.fromkeys(summary, 0), filename, batch_size,
+                self.invalid_cache
+            )
+            if last_row >= 0:
+                tasks = (task for task in tasks if task["index"] > last_row)
+            scheduler = SendScheduler(self.rate_policy, stop_event=self.stop_event, resume_event=self.resume_event,
+                                      limiter=self.rate_limiter)
+            if scheduler.run(tasks, send, on_result):
+                journal.finish_campaign(campaign_id)
+            else:
+                self._update_status(f"Campanha {campaign_id} cancelada; use a retomada para continuar")
+
+            self._report_summary(summary)
 
-                    # Envia a mensagem
-                    success = self.whatsapp.send_message(phone, message)
-                    status = "Enviado" if success else "Erro no envio"
-                    writer.writerow([phone, status, message])
-                    
-                    # Atualiza status
-                    progress = ((index + 1) / total) * 100
-                    self._update_status(f"Progresso: {progress:.1f}% ({index + 1}/{total})")
-                    
-                    # Aguarda o delay entre mensagens
-                    if index < total - 1:  # Não espera após o último envio
-                        time.sleep(self.delay)
-
-            self._update_status(f"Processamento concluído! Relatório salvo em: {report_file}")
+            self.progress["finished"] = True
+
+            # Gera o relatório a partir do diário
+            report_file = self._export_report(journal, campaign_id, report_format)
+            self.progress["report_file"] = report_file
+            try:
+                metrics.export_json(self.metrics_path)
+            except OSError as e:
+                self._update_status(f"Aviso: Falha ao gravar as métricas: {str(e)}")
+            if report_file:
+                self._update_status(f"Processamento concluído! Relatório salvo em: {report_file}")
             return results
             
+        except (SelectorHealthError, BrowserRecoveryError) as e:
+            # Falha de interface ou do navegador não se resolve contato a contato: aborta a campanha
+            self._update_status(f"Campanha interrompida: {str(e)}")
+            raise
         except Exception as e:
             self._update_status(f"Erro durante o processamento: {str(e)}")
             return []
         finally:
-            if self.whatsapp:
+            if journal:
+                journal.close()
+            self.invalid_cache.save()
+            if self.whatsapp and self._owns_whatsapp:
                 self.whatsapp.close()
                 self.whatsapp = None
+                self._owns_whatsapp = False
+
+    def _count_phones(self, file_path, phone_column: str, filename: Optional[str] = None,
+                      batch_size: int = DEFAULT_BATCH_SIZE) -> Dict[str, int]:
+        """
+        Conta os números por status numa passada em lotes, lendo apenas a coluna de telefones
+        Args:
+            file_path: Caminho do arquivo ou buffer com o conteúdo enviado
+            phone_column (str): Nome da coluna com os números de telefone
+            filename (str): Nome do arquivo, quando file_path for um buffer
+            batch_size (int): Quantidade de contatos lidos por lote
+        Returns:
+            Dict[str, int]: Total por status (válido, inválido, duplicado e sem WhatsApp, pelo
+                cache de números recusados), incluindo o total de linhas
+        """
+        summary = {STATUS_VALID: 0, STATUS_INVALID: 0, STATUS_DUPLICATE: 0, STATUS_NOT_ON_WHATSAPP: 0, "total": 0}
+        batches = iter_normalized_batches(
+            file_path, phone_column, summary, filename=filename, batch_size=batch_size,
+            invalid_cache=self.invalid_cache
+        )
+        with metrics.timer("preflight"):
+            for _ in batches:
+                pass
+        return summary
+
+    def _report_summary(self, summary: Dict[str, int]):
+        """Informa a contagem de números por status"""
+        self._update_status(
+            f"Números válidos: {summary[STATUS_VALID]} | inválidos: {summary[STATUS_INVALID]} | "
+            f"duplicados: {summary[STATUS_DUPLICATE]} | sem WhatsApp: {summary[STATUS_NOT_ON_WHATSAPP]}"
+        )
+
+    def _export_report(self, journal: CampaignJournal, campaign_id: str, report_format: str) -> Optional[str]:
+        """
+        Exporta o relatório ao fim da campanha sem descartar os envios já feitos: se o formato
+        pedido falhar, grava em CSV; se o CSV também falhar, o resultado fica apenas no diário
+        Returns:
+            str: Caminho do relatório gerado, ou None se nenhum formato pôde ser gravado
+        """
+        formats = [report_format] if report_format == "csv" else [report_format, "csv"]
+        for fmt in formats:
+            path = os.path.join(self.reports_dir, f"report_{campaign_id}.{fmt}")
+            try:
+                return journal.export(campaign_id, path, SEND_STATUS_LABELS)
+            except Exception as e:
+                self._update_status(f"Aviso: Falha ao gravar o relatório {path}: {str(e)}")
+        self._update_status(
+            f"Aviso: Envios registrados apenas no diário {self.journal_path} (campanha {campaign_id})"
+        )
+        return None
+
+    def export_links(self, file_path, phone_column: str, message_template: str,
+                     filename: Optional[str] = None, batch_size: int = DEFAULT_BATCH_SIZE,
+                     output_format: str = "csv", output_path: Optional[str] = None) -> Optional[str]:
+        """
+        Gera links "click to chat" (api.whatsapp.com/send) para cada contato, sem abrir o navegador
+        Args:
+            file_path: Caminho do arquivo ou buffer com o conteúdo enviado
+            phone_column (str): Nome da coluna com os números de telefone
+            message_template (str): Template da mensagem
+            filename (str): Nome do arquivo, quando file_path for um buffer
+            batch_size (int): Quantidade de contatos lidos por lote
+            output_format (str): Formato do arquivo gerado ("csv" ou "parquet")
+            output_path (str): Arquivo de destino (padrão: reports/whatsapp_links_<data>.<formato>)
+        Returns:
+            str: Caminho do arquivo gerado, ou None se o arquivo ou o template forem inválidos
+        """
+        output_path = output_path or os.path.join(
+            self.reports_dir, f"whatsapp_links_{datetime.now().strftime('%Y%m%d_%H%M%S')}.{output_format}"
+        )
+        try:
+            # O formato gravado segue a extensão do arquivo de destino (ver write_links)
+            check_report_format("parquet" if output_path.endswith(".parquet") else "csv")
+        except ValueError as e:
+            self._update_status(f"Erro: {str(e)}")
+            return None
+
+        columns = read_columns(file_path, filename)
+        if phone_column not in columns:
+            self._update_status(f"Erro: Coluna {phone_column} não encontrada")
+            return None
+        template = MessageTemplate(message_template)
+        missing = template.missing_fields(columns)
+        if missing:
+            self._update_status(f"Erro: Campos não encontrados: {', '.join(missing)}")
+            return None
+
+        summary = {STATUS_VALID: 0, STATUS_INVALID: 0, STATUS_DUPLICATE: 0, STATUS_NOT_ON_WHATSAPP: 0}
+        self._update_status("Gerando links do WhatsApp...")
+        with metrics.timer("export_links"):
+            batches = iter_link_batches(
+                file_path, phone_column, template, summary, filename, batch_size, self.invalid_cache
+            )
+            written = write_links(batches, output_path)
+
+        self._update_status(
+            f"{written} links gerados | inválidos: {summary[STATUS_INVALID]} | "
+            f"duplicados: {summary[STATUS_DUPLICATE]} | sem WhatsApp: {summary[STATUS_NOT_ON_WHATSAPP]}"
+        )
+        self._update_status(f"Links salvos em: {output_path}")
+        return output_path
+
+    def dry_run(self, file_path, phone_column: str, message_template: str,
+                filename: Optional[str] = None, batch_size: int = DEFAULT_BATCH_SIZE,
+                attachment=None, max_flagged: int = DEFAULT_FLAGGED_ROWS) -> Optional[CampaignPlan]:
+        """
+        Simula a campanha sem abrir o navegador (leitura, normalização, deduplicação, cache de
+        números recusados e template) e projeta a duração com o ritmo configurado e as
+        latências medidas nas campanhas anteriores
+        Args:
+            file_path: Caminho do arquivo ou buffer com o conteúdo enviado
+            phone_column (str): Nome da coluna com os números de telefone
+            message_template (str): Template da mensagem
+            filename (str): Nome do arquivo, quando file_path for um buffer
+            batch_size (int): Quantidade de contatos lidos por lote
+            attachment: Anexo da campanha (Attachment ou caminho); a mensagem vira legenda,
+                com limite menor de tamanho
+            max_flagged (int): Quantidade máxima de linhas com problema listadas no plano
+        Returns:
+            CampaignPlan: Projeção da campanha, ou None se o arquivo ou o template forem inválidos
+        """
+        columns = read_columns(file_path, filename)
+        if phone_column not in columns:
+            self._update_status(f"Erro: Coluna {phone_column} não encontrada")
+            return None
+        template = MessageTemplate(message_template)
+        missing = template.missing_fields(columns)
+        if missing:
+            self._update_status(f"Erro: Campos não encontrados: {', '.join(missing)}")
+            return None
+        if isinstance(attachment, str):
+            try:
+                attachment = Attachment.from_path(attachment)
+            except (OSError, ValueError) as e:
+                self._update_status(f"Erro: Anexo inválido: {str(e)}")
+                return None
+
+        self._update_status("Simulando a campanha (sem navegador)...")
+        summary = {STATUS_VALID: 0, STATUS_INVALID: 0, STATUS_DUPLICATE: 0, STATUS_NOT_ON_WHATSAPP: 0}
+        issues = {ISSUE_EMPTY: 0, ISSUE_TOO_LONG: 0}
+        max_length = MAX_CAPTION_LENGTH if attachment else MAX_MESSAGE_LENGTH
+        flagged, total = [], 0
+        start = time.perf_counter()
+        with metrics.timer("dry_run"):
+            tasks = iter_send_tasks(
+                file_path, phone_column, template, summary, filename, batch_size, self.invalid_cache
+            )
+            for task in tasks:
+                total += 1
+                status = task["status"]
+                if status is None:
+                    if not task["message"].strip() and not attachment:
+                        status = ISSUE_EMPTY
+                    elif len(task["message"]) > max_length:
+                        status = ISSUE_TOO_LONG
+                    else:
+                        continue
+                    issues[status] += 1
+                if len(flagged) < max_flagged:
+                    flagged.append({"index": int(task["index"]), "phone": str(task["phone"]), "status": status})
+
+        plan = CampaignPlan(total, summary, issues, flagged, time.perf_counter() - start,
+                            self.rate_policy, load_latency_history(self.metrics_path))
+        self._update_status(
+            f"{plan.sends} envios previstos em {format_duration(plan.duration_seconds)} "
+            f"(término às {plan.finish_at.strftime('%d/%m %H:%M')}, {plan.messages_per_hour:.0f} msg/h)"
+        )
+        return plan
@@ -0,0 +1,129 @@
+from string import Formatter
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+import pandas as pd
+
+_FORMATTER = Formatter()
+
+
+def _format_value(value, conversion: Optional[str], format_spec: str) -> str:
+    """
+    Aplica a conversão (!s, !r, !a) e a especificação de formato de um campo, como str.format
+    Args:
+        value: Valor da coluna
+        conversion (str): Conversão do campo (None se ausente)
+        format_spec (str): Especificação de formato (ex.: '.2f')
+    Returns:
+        str: Valor formatado
+    Raises:
+        ValueError: Se o valor não aceitar a especificação de formato
+    """
+    if conversion:
+        value = _FORMATTER.convert_field(value, conversion)
+    try:
+        return _FORMATTER.format_field(value, format_spec)
+    except ValueError:
+        # Os contatos são lidos como texto: formatos numéricos ({valor:.2f}) usam o número
+        for cast in (int, float):
+            try:
+                return _FORMATTER.format_field(cast(value), format_spec)
+            except ValueError:
+                continue
+        if not str(value).strip():
+            return ""
+        raise ValueError(f"Valor '{value}' incompatível com o formato '{format_spec}'")
+
+
+class MessageTemplate:
+    def __init__(self, template: str):
+        """
+        Compila um template de mensagem com campos no formato {coluna}
+        Args:
+            template (str): Texto da mensagem com os campos a substituir
+        """
+        self.template = template
+        self._parts = self._parse(template)
+        # Campos na ordem em que aparecem, sem repetição
+        self.fields = list(dict.fromkeys(field for _, field, _, _ in self._parts if field is not None))
+
+    @staticmethod
+    def _parse(template: str) -> List[Tuple[str, Optional[str], Optional[str], str]]:
+        """
+        Divide o template em partes (texto literal, campo, conversão, formato)
+        Args:
+            template (str): Texto da mensagem
+        Returns:
+            List[Tuple[str, str, str, str]]: Partes do template; campo é None no trecho final.
+                O campo é o nome da coluna, sem a conversão (!r) e o formato (:.2f)
+        """
+        return [
+            (literal, field, conversion, format_spec or "")
+            for literal, field, format_spec, conversion in _FORMATTER.parse(template)
+        ]
+
+    def missing_fields(self, columns: Iterable) -> List[str]:
+        """
+        Lista os campos do template que não existem nas colunas informadas
+        Args:
+            columns (Iterable): Colunas disponíveis no arquivo
+        Returns:
+            List[str]: Campos ausentes
+        """
+        available = {str(col) for col in columns}
+        return [field for field in self.fields if field not in available]
+
+    def validate(self, columns: Iterable):
+        """
+        Garante que todos os campos do template existem no arquivo
+        Args:
+            columns (Iterable): Colunas disponíveis no arquivo
+        Raises:
+            ValueError: Se algum campo não existir
+        """
+        missing = self.missing_fields(columns)
+        if missing:
+            raise ValueError(f"Campos não encontrados: {', '.join(missing)}")
+
+    def render(self, df: pd.DataFrame, escape: Optional[Callable[[str], str]] = None) -> pd.Series:
+        """
+        Gera as mensagens personalizadas para todas as linhas de uma vez
+        Args:
+            df (pd.DataFrame): Contatos com as colunas usadas no template
+            escape (Callable): Função aplicada a cada trecho do texto (ex.: codificação de URL);
+                como escape(a + b) == escape(a) + escape(b), cada literal é codificado uma vez
+                e cada coluna apenas nos seus valores distintos
+        Returns:
+            pd.Series: Mensagem pronta para cada linha, com o mesmo índice do DataFrame
+        """
+        self.validate(df.columns)
+        columns = {str(col): col for col in df.columns}
+
+        result = pd.Series("", index=df.index, dtype=object)
+        for literal, field, conversion, format_spec in self._parts:
+            if literal:
+                result = result + (escape(literal) if escape else literal)
+            if field is not None:
+                values = df[columns[field]].astype(str)
+                if conversion or format_spec:
+                    values = values.map({
+                        value: _format_value(value, conversion, format_spec) for value in values.unique()
+                    })
+                if escape:
+                    values = values.map({value: escape(value) for value in values.unique()})
+                result = result + values
+        return result
+
+    def render_row(self, row: Dict) -> str:
+        """
+        Gera a mensagem para um único registro (ex.: preview)
+        Args:
+            row (Dict): Valores da linha indexados pelo nome da coluna
+        Returns:
+            str: Mensagem personalizada
+        """
+        values = {str(key): value for key, value in row.items()}
+        self.validate(values.keys())
+        return "".join(
+            literal + (_format_value(values[field], conversion, format_spec) if field is not None else "")
+            for literal, field, conversion, format_spec in self._parts
+        )
@@ -0,0 +1,176 @@
+import json
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Dict, List, Optional, Tuple
+
+# Limites dos buckets de latência: de 1 ms a ~20 min, crescendo 25% a cada bucket
+BUCKET_BOUNDS = [0.001 * 1.25 ** i for i in range(64)]
+
+# Quantis exibidos nos snapshots
+QUANTILES = (0.5, 0.95, 0.99)
+
+
+def _escape_label(value) -> str:
+    """Escapa um valor de rótulo para o formato texto do Prometheus (\\, aspas e quebras de linha)"""
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class Histogram:
+    def __init__(self, bounds: List[float] = BUCKET_BOUNDS):
+        """
+        Histograma de latências com buckets fixos (custo constante por observação)
+        Args:
+            bounds (List[float]): Limites superiores dos buckets em segundos
+        """
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, seconds: float):
+        """Registra uma duração em segundos"""
+        self.counts[bisect_left(self.bounds, seconds)] += 1
+        self.count += 1
+        self.sum += seconds
+        self.max = max(self.max, seconds)
+
+    def quantile(self, q: float) -> Optional[float]:
+        """
+        Estima um quantil por interpolação dentro do bucket
+        Args:
+            q (float): Quantil entre 0 e 1
+        Returns:
+            float: Duração estimada em segundos, ou None sem observações
+        """
+        if not self.count:
+            return None
+        target = q * self.count
+        cumulative = 0
+        for position, bucket_count in enumerate(self.counts):
+            if cumulative + bucket_count >= target and bucket_count:
+                lower = self.bounds[position - 1] if position else 0.0
+                upper = min(self.bounds[position], self.max) if position < len(self.bounds) else self.max
+                return lower + (upper - lower) * (target - cumulative) / bucket_count
+            cumulative += bucket_count
+        return self.max
+
+    def summary(self) -> Dict:
+        """Resumo com contagem, média, máximo e quantis"""
+        result = {
+            "count": self.count,
+            "mean": self.sum / self.count if self.count else None,
+            "max": self.max if self.count else None,
+        }
+        for q in QUANTILES:
+            result[f"p{int(q * 100)}"] = self.quantile(q)
+        return result
+
+
+class MetricsRegistry:
+    def __init__(self, prefix: str = "galateia"):
+        """
+        Registro de métricas do caminho de envio (latência por etapa e contadores)
+        Args:
+            prefix (str): Prefixo dos nomes exportados no formato Prometheus
+        """
+        self.prefix = prefix
+        self._histograms: Dict[str, Histogram] = {}
+        self._counters: Dict[Tuple[str, Tuple], int] = {}
+        self._lock = threading.Lock()
+        self.started_at = time.time()
+
+    def observe(self, stage: str, seconds: float):
+        """Registra a duração de uma etapa"""
+        with self._lock:
+            histogram = self._histograms.get(stage)
+            if histogram is None:
+                histogram = self._histograms[stage] = Histogram()
+            histogram.observe(seconds)
+
+    @contextmanager
+    def timer(self, stage: str):
+        """Mede a duração do bloco e registra na etapa informada"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(stage, time.perf_counter() - start)
+
+    def inc(self, name: str, amount: int = 1, **labels):
+        """
+        Incrementa um contador
+        Args:
+            name (str): Nome do contador (ex.: messages)
+            amount (int): Valor a somar
+            **labels: Rótulos do contador (ex.: status="enviado")
+        """
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + amount
+
+    def reset(self):
+        """Descarta todas as métricas"""
+        with self._lock:
+            self._histograms.clear()
+            self._counters.clear()
+            self.started_at = time.time()
+
+    def snapshot(self) -> Dict:
+        """
+        Retorna as métricas atuais em formato serializável (JSON)
+        Returns:
+            Dict: 'stages' com o resumo de cada etapa e 'counters' com os contadores
+        """
+        with self._lock:
+            stages = {stage: histogram.summary() for stage, histogram in self._histograms.items()}
+            counters = [
+                {"name": name, "labels": dict(labels), "value": value}
+                for (name, labels), value in sorted(self._counters.items())
+            ]
+        return {"started_at": self.started_at, "stages": stages, "counters": counters}
+
+    def to_json(self) -> str:
+        """Snapshot das métricas como texto JSON"""
+        return json.dumps(self.snapshot(), indent=2)
+
+    def export_json(self, path: str):
+        """Grava o snapshot das métricas em um arquivo JSON"""
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(self.to_json())
+
+    def to_prometheus(self) -> str:
+        """
+        Exporta as métricas no formato texto do Prometheus
+        Returns:
+            str: Histogramas de latência por etapa e contadores
+        """
+        lines = []
+        with self._lock:
+            histogram_name = f"{self.prefix}_stage_seconds"
+            lines.append(f"# TYPE {histogram_name} histogram")
+            for stage, histogram in sorted(self._histograms.items()):
+                stage = _escape_label(stage)
+                cumulative = 0
+                for bound, bucket_count in zip(histogram.bounds, histogram.counts):
+                    cumulative += bucket_count
+                    lines.append(f'{histogram_name}_bucket{{stage="{stage}",le="{bound:.6g}"}} {cumulative}')
+                lines.append(f'{histogram_name}_bucket{{stage="{stage}",le="+Inf"}} {histogram.count}')
+                lines.append(f'{histogram_name}_sum{{stage="{stage}"}} {histogram.sum:.6f}')
+                lines.append(f'{histogram_name}_count{{stage="{stage}"}} {histogram.count}')
+
+            typed = set()
+            for (name, labels), value in sorted(self._counters.items()):
+                counter_name = f"{self.prefix}_{name}_total"
+                if counter_name not in typed:
+                    lines.append(f"# TYPE {counter_name} counter")
+                    typed.add(counter_name)
+                label_text = ",".join(f'{key}="{_escape_label(label)}"' for key, label in labels)
+                lines.append(f"{counter_name}{{{label_text}}} {value}" if label_text else f"{counter_name} {value}")
+        return "\n".join(lines) + "\n"
+
+
+# Registro compartilhado pelo processo
+metrics = MetricsRegistry()
@@ -0,0 +1,98 @@
+import json
+import logging
+import os
+import threading
+import time
+from typing import Dict, Optional
+
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# Tempo que um número permanece marcado como inválido (segundos)
+DEFAULT_TTL = 30 * 24 * 3600
+
+
+class InvalidNumberCache:
+    def __init__(self, path: str, ttl: float = DEFAULT_TTL):
+        """
+        Cache em disco dos números que o WhatsApp recusou, com prazo de validade
+        Args:
+            path (str): Arquivo JSON do cache
+            ttl (float): Tempo que cada número permanece no cache (segundos)
+        """
+        self.path = path
+        self.ttl = ttl
+        self._entries = {}
+        self._lock = threading.Lock()
+        self._dirty = False
+        self.load()
+
+    def load(self):
+        """Carrega o cache do disco, descartando entradas vencidas"""
+        try:
+            with open(self.path, encoding='utf-8') as f:
+                entries = json.load(f)
+        except FileNotFoundError:
+            entries = {}
+        except (OSError, ValueError) as e:
+            logger.warning(f"Cache de números inválidos ignorado ({self.path}): {str(e)}")
+            entries = {}
+        cutoff = time.time() - self.ttl
+        with self._lock:
+            self._entries = {phone: entry for phone, entry in entries.items() if entry.get("ts", 0) >= cutoff}
+
+    def save(self):
+        """Grava o cache no disco de forma atômica"""
+        with self._lock:
+            if not self._dirty:
+                return
+            entries = dict(self._entries)
+            self._dirty = False
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(entries, f)
+        os.replace(tmp_path, self.path)
+
+    def add(self, phone: str, reason: str):
+        """
+        Marca um número como inválido
+        Args:
+            phone (str): Número normalizado
+            reason (str): Classificação do erro (ex.: sem_whatsapp)
+        """
+        with self._lock:
+            self._entries[phone] = {"reason": reason, "ts": time.time()}
+            self._dirty = True
+
+    def get(self, phone: str) -> Optional[str]:
+        """
+        Consulta um número
+        Args:
+            phone (str): Número normalizado
+        Returns:
+            str: Classificação do erro, ou None se o número não está no cache (ou venceu)
+        """
+        entry = self._entries.get(phone)
+        if entry is None or entry["ts"] < time.time() - self.ttl:
+            return None
+        return entry["reason"]
+
+    def lookup(self, phones: pd.Series) -> pd.Series:
+        """
+        Consulta uma coluna inteira de números
+        Args:
+            phones (pd.Series): Números normalizados
+        Returns:
+            pd.Series: Classificação do erro para números no cache, None para os demais
+        """
+        cutoff = time.time() - self.ttl
+        with self._lock:
+            reasons: Dict[str, str] = {
+                phone: entry["reason"] for phone, entry in self._entries.items() if entry["ts"] >= cutoff
+            }
+        return phones.map(reasons)
+
+    def __len__(self):
+        return len(self._entries)
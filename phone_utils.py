@@ -0,0 +1,88 @@
+import re
+from typing import Dict, Optional, Set
+
+import pandas as pd
+
+# Código do país (Brasil)
+COUNTRY_CODE = "55"
+
+# Status atribuídos a cada número na normalização
+STATUS_VALID = "valido"
+STATUS_INVALID = "invalido"
+STATUS_DUPLICATE = "duplicado"
+
+# DDD brasileiro: dois dígitos de 1 a 9 (não existe DDD com zero)
+_DDD_PATTERN = r"[1-9]{2}"
+# Celular com 9 dígitos sempre começa com 9; fixo com 8 dígitos começa de 2 a 5
+_VALID_PATTERN = re.compile(rf"^{COUNTRY_CODE}{_DDD_PATTERN}(?:9\d{{8}}|[2-5]\d{{7}})$")
+# Celular antigo com 8 dígitos (6 a 9) recebe o nono dígito
+_LEGACY_MOBILE_PATTERN = re.compile(rf"^({COUNTRY_CODE}{_DDD_PATTERN})([6-9]\d{{7}})$")
+
+
+def _canonicalize(digits: str) -> str:
+    """Aplica código do país e nono dígito a uma string só com dígitos"""
+    digits = digits.lstrip("0")
+    if len(digits) in (10, 11):  # DDD + número, sem código do país
+        digits = COUNTRY_CODE + digits
+    return _LEGACY_MOBILE_PATTERN.sub(r"\g<1>9\g<2>", digits)
+
+
+def format_phone(phone) -> Optional[str]:
+    """
+    Normaliza um único número de telefone para o padrão 55 + DDD + número
+    Args:
+        phone: Número de telefone em qualquer formato
+    Returns:
+        str: Número normalizado ou None se inválido
+    """
+    phone = re.sub(r"\.0$", "", str(phone).strip())
+    phone = _canonicalize(re.sub(r"\D", "", phone))
+    return phone if _VALID_PATTERN.match(phone) else None
+
+
+def normalize_phones(phones: pd.Series, seen: Optional[Set[str]] = None) -> pd.DataFrame:
+    """
+    Normaliza uma coluna inteira de telefones e marca inválidos e duplicados
+    Args:
+        phones (pd.Series): Coluna com os números de telefone
+        seen (Set[str]): Números já vistos em lotes anteriores (atualizado no lugar)
+    Returns:
+        pd.DataFrame: Colunas 'phone' (número normalizado ou None) e 'status',
+            com o mesmo índice da coluna original
+    """
+    digits = (
+        phones.astype(str)
+        .str.strip()
+        .str.replace(r"\.0$", "", regex=True)  # números lidos como float do Excel
+        .str.replace(r"\D", "", regex=True)
+        .str.lstrip("0")
+    )
+    local = digits.str.len().isin([10, 11])
+    digits = digits.where(~local, COUNTRY_CODE + digits)
+    digits = digits.str.replace(_LEGACY_MOBILE_PATTERN, r"\g<1>9\g<2>", regex=True)
+
+    valid = digits.str.match(_VALID_PATTERN) & phones.notna()
+    duplicate = valid & digits.duplicated()
+    if seen is not None:
+        # Consulta ao conjunto número a número: custo proporcional ao lote, não ao total já visto
+        duplicate |= valid & digits.map(seen.__contains__).astype(bool)
+        seen.update(digits[valid & ~duplicate])
+
+    status = pd.Series(STATUS_INVALID, index=phones.index, dtype=object)
+    status[valid] = STATUS_VALID
+    status[duplicate] = STATUS_DUPLICATE
+    return pd.DataFrame({"phone": digits.where(valid, None), "status": status})
+
+
+def summarize_phones(normalized: pd.DataFrame) -> Dict[str, int]:
+    """
+    Conta os números válidos, inválidos e duplicados
+    Args:
+        normalized (pd.DataFrame): Resultado de normalize_phones
+    Returns:
+        Dict[str, int]: Total por status, incluindo o total geral
+    """
+    counts = normalized["status"].value_counts()
+    summary = {status: int(counts.get(status, 0)) for status in (STATUS_VALID, STATUS_INVALID, STATUS_DUPLICATE)}
+    summary["total"] = len(normalized)
+    return summary
@@ -0,0 +1,233 @@
+import queue
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Callable, Dict, Iterable, Optional, Tuple
+
+# Quantidade de tarefas preparadas com antecedência pelo pipeline
+DEFAULT_PREFETCH = 100
+
+_END = object()
+
+
+class RatePolicy:
+    def __init__(self, interval: float = 30, per_minute: Optional[int] = None, per_hour: Optional[int] = None,
+                 quiet_hours: Optional[Tuple[int, int]] = None):
+        """
+        Política de envio
+        Args:
+            interval (float): Tempo mínimo entre o início de dois envios (segundos)
+            per_minute (int): Máximo de envios por minuto (None para ilimitado)
+            per_hour (int): Máximo de envios por hora (None para ilimitado)
+            quiet_hours (Tuple[int, int]): Horário sem envios (hora inicial, hora final),
+                ex.: (22, 8) bloqueia das 22h às 8h
+        """
+        self.interval = interval
+        self.per_minute = per_minute
+        self.per_hour = per_hour
+        self.quiet_hours = quiet_hours
+
+
+class TokenBucket:
+    def __init__(self, capacity: int, period: float, monotonic: Callable[[], float] = time.monotonic):
+        """
+        Balde de fichas: até `capacity` envios a cada `period` segundos
+        Args:
+            capacity (int): Quantidade máxima de fichas
+            period (float): Tempo para o balde encher por completo (segundos)
+            monotonic (Callable): Relógio monotônico (segundos)
+        """
+        self.capacity = capacity
+        self.rate = capacity / period
+        self.monotonic = monotonic
+        self.tokens = float(capacity)
+        self.updated = monotonic()
+
+    def _refill(self):
+        now = self.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self) -> float:
+        """Tempo até haver uma ficha disponível (segundos)"""
+        self._refill()
+        return 0.0 if self.tokens >= 1 else (1 - self.tokens) / self.rate
+
+    def consume(self):
+        """Consome uma ficha"""
+        self._refill()
+        self.tokens -= 1
+
+
+class RateLimiter:
+    def __init__(self, policy: RatePolicy, clock: Callable[[], datetime] = datetime.now,
+                 monotonic: Callable[[], float] = time.monotonic):
+        """
+        Controla o ritmo de envio conforme a política
+        Args:
+            policy (RatePolicy): Política de envio
+            clock (Callable): Relógio usado para o horário de silêncio
+            monotonic (Callable): Relógio dos limites e do intervalo (ex.: o relógio virtual
+                da simulação em campaign_planner)
+        """
+        self.policy = policy
+        self.clock = clock
+        self.monotonic = monotonic
+        self.buckets = []
+        if policy.per_minute:
+            self.buckets.append(TokenBucket(policy.per_minute, 60, monotonic))
+        if policy.per_hour:
+            self.buckets.append(TokenBucket(policy.per_hour, 3600, monotonic))
+        self.last_send = None
+
+    def _quiet_wait(self) -> float:
+        """Tempo até o fim do horário de silêncio, ou 0 fora dele (segundos)"""
+        if not self.policy.quiet_hours:
+            return 0.0
+        start, end = self.policy.quiet_hours
+        now = self.clock()
+        hour = now.hour
+        quiet = start <= hour < end if start <= end else (hour >= start or hour < end)
+        if not quiet:
+            return 0.0
+        resume = now.replace(hour=end, minute=0, second=0, microsecond=0)
+        if resume <= now:
+            resume += timedelta(days=1)
+        return (resume - now).total_seconds()
+
+    def wait_time(self) -> float:
+        """Tempo até o próximo envio ser permitido (segundos)"""
+        waits = [self._quiet_wait()] + [bucket.wait_time() for bucket in self.buckets]
+        if self.last_send is not None:
+            waits.append(self.last_send + self.policy.interval - self.monotonic())
+        return max(0.0, *waits)
+
+    def acquire(self, idle: Optional[Callable[[], None]] = None,
+                stop_event: Optional[threading.Event] = None) -> bool:
+        """
+        Bloqueia até o próximo envio ser permitido
+        Args:
+            idle (Callable): Trabalho a executar durante a espera (ex.: gravar o relatório)
+            stop_event (threading.Event): Interrompe a espera quando sinalizado
+        Returns:
+            bool: True se o envio foi liberado, False se a espera foi interrompida
+        """
+        if idle:
+            idle()
+        while True:
+            remaining = self.wait_time()
+            if remaining <= 0:
+                break
+            if stop_event is not None:
+                if stop_event.wait(remaining):
+                    return False
+            else:
+                time.sleep(remaining)
+        if stop_event is not None and stop_event.is_set():
+            return False
+        self.consume()
+        return True
+
+    def consume(self):
+        """Registra um envio liberado: consome as fichas e reinicia o intervalo"""
+        for bucket in self.buckets:
+            bucket.consume()
+        self.last_send = self.monotonic()
+
+
+class SendScheduler:
+    def __init__(self, policy: RatePolicy, prefetch: int = DEFAULT_PREFETCH,
+                 stop_event: Optional[threading.Event] = None,
+                 resume_event: Optional[threading.Event] = None,
+                 limiter: Optional[RateLimiter] = None):
+        """
+        Executa os envios em pipeline: a preparação das próximas tarefas e a gravação
+        dos resultados acontecem enquanto a janela de ritmo ainda está correndo
+        Args:
+            policy (RatePolicy): Política de envio
+            prefetch (int): Quantidade de tarefas preparadas com antecedência
+            stop_event (threading.Event): Interrompe a execução quando sinalizado
+            resume_event (threading.Event): Pausa os envios enquanto não estiver sinalizado
+            limiter (RateLimiter): Limitador compartilhado entre execuções (ex.: o de uma conta);
+                quando informado, substitui o criado a partir de policy
+        """
+        self.limiter = limiter or RateLimiter(policy)
+        self.prefetch = prefetch
+        self.stop_event = stop_event
+        self.resume_event = resume_event
+
+    def _wait_resumed(self) -> bool:
+        """Aguarda o fim de uma pausa; retorna False se a execução foi interrompida"""
+        while self.resume_event is not None and not self.resume_event.wait(0.5):
+            if self.stop_event is not None and self.stop_event.is_set():
+                return False
+        return not (self.stop_event is not None and self.stop_event.is_set())
+
+    @staticmethod
+    def _put(buffer: queue.Queue, item, halt: threading.Event) -> bool:
+        """Coloca um item no buffer, desistindo se o consumidor tiver parado"""
+        while not halt.is_set():
+            try:
+                buffer.put(item, timeout=0.5)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _prefetch(self, tasks: Iterable[Dict], buffer: queue.Queue, halt: threading.Event):
+        """Prepara as tarefas em segundo plano (leitura, normalização e template)"""
+        try:
+            for task in tasks:
+                if not self._put(buffer, task, halt):
+                    return
+            self._put(buffer, _END, halt)
+        except Exception as e:
+            self._put(buffer, e, halt)
+
+    def run(self, tasks: Iterable[Dict], send: Callable[[Dict], str],
+            on_result: Callable[[Dict], None]) -> bool:
+        """
+        Envia as tarefas respeitando a política de envio
+        Args:
+            tasks (Iterable[Dict]): Tarefas com 'phone' e 'message'; tarefas com 'status'
+                já definido (ex.: número inválido) vão direto para on_result, sem espera
+            send (Callable): Envia uma tarefa e retorna o status do envio
+            on_result (Callable): Recebe cada tarefa concluída, na thread que chamou run
+        Returns:
+            bool: True se todas as tarefas foram processadas, False se interrompido
+        """
+        buffer = queue.Queue(maxsize=self.prefetch)
+        halt = threading.Event()
+        producer = threading.Thread(target=self._prefetch, args=(tasks, buffer, halt), daemon=True)
+        producer.start()
+
+        done = []
+
+        def flush():
+            while done:
+                on_result(done.pop(0))
+
+        try:
+            while True:
+                task = buffer.get()
+                if task is _END:
+                    return True
+                if isinstance(task, Exception):
+                    raise task
+                if task.get("status"):
+                    flush()
+                    on_result(task)
+                    continue
+                flush()
+                if not self._wait_resumed():
+                    return False
+                if not self.limiter.acquire(idle=flush, stop_event=self.stop_event):
+                    return False
+                # Uma pausa pedida durante a espera do ritmo (ou do silêncio) segura este envio
+                if not self._wait_resumed():
+                    return False
+                task["status"] = send(task)
+                done.append(task)
+        finally:
+            halt.set()
+            flush()
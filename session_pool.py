@@ -0,0 +1,273 @@
+import itertools
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+
+from campaign_worker import JOB_ERROR, CampaignJob
+from send_scheduler import RateLimiter, RatePolicy
+from whatsapp_helper import create_helper
+
+logger = logging.getLogger(__name__)
+
+# Diretório com um perfil do Chrome por conta
+DEFAULT_ACCOUNTS_DIR = os.getenv("GALATEIA_ACCOUNTS_DIR", os.path.join(os.getcwd(), ".chrome_profiles"))
+
+# Campanhas (navegadores) executadas ao mesmo tempo
+DEFAULT_MAX_WORKERS = 4
+
+# Tempo sem uso até o navegador de uma conta ser fechado (segundos)
+DEFAULT_IDLE_TIMEOUT = 10 * 60
+
+# Estados da sessão de uma conta
+SESSION_SUSPENDED = "suspensa"  # Navegador fechado; o perfil em disco mantém o login
+SESSION_IDLE = "ociosa"         # Navegador aberto, sem campanha em execução
+SESSION_BUSY = "enviando"       # Campanha em execução
+
+
+class AccountSession:
+    def __init__(self, account_id: str, user_data_dir: str, rate_policy: Optional[RatePolicy] = None,
+                 headless: bool = False, helper_options: Optional[Dict] = None,
+                 sender_options: Optional[Dict] = None):
+        """
+        Conta de WhatsApp registrada no pool: perfil, navegador, limites e fila de campanhas
+        Args:
+            account_id (str): Identificador da conta (ex.: nome do departamento)
+            user_data_dir (str): Perfil do Chrome da conta
+            rate_policy (RatePolicy): Limites de envio da conta (padrão: RatePolicy())
+            headless (bool): Se True, executa o Chrome da conta em modo headless
+            helper_options (Dict): Argumentos extras do helper (ex.: backend)
+            sender_options (Dict): Argumentos extras do MessageSender (ex.: auth_timeout)
+        """
+        self.account_id = account_id
+        self.user_data_dir = user_data_dir
+        self.rate_policy = rate_policy or RatePolicy()
+        # O limitador acompanha a conta entre campanhas (cotas por hora não zeram a cada arquivo)
+        self.limiter = RateLimiter(self.rate_policy)
+        self.headless = headless
+        self.helper_options = helper_options or {}
+        self.sender_options = sender_options or {}
+        self.helper = None
+        self.jobs = []
+        self.running = False
+        self.last_used = time.monotonic()
+        self.lock = threading.Lock()
+
+    def configure(self, rate_policy: Optional[RatePolicy] = None, **sender_options):
+        """Atualiza os limites e opções usados pelas próximas campanhas da conta"""
+        with self.lock:
+            if rate_policy is not None and vars(rate_policy) != vars(self.rate_policy):
+                self.rate_policy = rate_policy
+                self.limiter = RateLimiter(rate_policy)
+            self.sender_options.update(sender_options)
+
+    def acquire_helper(self):
+        """Retorna o navegador da conta, abrindo-o (ou reabrindo) se necessário"""
+        with self.lock:
+            if self.helper is None or not self.helper.is_alive():
+                if self.helper is not None:
+                    logger.info(f"Navegador da conta {self.account_id} não responde, reiniciando...")
+                    self._close_helper()
+                logger.info(f"Abrindo navegador da conta {self.account_id}")
+                self.helper = create_helper(
+                    headless=self.headless, user_data_dir=self.user_data_dir, **self.helper_options
+                )
+            self.last_used = time.monotonic()
+            return self.helper
+
+    def _close_helper(self):
+        try:
+            self.helper.close()
+        except Exception as e:
+            logger.error(f"Erro ao fechar navegador da conta {self.account_id}: {str(e)}")
+        self.helper = None
+
+    def suspend(self) -> bool:
+        """
+        Fecha o navegador da conta para liberar memória, se não houver campanha em execução
+        Returns:
+            bool: True se o navegador foi fechado
+        """
+        with self.lock:
+            if self.running or self.helper is None:
+                return False
+            self._close_helper()
+        logger.info(f"Sessão da conta {self.account_id} suspensa")
+        return True
+
+    @property
+    def state(self) -> str:
+        if self.running:
+            return SESSION_BUSY
+        return SESSION_SUSPENDED if self.helper is None else SESSION_IDLE
+
+    def snapshot(self) -> Dict:
+        """Resumo da conta para exibição"""
+        return {
+            "account_id": self.account_id,
+            "state": self.state,
+            "queued": sum(1 for job in self.jobs if job.active),
+            "idle_seconds": 0 if self.running else time.monotonic() - self.last_used,
+        }
+
+
+class SessionPool:
+    def __init__(self, max_workers: int = DEFAULT_MAX_WORKERS, idle_timeout: float = DEFAULT_IDLE_TIMEOUT,
+                 accounts_dir: str = DEFAULT_ACCOUNTS_DIR, reports_dir: Optional[str] = None):
+        """
+        Atende várias contas de WhatsApp no mesmo processo: cada conta tem seu navegador,
+        seus limites de envio e sua fila; contas diferentes enviam em paralelo
+        Args:
+            max_workers (int): Máximo de campanhas (navegadores enviando) ao mesmo tempo
+            idle_timeout (float): Tempo sem uso até o navegador de uma conta ser fechado (segundos)
+            accounts_dir (str): Diretório dos perfis do Chrome, um por conta
+            reports_dir (str): Diretório dos relatórios, com um subdiretório por conta (padrão: ./reports)
+        """
+        self.idle_timeout = idle_timeout
+        self.accounts_dir = accounts_dir
+        self.reports_dir = reports_dir or os.path.join(os.getcwd(), "reports")
+        self._accounts: Dict[str, AccountSession] = {}
+        self._jobs: Dict[int, CampaignJob] = {}
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="account-worker")
+        self._closed = threading.Event()
+        self._reaper = threading.Thread(target=self._reap, name="session-reaper", daemon=True)
+        self._reaper.start()
+
+    def register(self, account_id: str, rate_policy: Optional[RatePolicy] = None, headless: bool = False,
+                 user_data_dir: Optional[str] = None, helper_options: Optional[Dict] = None,
+                 **sender_options) -> AccountSession:
+        """
+        Registra uma conta (ou atualiza os limites de uma conta já registrada)
+        Args:
+            account_id (str): Identificador da conta
+            rate_policy (RatePolicy): Limites de envio da conta
+            headless (bool): Se True, executa o Chrome da conta em modo headless
+            user_data_dir (str): Perfil do Chrome (padrão: accounts_dir/account_id)
+            helper_options (Dict): Argumentos extras do helper (ex.: backend)
+            **sender_options: Argumentos extras do MessageSender (ex.: auth_timeout)
+        Returns:
+            AccountSession: Conta registrada
+        """
+        if not account_id or os.sep in account_id or account_id in (".", ".."):
+            raise ValueError(f"Identificador de conta inválido: {account_id!r}")
+        with self._lock:
+            account = self._accounts.get(account_id)
+            if account is None:
+                account = AccountSession(
+                    account_id, user_data_dir or os.path.join(self.accounts_dir, account_id),
+                    rate_policy, headless, helper_options, sender_options
+                )
+                self._accounts[account_id] = account
+                logger.info(f"Conta {account_id} registrada")
+                return account
+        account.configure(rate_policy, **sender_options)
+        return account
+
+    def submit(self, account_id: str, data: bytes, filename: str, phone_column: str, message_template: str,
+               process_options: Optional[Dict] = None) -> CampaignJob:
+        """
+        Coloca uma campanha na fila da conta
+        Args:
+            account_id (str): Conta já registrada
+            data (bytes): Conteúdo do arquivo de contatos
+            filename (str): Nome do arquivo
+            phone_column (str): Nome da coluna com os números de telefone
+            message_template (str): Template da mensagem
+            process_options (Dict): Argumentos extras de MessageSender.process_file
+        Returns:
+            CampaignJob: Job criado
+        """
+        account = self._accounts.get(account_id)
+        if account is None:
+            raise ValueError(f"Conta não registrada: {account_id}")
+        sender_options = dict(
+            account.sender_options,
+            rate_limiter=account.limiter,
+            reports_dir=os.path.join(self.reports_dir, account_id),
+        )
+        with self._lock:
+            job = CampaignJob(next(self._ids), data, filename, phone_column, message_template,
+                              sender_options, process_options)
+            self._jobs[job.job_id] = job
+        with account.lock:
+            account.jobs.append(job)
+            start = not account.running
+            account.running = True
+        if start:
+            self._executor.submit(self._drain, account)
+        return job
+
+    def _drain(self, account: AccountSession):
+        """Executa a fila de uma conta, uma campanha por vez, no navegador da conta"""
+        while True:
+            with account.lock:
+                account.jobs = [job for job in account.jobs if job.active]
+                job = account.jobs[0] if account.jobs else None
+                if job is None:
+                    account.running = False
+                    account.last_used = time.monotonic()
+                    return
+            try:
+                job.sender.whatsapp = account.acquire_helper()
+            except Exception as e:
+                logger.error(f"Erro ao abrir navegador da conta {account.account_id}: {str(e)}")
+                job.status_message = f"Erro: {str(e)}"
+                job.state = JOB_ERROR
+                job.finished_at = time.time()
+                continue
+            job.run()
+
+    def _reap(self):
+        """Fecha periodicamente os navegadores das contas ociosas"""
+        while not self._closed.wait(min(60, self.idle_timeout / 2)):
+            self.suspend_idle()
+
+    def suspend_idle(self) -> int:
+        """
+        Fecha os navegadores das contas sem uso há mais de idle_timeout
+        Returns:
+            int: Quantidade de sessões suspensas
+        """
+        now = time.monotonic()
+        idle = [account for account in self.accounts()
+                if account.state == SESSION_IDLE and now - account.last_used >= self.idle_timeout]
+        return sum(account.suspend() for account in idle)
+
+    def get(self, job_id: int) -> Optional[CampaignJob]:
+        """Retorna o job pelo identificador"""
+        return self._jobs.get(job_id)
+
+    def account(self, account_id: str) -> Optional[AccountSession]:
+        """Retorna a conta pelo identificador"""
+        return self._accounts.get(account_id)
+
+    def accounts(self) -> List[AccountSession]:
+        """Lista as contas registradas"""
+        with self._lock:
+            return list(self._accounts.values())
+
+    def close(self):
+        """Cancela as campanhas e fecha todos os navegadores"""
+        self._closed.set()
+        for job in list(self._jobs.values()):
+            job.cancel()
+        self._executor.shutdown(wait=True)
+        for account in self.accounts():
+            account.suspend()
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_session_pool() -> SessionPool:
+    """Retorna o pool de contas do processo (sobrevive aos reruns do Streamlit)"""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = SessionPool()
+        return _pool
@@ -1,6 +1,9 @@
 from whatsapp_helper import WhatsAppHelper
+import logging
 import time
 
+logging.basicConfig(level=logging.INFO)
+
 def test_normal_mode():
     print("\nTestando modo normal (com interface gráfica)...")
     whatsapp = WhatsAppHelper(headless=False)
@@ -0,0 +1,69 @@
+import os
+import sys
+from datetime import datetime, timedelta
+
+import pytest
+
+# Os módulos do projeto ficam na raiz do repositório
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import send_scheduler
+from fake_whatsapp import FAKE_URL, FakeWhatsAppDriver
+from metrics import metrics
+from whatsapp_helper import WhatsAppHelper
+
+
+@pytest.fixture(autouse=True)
+def reset_metrics():
+    metrics.reset()
+    yield
+    metrics.reset()
+
+
+@pytest.fixture
+def fake_helper():
+    """Cria WhatsAppHelpers sobre o FakeWhatsAppDriver; guarda os drivers criados em helper.drivers"""
+    helpers = []
+
+    def create(invalid_numbers=(), latencies=None, logged_in=True, **options):
+        drivers = []
+
+        def factory(chrome_options):
+            drivers.append(FakeWhatsAppDriver(latencies=latencies, invalid_numbers=invalid_numbers,
+                                              logged_in=logged_in))
+            return drivers[-1]
+
+        helper = WhatsAppHelper(base_url=FAKE_URL, driver_factory=factory, **options)
+        helper.drivers = drivers
+        helpers.append(helper)
+        return helper
+
+    yield create
+    for helper in helpers:
+        helper.close()
+
+
+class FakeClock:
+    """Relógio manual: time.sleep do limitador apenas avança o tempo"""
+
+    def __init__(self, start: datetime = datetime(2026, 1, 5, 10, 0)):
+        self.start = start
+        self.elapsed = 0.0
+
+    def monotonic(self) -> float:
+        return self.elapsed
+
+    def now(self) -> datetime:
+        return self.start + timedelta(seconds=self.elapsed)
+
+    def sleep(self, seconds: float):
+        # Como um sleep real, avança ao menos 1 ms (resíduos de arredondamento das fichas)
+        self.elapsed += max(seconds, 1e-3)
+
+
+@pytest.fixture
+def fake_clock(monkeypatch):
+    """Relógio manual para o RateLimiter; time.sleep de send_scheduler passa a avançá-lo"""
+    clock = FakeClock()
+    monkeypatch.setattr(send_scheduler.time, "sleep", clock.sleep)
+    return clock
@@ -0,0 +1,67 @@
+from browser_watchdog import (
+    RESTART_CRASHED, RESTART_RECYCLE, RESTART_RELOAD_FAILED, RESTART_UNRESPONSIVE, BrowserWatchdog
+)
+from metrics import metrics
+from whatsapp_helper import STATUS_SENT
+
+
+def _restart_labels():
+    return [counter["labels"] for counter in metrics.snapshot()["counters"] if counter["name"] == "browser_restarts"]
+
+
+def test_restart_reason_label_is_a_fixed_code(fake_helper):
+    helper = fake_helper()
+    assert helper.authenticate_whatsapp(timeout=5)
+    watchdog = BrowserWatchdog(helper, auth_timeout=5, heartbeat_interval=3600, reload_after=1, restart_after=None)
+
+    assert watchdog.send_message_status("5511987654321", "Olá") == STATUS_SENT
+    helper.drivers[-1].quit()
+    # A recarga falha com o texto do WebDriverException; o rótulo continua sendo o código
+    assert watchdog.send_message_status("5511912345678", "Olá") == STATUS_SENT
+
+    assert _restart_labels() == [{"reason": RESTART_RELOAD_FAILED}]
+    assert len(helper.drivers) == 2
+
+
+def _counter(name: str) -> float:
+    return sum(counter["value"] for counter in metrics.snapshot()["counters"] if counter["name"] == name)
+
+
+def test_browser_crash_during_send_restarts_and_requeues(fake_helper):
+    helper = fake_helper()
+    assert helper.authenticate_whatsapp(timeout=5)
+    watchdog = BrowserWatchdog(helper, auth_timeout=5, heartbeat_interval=3600, reload_after=None, restart_after=None)
+
+    helper.drivers[-1].quit()
+    assert watchdog.send_message_status("5511987654321", "Olá") == STATUS_SENT
+
+    assert len(helper.drivers) == 2
+    assert helper.drivers[-1].sent == [("5511987654321", "Olá")]
+    assert _restart_labels() == [{"reason": RESTART_CRASHED}]
+    assert _counter("requeued") == 1
+
+
+def test_dead_session_is_restarted_by_the_heartbeat(fake_helper):
+    helper = fake_helper()
+    assert helper.authenticate_whatsapp(timeout=5)
+    watchdog = BrowserWatchdog(helper, auth_timeout=5, heartbeat_interval=0, reload_after=None, restart_after=None)
+
+    helper.drivers[-1].alive = False
+    assert watchdog.send_message_status("5511987654321", "Olá") == STATUS_SENT
+
+    assert _restart_labels() == [{"reason": RESTART_UNRESPONSIVE}]
+    assert _counter("requeued") == 0
+    assert watchdog.restarts == 1
+
+
+def test_periodic_recycle(fake_helper):
+    helper = fake_helper()
+    assert helper.authenticate_whatsapp(timeout=5)
+    watchdog = BrowserWatchdog(helper, auth_timeout=5, heartbeat_interval=3600, reload_after=None, restart_after=2)
+
+    for i in range(5):
+        assert watchdog.send_message_status(f"55119876543{i:02d}", "Olá") == STATUS_SENT
+
+    assert _restart_labels() == [{"reason": RESTART_RECYCLE}]
+    assert _counter("browser_restarts") == 2
+    assert len(helper.drivers) == 3
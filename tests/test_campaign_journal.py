@@ -0,0 +1,66 @@
+from collections import Counter
+
+from campaign_journal import STATE_INTERRUPTED, STATE_SENDING, CampaignJournal
+from message_sender import MessageSender
+from send_scheduler import RatePolicy
+from whatsapp_helper import STATUS_SENT
+
+PHONES = [f"5511987654{i:03d}" for i in range(8)]
+
+
+def _contacts(tmp_path):
+    path = tmp_path / "contatos.csv"
+    path.write_text("telefone,nome\n" + "".join(f"{phone},Contato {i}\n" for i, phone in enumerate(PHONES)),
+                    encoding="utf-8")
+    return str(path)
+
+
+def _sender(tmp_path, helper):
+    return MessageSender(whatsapp=helper, rate_policy=RatePolicy(interval=0), reports_dir=str(tmp_path))
+
+
+def test_resume_sends_each_contact_once(tmp_path, fake_helper):
+    helper = fake_helper()
+    contacts = _contacts(tmp_path)
+
+    first = _sender(tmp_path, helper)
+
+    def stop_after_three(status):
+        if first.progress.get("processed", 0) >= 3:
+            first.stop_event.set()
+
+    first.set_status_callback(stop_after_three)
+    first.process_file(contacts, "telefone", "Olá {nome}", campaign_id="campanha")
+    sent_before = len(helper.driver.sent)
+    assert 3 <= sent_before < len(PHONES)
+
+    second = _sender(tmp_path, helper)
+    second.process_file(contacts, "telefone", "Olá {nome}", campaign_id="campanha", resume=True)
+
+    sent = Counter(phone for phone, _ in helper.driver.sent)
+    assert set(sent) == set(PHONES)
+    assert max(sent.values()) == 1
+
+    journal = CampaignJournal(second.journal_path)
+    try:
+        assert journal.status_counts("campanha") == {STATUS_SENT: len(PHONES)}
+    finally:
+        journal.close()
+
+
+def test_contact_left_sending_is_not_resent(tmp_path):
+    journal = CampaignJournal(str(tmp_path / "campaigns.db"))
+    journal.start_campaign("campanha")
+    journal.record("campanha", {"index": 0, "phone": PHONES[0], "message": "Olá", "status": STATUS_SENT})
+    journal.mark_sending("campanha", {"index": 1, "phone": PHONES[1], "message": "Olá"})
+    journal.close()
+
+    # Queda do processo com o contato 1 no navegador: a retomada parte da linha 2
+    journal = CampaignJournal(str(tmp_path / "campaigns.db"))
+    try:
+        journal.start_campaign("campanha")
+        assert journal.last_row("campanha") == 1
+        assert STATE_SENDING not in journal.status_counts("campanha")
+        assert journal.status_counts("campanha")[STATE_INTERRUPTED] == 1
+    finally:
+        journal.close()
@@ -0,0 +1,94 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from campaign_planner import ISSUE_EMPTY, CampaignPlan, simulate
+from phone_utils import STATUS_VALID
+from send_scheduler import RateLimiter, RatePolicy
+
+START = datetime(2026, 1, 5, 10, 0)
+
+
+def _history(send_seconds: float, startup_seconds: float = 0.0):
+    return {"stages": {"send_message": {"count": 10, "mean": send_seconds},
+                       "setup_driver": {"count": 1, "mean": startup_seconds}}, "counters": []}
+
+
+def _plan(policy: RatePolicy, sends: int, send_seconds: float = 8.0, start: datetime = START) -> CampaignPlan:
+    return CampaignPlan(sends, {STATUS_VALID: sends}, {}, [], 0.0, policy, _history(send_seconds), start)
+
+
+def test_interval_sets_the_pace():
+    plan = _plan(RatePolicy(interval=30), 10)
+    assert plan.duration_seconds == 9 * 30 + 8
+
+
+def test_quiet_hours_pause_the_projection():
+    plan = _plan(RatePolicy(interval=30, quiet_hours=(20, 8)), 5, start=datetime(2026, 1, 5, 19, 59))
+    # 19:59:00 e 19:59:30; às 20:00 começa o silêncio; 3 envios a partir das 8:00
+    assert plan.finish_at == datetime(2026, 1, 6, 8, 1, 8)
+
+
+def test_rows_with_issues_are_not_sent():
+    plan = CampaignPlan(10, {STATUS_VALID: 10}, {ISSUE_EMPTY: 2}, [], 0.0, RatePolicy(interval=30),
+                        {"stages": {}, "counters": []}, START)
+
+    assert plan.sends == 8
+    assert not plan.measured
+    assert f"2 mensagens com problema ({ISSUE_EMPTY}) não seriam enviadas" in plan.warnings()
+
+
+def test_hourly_limit_starts_full():
+    # 27 envios cabem no balde de 60 por hora: o ritmo é o do intervalo (26 x 30s + 8s)
+    plan = _plan(RatePolicy(interval=30, per_hour=60), 27)
+    assert plan.duration_seconds == 26 * 30 + 8
+
+
+def test_minute_limit_after_the_burst():
+    # 10 envios de imediato (um a cada 1s de envio), depois um a cada 6s
+    finish = simulate(RatePolicy(interval=0, per_minute=10), 30, 1.0, start=START)
+    assert abs((finish - START).total_seconds() - (20 * 6 + 1)) < 1
+
+
+def test_quiet_hours_pause_and_resume():
+    start = datetime(2026, 1, 5, 19, 59)
+    finish = simulate(RatePolicy(interval=30, quiet_hours=(20, 8)), 5, 8.0, start=start)
+    # 19:59:00 e 19:59:30; às 20:00 começa o silêncio; 3 envios a partir das 8:00
+    assert finish == datetime(2026, 1, 6, 8, 1, 8)
+
+
+def test_startup_precedes_first_send():
+    finish = simulate(RatePolicy(interval=30), 2, 8.0, startup_seconds=45, start=START)
+    assert finish == START + timedelta(seconds=45 + 30 + 8)
+
+
+def test_no_interval_skips_pace_warnings():
+    plan = CampaignPlan(10, {STATUS_VALID: 10}, {}, [], 100.0, RatePolicy(interval=0), _history(8.0), START)
+    assert plan.warnings() == []
+
+    plan = CampaignPlan(10, {STATUS_VALID: 10}, {}, [], 100.0, RatePolicy(interval=5), _history(8.0), START)
+    assert len(plan.warnings()) == 2
+
+
+def _run_limiter(policy: RatePolicy, sends: int, send_seconds: float, clock) -> datetime:
+    """Executa o RateLimiter real (acquire) sobre o relógio manual"""
+    limiter = RateLimiter(policy, clock=clock.now, monotonic=clock.monotonic)
+    for _ in range(sends):
+        assert limiter.acquire()
+        clock.sleep(send_seconds)
+    return clock.now()
+
+
+@pytest.mark.parametrize("policy, sends", [
+    (RatePolicy(interval=30, per_hour=60), 27),
+    (RatePolicy(interval=30, per_hour=60), 150),
+    (RatePolicy(interval=5, per_minute=4, per_hour=100), 130),
+    (RatePolicy(interval=30, per_hour=100, quiet_hours=(20, 8)), 300),
+])
+def test_plan_matches_rate_limiter(policy, sends, fake_clock):
+    start = fake_clock.start = datetime(2026, 1, 5, 18, 0)
+    plan = _plan(policy, sends, send_seconds=8.0, start=start)
+
+    expected = _run_limiter(policy, sends, 8.0, fake_clock)
+
+    assert abs((plan.finish_at - expected).total_seconds()) < 1
@@ -0,0 +1,28 @@
+from campaign_worker import JOB_DONE, JOB_ERROR, CampaignJob
+from send_scheduler import RatePolicy
+
+CONTACTS = "telefone,nome\n11987654321,Ana\n11912345678,Bia\n".encode("utf-8")
+
+
+def _job(tmp_path, helper, **sender_options) -> CampaignJob:
+    options = {"whatsapp": helper, "rate_policy": RatePolicy(interval=0), "reports_dir": str(tmp_path)}
+    return CampaignJob(1, CONTACTS, "contatos.csv", "telefone", "Olá {nome}", {**options, **sender_options})
+
+
+def test_finished_campaign_is_done(tmp_path, fake_helper):
+    job = _job(tmp_path, fake_helper())
+    job.run()
+
+    assert job.state == JOB_DONE
+    assert len(job.results) == 2
+
+
+def test_authentication_failure_is_an_error(tmp_path, fake_helper):
+    helper = fake_helper(logged_in=False, latencies={"qr": 3600})
+    job = _job(tmp_path, helper, auth_timeout=1)
+    job.run()
+
+    assert job.state == JOB_ERROR
+    assert job.results == []
+    assert "autenticar" in job.status_message
+    assert helper.drivers[-1].sent == []
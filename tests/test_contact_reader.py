@@ -0,0 +1,51 @@
+import io
+
+from openpyxl import Workbook
+
+from contact_reader import iter_contact_batches
+from message_template import MessageTemplate
+
+
+def _xlsx(rows) -> io.BytesIO:
+    workbook = Workbook()
+    for row in rows:
+        workbook.active.append(row)
+    buffer = io.BytesIO()
+    workbook.save(buffer)
+    buffer.seek(0)
+    return buffer
+
+
+def test_csv_empty_cells_become_empty_text():
+    source = io.BytesIO("telefone,nome\n11987654321,\n11912345678,Ana\n".encode("utf-8"))
+    batch = next(iter_contact_batches(source, "contatos.csv"))
+
+    assert batch["nome"].tolist() == ["", "Ana"]
+    assert MessageTemplate("Olá {nome}").render(batch).tolist() == ["Olá ", "Olá Ana"]
+
+
+def test_excel_empty_cells_become_empty_text():
+    source = _xlsx([("telefone", "nome"), (11987654321, None), (11912345678, "Ana")])
+    batches = list(iter_contact_batches(source, "contatos.xlsx", batch_size=1))
+
+    assert [batch.index[0] for batch in batches] == [0, 1]
+    assert batches[0].iloc[0].tolist() == ["11987654321", ""]
+    assert MessageTemplate("Olá {nome}").render(batches[0]).tolist() == ["Olá "]
+
+
+def test_normalized_batches_skip_cached_numbers(tmp_path):
+    from contact_reader import iter_normalized_batches
+    from number_cache import InvalidNumberCache
+    from phone_utils import STATUS_DUPLICATE, STATUS_INVALID, STATUS_VALID
+
+    cache = InvalidNumberCache(str(tmp_path / "invalid_numbers.json"))
+    cache.add("5511912345678", "sem_whatsapp")
+    source = io.BytesIO(b"telefone\n11987654321\n11912345678\n123\n11987654321\n")
+    summary = dict.fromkeys((STATUS_VALID, STATUS_INVALID, STATUS_DUPLICATE), 0)
+
+    batches = list(iter_normalized_batches(source, "telefone", summary, filename="contatos.csv",
+                                           batch_size=2, invalid_cache=cache))
+
+    statuses = [status for _, normalized in batches for status in normalized["status"]]
+    assert statuses == [STATUS_VALID, "sem_whatsapp", STATUS_INVALID, STATUS_DUPLICATE]
+    assert summary == {STATUS_VALID: 1, STATUS_INVALID: 1, STATUS_DUPLICATE: 1, "sem_whatsapp": 1}
@@ -0,0 +1,70 @@
+import importlib.util
+import io
+from urllib.parse import parse_qs, urlparse
+
+import pandas as pd
+import pytest
+
+import cli
+from link_export import iter_link_batches, write_links
+from message_template import MessageTemplate
+from phone_utils import STATUS_DUPLICATE, STATUS_INVALID, STATUS_VALID
+
+
+@pytest.fixture
+def without_pyarrow(monkeypatch):
+    real_find_spec = importlib.util.find_spec
+    monkeypatch.setattr(importlib.util, "find_spec",
+                        lambda name, *args: None if name == "pyarrow" else real_find_spec(name, *args))
+
+
+def test_write_links_checks_pyarrow_before_reading(tmp_path, without_pyarrow):
+    def batches():
+        raise AssertionError("o arquivo de contatos não deveria ser lido")
+        yield
+
+    with pytest.raises(ValueError, match="pyarrow"):
+        write_links(batches(), str(tmp_path / "links.parquet"))
+
+
+def test_cli_links_parquet_fails_before_reading_input(tmp_path, without_pyarrow, caplog):
+    missing = str(tmp_path / "nao_existe.csv")
+    argv = [missing, "--phone-column", "telefone", "--message", "Olá", "--links", "--format", "parquet"]
+
+    assert cli.main(argv) == cli.EXIT_FAILED
+    assert "pyarrow" in caplog.text
+
+
+MESSAGE = "Olá {nome}! Promoção 50% & frete grátis #hoje\nAcesse a/b?c=1 😀"
+
+
+def _links(tmp_path, output: str):
+    source = io.BytesIO("telefone,nome\n11987654321,João & Maria\n123,Ana\n11912345678,Zé+1\n".encode("utf-8"))
+    summary = dict.fromkeys((STATUS_VALID, STATUS_INVALID, STATUS_DUPLICATE), 0)
+    path = str(tmp_path / output)
+    written = write_links(iter_link_batches(source, "telefone", MessageTemplate(MESSAGE), summary,
+                                            filename="contatos.csv", batch_size=2), path)
+    links = pd.read_parquet(path) if output.endswith(".parquet") else pd.read_csv(path, dtype=str)
+    decoded = [parse_qs(urlparse(link).query) for link in links["whatsapp_link"]]
+    return written, summary, links, decoded
+
+
+@pytest.mark.parametrize("output", ["links.csv", "links.parquet"])
+def test_links_round_trip_the_message(tmp_path, output):
+    written, summary, links, decoded = _links(tmp_path, output)
+
+    expected = [MESSAGE.format(nome="João & Maria"), MESSAGE.format(nome="Zé+1")]
+    assert written == 2
+    assert summary[STATUS_INVALID] == 1
+    assert links["message"].tolist() == expected
+    assert [query["phone"] for query in decoded] == [["5511987654321"], ["5511912345678"]]
+    assert [query["text"][0] for query in decoded] == expected
+
+
+def test_links_have_no_raw_separators(tmp_path):
+    _, _, links, _ = _links(tmp_path, "links.csv")
+
+    for link in links["whatsapp_link"]:
+        text = link.split("&text=", 1)[1]
+        assert not set(text) & set(" &#+?/\n")
+        assert text.isascii()
@@ -0,0 +1,135 @@
+import importlib.util
+import os
+
+import pytest
+
+import campaign_journal
+from campaign_journal import CampaignJournal, check_report_format
+from message_sender import MessageSender
+from phone_utils import STATUS_DUPLICATE, STATUS_INVALID, STATUS_VALID
+from send_scheduler import RatePolicy
+from whatsapp_helper import STATUS_NOT_ON_WHATSAPP, STATUS_SENT
+
+
+def _contacts(tmp_path):
+    path = tmp_path / "contatos.csv"
+    path.write_text("telefone,nome\n11987654321,Ana\n11912345678,Bia\n123,Caio\n", encoding="utf-8")
+    return str(path)
+
+
+def test_parquet_requires_pyarrow(monkeypatch):
+    real_find_spec = importlib.util.find_spec
+    monkeypatch.setattr(importlib.util, "find_spec",
+                        lambda name, *args: None if name == "pyarrow" else real_find_spec(name, *args))
+
+    check_report_format("csv")
+    with pytest.raises(ValueError, match="pyarrow"):
+        check_report_format("parquet")
+    with pytest.raises(ValueError):
+        check_report_format("xml")
+
+
+def test_missing_pyarrow_stops_before_the_browser(tmp_path, monkeypatch, fake_helper):
+    monkeypatch.setattr(campaign_journal.importlib.util, "find_spec", lambda name, *args: None)
+    helper = fake_helper()
+    sender = MessageSender(whatsapp=helper, rate_policy=RatePolicy(interval=0), reports_dir=str(tmp_path))
+    statuses = []
+    sender.set_status_callback(statuses.append)
+
+    assert sender.process_file(_contacts(tmp_path), "telefone", "Olá {nome}", report_format="parquet") == []
+    assert "pyarrow" in statuses[-1]
+    assert helper.driver.current_url == "about:blank"
+    assert not os.path.exists(sender.journal_path)
+
+
+def test_report_failure_falls_back_to_csv(tmp_path, monkeypatch, fake_helper):
+    export = CampaignJournal.export
+
+    def parquet_fails(self, campaign_id, path, labels=None):
+        if path.endswith(".parquet"):
+            raise OSError("disco cheio")
+        return export(self, campaign_id, path, labels)
+
+    monkeypatch.setattr(CampaignJournal, "export", parquet_fails)
+    sender = MessageSender(whatsapp=fake_helper(), rate_policy=RatePolicy(interval=0), reports_dir=str(tmp_path))
+
+    results = sender.process_file(_contacts(tmp_path), "telefone", "Olá {nome}", report_format="parquet",
+                                  campaign_id="relatorio")
+
+    assert len(results) == 2
+    assert sender.progress["finished"]
+    assert sender.progress["report_file"] == os.path.join(str(tmp_path), "report_relatorio.csv")
+    assert os.path.exists(sender.progress["report_file"])
+
+
+def test_report_failure_keeps_results(tmp_path, monkeypatch, fake_helper):
+    def always_fails(self, campaign_id, path, labels=None):
+        raise OSError("disco cheio")
+
+    monkeypatch.setattr(CampaignJournal, "export", always_fails)
+    sender = MessageSender(whatsapp=fake_helper(), rate_policy=RatePolicy(interval=0), reports_dir=str(tmp_path))
+
+    results = sender.process_file(_contacts(tmp_path), "telefone", "Olá {nome}")
+
+    assert len(results) == 2
+    assert sender.progress["finished"]
+    assert sender.progress["report_file"] is None
+
+
+def test_invalid_cache_is_saved_once_per_campaign(tmp_path, monkeypatch, fake_helper):
+    from number_cache import InvalidNumberCache
+
+    saves = []
+    save = InvalidNumberCache.save
+    monkeypatch.setattr(InvalidNumberCache, "save", lambda self: saves.append(len(self)) or save(self))
+    path = tmp_path / "contatos.csv"
+    path.write_text("telefone\n" + "".join(f"5511987654{i:03d}\n" for i in range(6)), encoding="utf-8")
+    dead = [f"5511987654{i:03d}" for i in range(4)]
+    sender = MessageSender(whatsapp=fake_helper(invalid_numbers=dead), rate_policy=RatePolicy(interval=0),
+                           reports_dir=str(tmp_path))
+
+    sender.process_file(str(path), "telefone", "Olá")
+
+    assert saves == [4]
+    assert len(InvalidNumberCache(sender.invalid_cache.path)) == 4
+
+
+def test_no_valid_numbers_stops_before_the_browser(tmp_path, fake_helper):
+    path = tmp_path / "contatos.csv"
+    path.write_text("telefone,nome\n123,Ana\n,Bia\n", encoding="utf-8")
+    helper = fake_helper()
+    sender = MessageSender(whatsapp=helper, rate_policy=RatePolicy(interval=0), reports_dir=str(tmp_path))
+    statuses = []
+    sender.set_status_callback(statuses.append)
+
+    assert sender.process_file(str(path), "telefone", "Olá {nome}") == []
+    assert statuses == ["Números válidos: 0 | inválidos: 2 | duplicados: 0 | sem WhatsApp: 0",
+                        "Erro: Nenhum número válido para envio"]
+    assert helper.driver.current_url == "about:blank"
+    assert not sender.progress["finished"]
+
+
+def test_summary_is_reported_before_authentication(tmp_path, fake_helper):
+    sender = MessageSender(whatsapp=fake_helper(), rate_policy=RatePolicy(interval=0), reports_dir=str(tmp_path))
+    statuses = []
+    sender.set_status_callback(statuses.append)
+
+    sender.process_file(_contacts(tmp_path), "telefone", "Olá {nome}")
+
+    summary = "Números válidos: 2 | inválidos: 1 | duplicados: 0 | sem WhatsApp: 0"
+    assert statuses.index(summary) < statuses.index("WhatsApp Web autenticado com sucesso!")
+    assert "Iniciando processamento de 3 contatos..." in statuses
+
+
+def test_numbers_refused_during_the_run_count_as_not_on_whatsapp(tmp_path, fake_helper):
+    sender = MessageSender(whatsapp=fake_helper(invalid_numbers=["5511912345678"]),
+                           rate_policy=RatePolicy(interval=0), reports_dir=str(tmp_path))
+    statuses = []
+    sender.set_status_callback(statuses.append)
+
+    results = sender.process_file(_contacts(tmp_path), "telefone", "Olá {nome}")
+
+    assert [result["status"] for result in results] == [STATUS_SENT, STATUS_NOT_ON_WHATSAPP]
+    assert sender.progress["summary"] == {STATUS_VALID: 1, STATUS_INVALID: 1, STATUS_DUPLICATE: 0,
+                                          STATUS_NOT_ON_WHATSAPP: 1}
+    assert "Números válidos: 1 | inválidos: 1 | duplicados: 0 | sem WhatsApp: 1" in statuses
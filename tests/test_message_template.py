@@ -0,0 +1,55 @@
+from urllib.parse import quote
+
+import pandas as pd
+import pytest
+
+from message_template import MessageTemplate
+
+
+def test_double_braces_are_literal():
+    template = MessageTemplate("Olá {nome}, use o cupom {{PROMO}} até {data}")
+    df = pd.DataFrame({"nome": ["Ana"], "data": ["10/06"]})
+
+    assert template.fields == ["nome", "data"]
+    assert template.render(df).tolist() == ["Olá Ana, use o cupom {PROMO} até 10/06"]
+    assert template.render_row({"nome": "Ana", "data": "10/06"}) == "Olá Ana, use o cupom {PROMO} até 10/06"
+
+
+def test_missing_columns_are_reported():
+    template = MessageTemplate("Olá {nome} da {empresa}, {nome}!")
+
+    assert template.fields == ["nome", "empresa"]
+    assert template.missing_fields(["telefone", "nome"]) == ["empresa"]
+    with pytest.raises(ValueError, match="empresa"):
+        template.render(pd.DataFrame({"nome": ["Ana"]}))
+
+
+
+def test_format_spec_and_conversion_use_the_bare_column():
+    template = MessageTemplate("{nome!s}, seu saldo é R$ {valor:.2f} ({codigo:>4}) {nome!r}")
+    df = pd.DataFrame({"nome": ["Ana", "Bia"], "valor": ["12.5", "7"], "codigo": ["7", "12"]})
+
+    assert template.fields == ["nome", "valor", "codigo"]
+    assert template.missing_fields(df.columns) == []
+    assert template.render(df).tolist() == [
+        "Ana, seu saldo é R$ 12.50 (   7) 'Ana'",
+        "Bia, seu saldo é R$ 7.00 (  12) 'Bia'",
+    ]
+    assert template.render_row({"nome": "Ana", "valor": 12.5, "codigo": 7}) == "Ana, seu saldo é R$ 12.50 (   7) 'Ana'"
+
+
+def test_format_spec_rejects_text_values():
+    template = MessageTemplate("Saldo: {valor:.2f}")
+
+    assert template.render(pd.DataFrame({"valor": [""]})).tolist() == ["Saldo: "]
+    with pytest.raises(ValueError, match="abc"):
+        template.render(pd.DataFrame({"valor": ["abc"]}))
+
+def test_render_keeps_index_and_escapes_each_part():
+    template = MessageTemplate("Olá {nome} & cia")
+    df = pd.DataFrame({"nome": ["Ana Maria", "José"]}, index=[7, 9])
+
+    escaped = template.render(df, escape=lambda text: quote(text, safe=""))
+
+    assert escaped.index.tolist() == [7, 9]
+    assert escaped.tolist() == [quote(message, safe="") for message in template.render(df)]
@@ -0,0 +1,10 @@
+from metrics import MetricsRegistry
+
+
+def test_prometheus_escapes_label_values():
+    registry = MetricsRegistry()
+    registry.inc("errors", cause='falha "grave"\nem C:\\perfil')
+
+    line = registry.to_prometheus().splitlines()[-1]
+
+    assert line == 'galateia_errors_total{cause="falha \\"grave\\"\\nem C:\\\\perfil"} 1'
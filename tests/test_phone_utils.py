@@ -0,0 +1,77 @@
+import warnings
+
+import pandas as pd
+
+from phone_utils import STATUS_DUPLICATE, STATUS_INVALID, STATUS_VALID, normalize_phones, summarize_phones
+
+
+def _batch(start: int, size: int) -> pd.Series:
+    return pd.Series([f"1199{number:07d}" for number in range(start, start + size)],
+                     index=pd.RangeIndex(start, start + size))
+
+
+def test_seen_keeps_numbers_from_every_previous_batch():
+    seen = set()
+    for start in range(0, 50_000, 5_000):
+        assert (normalize_phones(_batch(start, 5_000), seen)["status"] == STATUS_VALID).all()
+
+    # Lote final com números do primeiro e do quinto lotes, mais um número novo
+    late = pd.Series(["11990000000", "(11) 99002-0001", "11990100000"], index=[50_000, 50_001, 50_002])
+    normalized = normalize_phones(late, seen)
+
+    assert normalized["status"].tolist() == [STATUS_DUPLICATE, STATUS_DUPLICATE, STATUS_VALID]
+    assert isinstance(seen, set) and len(seen) == 50_001
+
+
+def test_seen_marks_duplicates_across_batches():
+    seen = set()
+    first = normalize_phones(pd.Series(["11987654321", "11912345678"]), seen)
+    second = normalize_phones(pd.Series(["(11) 98765-4321", "11955554444"], index=[2, 3]), seen)
+
+    assert first["status"].tolist() == [STATUS_VALID, STATUS_VALID]
+    assert second["status"].tolist() == [STATUS_DUPLICATE, STATUS_VALID]
+    assert seen == {"5511987654321", "5511912345678", "5511955554444"}
+
+
+
+def test_batch_without_valid_numbers_keeps_seen():
+    seen = {"5511987654321"}
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")  # pandas 2 avisa (e o 3 recusa) a atribuição de [] numa Series bool
+        normalized = normalize_phones(pd.Series(["123", None], index=[4, 5]), seen)
+
+    assert normalized["status"].tolist() == [STATUS_INVALID, STATUS_INVALID]
+    assert seen == {"5511987654321"}
+
+def test_adds_country_code_and_ninth_digit():
+    normalized = normalize_phones(pd.Series([
+        "(11) 98765-4321",   # celular com DDD
+        "+55 11 8765-4321",  # celular antigo: recebe o nono dígito
+        "1187654321",        # celular antigo sem código do país
+        "011 3456-7890",     # fixo com zero na frente
+        "11987654321.0",     # número lido como float do Excel
+    ]))
+
+    assert normalized["phone"].tolist() == [
+        "5511987654321", "5511987654321", "5511987654321", "551134567890", "5511987654321",
+    ]
+    assert normalized["status"].tolist() == [STATUS_VALID, STATUS_DUPLICATE, STATUS_DUPLICATE,
+                                             STATUS_VALID, STATUS_DUPLICATE]
+
+
+def test_rejects_invalid_ddd_and_numbers():
+    normalized = normalize_phones(pd.Series([
+        "(10) 98765-4321",   # DDD com zero
+        "(20) 3456-7890",
+        "11 1234-5678",      # fixo não começa com 1
+        "123",
+        None,
+    ]))
+
+    assert normalized["status"].tolist() == [STATUS_INVALID] * 5
+    assert normalized["phone"].isna().all()
+
+
+def test_summarize_counts_each_status():
+    normalized = normalize_phones(pd.Series(["11987654321", "11987654321", "123"]))
+    assert summarize_phones(normalized) == {STATUS_VALID: 1, STATUS_INVALID: 1, STATUS_DUPLICATE: 1, "total": 3}
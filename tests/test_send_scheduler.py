@@ -0,0 +1,82 @@
+import threading
+from datetime import datetime, timedelta
+
+import pytest
+
+from send_scheduler import RateLimiter, RatePolicy, SendScheduler, TokenBucket
+
+
+def test_token_bucket_starts_full_and_refills(fake_clock):
+    bucket = TokenBucket(3, 60, fake_clock.monotonic)
+
+    for _ in range(3):
+        assert bucket.wait_time() == 0
+        bucket.consume()
+    assert bucket.wait_time() == 20
+
+    fake_clock.sleep(20)
+    assert bucket.wait_time() == 0
+    fake_clock.sleep(3600)
+    bucket.consume()
+    assert bucket.tokens == 2  # nunca passa da capacidade
+
+
+def test_rate_limiter_interval_and_bucket(fake_clock):
+    limiter = RateLimiter(RatePolicy(interval=5, per_minute=3), clock=fake_clock.now,
+                          monotonic=fake_clock.monotonic)
+
+    starts = []
+    for _ in range(5):
+        assert limiter.acquire()
+        starts.append(fake_clock.elapsed)
+
+    # Três envios no ritmo do intervalo; o quarto espera a ficha (20s por ficha)
+    assert starts == pytest.approx([0, 5, 10, 20, 40], abs=0.01)
+
+
+def test_rate_limiter_waits_for_quiet_hours_to_end(fake_clock):
+    fake_clock.start = datetime(2026, 1, 5, 21, 30)
+    limiter = RateLimiter(RatePolicy(interval=0, quiet_hours=(22, 8)), clock=fake_clock.now,
+                          monotonic=fake_clock.monotonic)
+
+    assert limiter.wait_time() == 0
+    fake_clock.sleep(3600)
+    assert limiter.acquire()
+    assert fake_clock.now() - datetime(2026, 1, 6, 8, 0) < timedelta(seconds=0.01)
+
+
+class PausingLimiter:
+    """Limitador cuja espera termina com uma pausa pedida no meio dela"""
+
+    def __init__(self, resume_event: threading.Event, stop_event: threading.Event, cancel: bool):
+        self.resume_event = resume_event
+        self.stop_event = stop_event
+        self.cancel = cancel
+
+    def acquire(self, idle=None, stop_event=None) -> bool:
+        self.resume_event.clear()
+        if self.cancel:
+            self.stop_event.set()
+        else:
+            threading.Timer(0.05, self.resume_event.set).start()
+        return True
+
+
+@pytest.mark.parametrize("cancel", [True, False])
+def test_pause_during_rate_wait_holds_the_send(cancel):
+    resume_event, stop_event = threading.Event(), threading.Event()
+    resume_event.set()
+    limiter = PausingLimiter(resume_event, stop_event, cancel)
+    scheduler = SendScheduler(RatePolicy(interval=0), stop_event=stop_event, resume_event=resume_event,
+                              limiter=limiter)
+    sent = []
+
+    def send(task):
+        assert resume_event.is_set(), "envio feito durante a pausa"
+        sent.append(task["phone"])
+        return "enviado"
+
+    finished = scheduler.run([{"phone": "5511987654321", "message": "Olá"}], send, lambda task: None)
+
+    assert finished is not cancel
+    assert sent == ([] if cancel else ["5511987654321"])
@@ -0,0 +1,67 @@
+import pytest
+
+from metrics import metrics
+from whatsapp_helper import NAVIGATION_APP, NAVIGATION_URL, STATUS_NOT_ON_WHATSAPP, STATUS_SENT
+
+
+def _counter(name: str) -> float:
+    return sum(counter["value"] for counter in metrics.snapshot()["counters"] if counter["name"] == name)
+
+
+def test_sends_through_the_fake_driver(fake_helper):
+    helper = fake_helper(invalid_numbers=["5511912345678"])
+    assert helper.authenticate_whatsapp(timeout=5)
+
+    assert helper.send_message_status("5511987654321", "Olá") == STATUS_SENT
+    assert helper.send_message_status("5511912345678", "Olá") == STATUS_NOT_ON_WHATSAPP
+
+    assert helper.drivers[-1].sent == [("5511987654321", "Olá")]
+
+
+
+@pytest.mark.parametrize("navigation", [NAVIGATION_APP, NAVIGATION_URL])
+def test_invalid_number_popup_does_not_leak_into_the_next_chat(fake_helper, navigation):
+    helper = fake_helper(invalid_numbers=["5511912345678"], navigation=navigation)
+    assert helper.authenticate_whatsapp(timeout=5)
+
+    assert helper.send_message_status("5511912345678", "Olá") == STATUS_NOT_ON_WHATSAPP
+    assert helper.send_message_status("5511987654321", "Olá") == STATUS_SENT
+
+    assert helper.drivers[-1].sent == [("5511987654321", "Olá")]
+
+def test_repeated_chat_switch_failures_switch_to_url(fake_helper):
+    helper = fake_helper(latencies={"chat_switch": 1.0}, chat_switch_timeout=0.05, max_chat_switch_fallbacks=3)
+    assert helper.authenticate_whatsapp(timeout=5)
+
+    statuses = [helper.send_message_status(f"55119876543{i:02d}", "Olá") for i in range(5)]
+
+    assert statuses == [STATUS_SENT] * 5
+    assert helper.navigation == NAVIGATION_URL
+    assert _counter("fallbacks") == 3
+    assert _counter("navigation_switches") == 1
+
+
+def test_successful_chat_switch_resets_the_count(fake_helper):
+    helper = fake_helper(chat_switch_timeout=0.05, max_chat_switch_fallbacks=2)
+    assert helper.authenticate_whatsapp(timeout=5)
+    driver = helper.drivers[0]
+
+    for i in range(4):
+        # Falhas alternadas com trocas bem-sucedidas nunca chegam ao limite
+        driver.latencies["chat_switch"] = 1.0 if i % 2 == 0 else 0.0
+        assert helper.send_message_status(f"55119876543{i:02d}", "Olá") == STATUS_SENT
+
+    assert helper.navigation == NAVIGATION_APP
+    assert _counter("fallbacks") == 2
+
+
+def test_is_alive_follows_the_fake_session(fake_helper):
+    helper = fake_helper()
+    assert helper.is_alive()
+
+    helper.drivers[-1].alive = False
+    assert not helper.is_alive()
+
+    helper.drivers[-1].alive = True
+    helper.drivers[-1].quit()
+    assert not helper.is_alive()
@@ -0,0 +1,127 @@
+import hashlib
+import io
+import logging
+import threading
+from collections import OrderedDict
+from typing import List, Optional
+
+import pandas as pd
+
+from contact_reader import count_rows, read_columns, read_preview
+from metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+# Limites do cache: quantidade de arquivos e memória ocupada pelas amostras (bytes)
+DEFAULT_MAX_ENTRIES = 16
+DEFAULT_MAX_BYTES = 64 * 2 ** 20
+
+# Linhas lidas para a visualização e o preview das mensagens
+DEFAULT_SAMPLE_ROWS = 5
+
+
+class UploadInfo:
+    def __init__(self, digest: str, filename: str, size: int, columns: List[str],
+                 sample: pd.DataFrame, total_rows: Optional[int]):
+        """
+        Dados de um arquivo de contatos necessários à interface
+        Args:
+            digest (str): Hash do conteúdo
+            filename (str): Nome do arquivo
+            size (int): Tamanho do arquivo (bytes)
+            columns (List[str]): Colunas do cabeçalho
+            sample (pd.DataFrame): Primeiras linhas, para visualização e preview
+            total_rows (int): Total de registros, ou None se não foi possível estimar
+        """
+        self.digest = digest
+        self.filename = filename
+        self.size = size
+        self.columns = columns
+        self.sample = sample
+        self.total_rows = total_rows
+        self.memory = int(sample.memory_usage(deep=True).sum())
+
+
+class UploadCache:
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES, max_bytes: int = DEFAULT_MAX_BYTES,
+                 sample_rows: int = DEFAULT_SAMPLE_ROWS):
+        """
+        Cache, pelo hash do conteúdo, da leitura dos arquivos enviados: cada rerun do
+        Streamlit com o mesmo arquivo reaproveita cabeçalho, amostra e contagem de linhas
+        Args:
+            max_entries (int): Máximo de arquivos em cache
+            max_bytes (int): Memória máxima ocupada pelas amostras (bytes)
+            sample_rows (int): Linhas lidas de cada arquivo para a amostra
+        """
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.sample_rows = sample_rows
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def digest(data: bytes, filename: str) -> str:
+        """Hash do conteúdo e do nome (a extensão define o formato da leitura)"""
+        hasher = hashlib.blake2b(data, digest_size=16)
+        hasher.update(filename.lower().encode())
+        return hasher.hexdigest()
+
+    def get(self, data: bytes, filename: str) -> UploadInfo:
+        """
+        Retorna os dados do arquivo, lendo-o da memória apenas na primeira vez
+        Args:
+            data (bytes): Conteúdo do arquivo
+            filename (str): Nome do arquivo, usado para identificar o formato
+        Returns:
+            UploadInfo: Colunas, amostra e total de registros
+        """
+        key = self.digest(data, filename)
+        with self._lock:
+            info = self._entries.get(key)
+            if info is not None:
+                self._entries.move_to_end(key)
+                metrics.inc("upload_cache", result="hit")
+                return info
+
+        metrics.inc("upload_cache", result="miss")
+        with metrics.timer("parse_upload"):
+            columns = read_columns(io.BytesIO(data), filename)
+            sample = read_preview(io.BytesIO(data), filename, rows=self.sample_rows)
+            total_rows = count_rows(io.BytesIO(data), filename)
+        info = UploadInfo(key, filename, len(data), columns, sample, total_rows)
+
+        with self._lock:
+            if key not in self._entries:
+                self._entries[key] = info
+                self._bytes += info.memory
+                self._evict()
+        return info
+
+    def _evict(self):
+        """Descarta os arquivos usados há mais tempo até respeitar os limites"""
+        while len(self._entries) > 1 and (len(self._entries) > self.max_entries or self._bytes > self.max_bytes):
+            _, info = self._entries.popitem(last=False)
+            self._bytes -= info.memory
+            logger.debug(f"Arquivo {info.filename} removido do cache de uploads")
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_upload_cache() -> UploadCache:
+    """Retorna o cache de uploads do processo (sobrevive aos reruns do Streamlit)"""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = UploadCache()
+        return _cache
@@ -1,26 +1,356 @@
 from selenium import webdriver
 from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
+from selenium.webdriver.common.keys import Keys
 from selenium.common.exceptions import TimeoutException, NoSuchElementException
+from urllib.parse import quote
+import os
+import threading
 import time
 import logging
 
-logging.basicConfig(level=logging.INFO)
+from metrics import metrics
+from phone_utils import format_phone
+from whatsapp_selectors import CHAT_SELECTORS, PAGE_SELECTORS, SelectorHealthError, get_selector_registry
+
 logger = logging.getLogger(__name__)
 
-class WhatsAppHelper:
-    def __init__(self, headless=False):
+# Diretório padrão do perfil do Chrome usado para manter a sessão do WhatsApp
+DEFAULT_PROFILE_DIR = os.getenv("GALATEIA_CHROME_PROFILE", os.path.join(os.getcwd(), ".chrome_profile"))
+
+WHATSAPP_URL = "https://web.whatsapp.com"
+
+# Modos de navegação até o chat do destinatário
+NAVIGATION_APP = "app"  # Abre o chat dentro do WhatsApp Web já carregado
+NAVIGATION_URL = "url"  # Recarrega web.whatsapp.com/send a cada destinatário
+CHAT_OPENED = "aberto"
+
+# Falhas seguidas da troca de chat no app antes de passar a navegar pela URL
+MAX_CHAT_SWITCH_FALLBACKS = 5
+
+# Status de envio de uma mensagem
+STATUS_SENT = "enviado"      # Balão de saída com o check do servidor
+STATUS_PENDING = "pendente"  # Mensagem saiu do campo de texto, mas ainda está na fila (relógio)
+STATUS_FAILED = "falhou"     # Mensagem não chegou a sair do campo de texto
+STATUS_NOT_ON_WHATSAPP = "sem_whatsapp"  # WhatsApp informou que o número é inválido
+
+# Backends de automação do navegador
+BACKEND_SELENIUM = "selenium"  # Chrome controlado pelo chromedriver (padrão)
+BACKEND_CDP = "cdp"            # Chrome controlado direto pelo DevTools Protocol (ver cdp_helper)
+
+# Intervalo de verificação do DOM durante as esperas (segundos)
+POLL_INTERVAL = 0.1
+
+# Estado do último balão de saída: None enquanto nenhum balão novo aparecer
+# (argumentos: quantidade de balões antes do clique, seletor do balão, seletor do check)
+_OUTGOING_STATE_JS = """
+const bubbles = document.querySelectorAll(arguments[1]);
+if (bubbles.length <= arguments[0]) return null;
+const last = bubbles[bubbles.length - 1];
+return last.querySelector(arguments[2]) ? 'enviado' : 'pendente';
+"""
+
+# Abre o chat por um link wa.me, que o WhatsApp Web intercepta sem recarregar a página
+_OPEN_CHAT_JS = """
+window.__galateiaPreviousMain = document.querySelector('#main');
+const link = document.createElement('a');
+link.href = 'https://wa.me/' + arguments[0];
+link.style.display = 'none';
+document.body.appendChild(link);
+link.click();
+link.remove();
+"""
+
+# Verdadeiro quando o painel de conversa foi trocado e o campo de texto está pronto
+# (argumento: seletor do campo de texto)
+_CHAT_OPENED_JS = """
+const main = document.querySelector('#main');
+return !!main && main !== window.__galateiaPreviousMain && !!main.querySelector(arguments[0]);
+"""
+
+# Classifica popups de erro do WhatsApp Web (ex.: "número compartilhado por URL é inválido")
+# (argumento: seletor do popup)
+_ERROR_STATE_JS = """
+const popup = document.querySelector(arguments[0]);
+if (!popup) return null;
+const text = (popup.innerText || '').toLowerCase();
+const invalid = ['inválido', 'invalid', 'não está no whatsapp', "isn't on whatsapp", 'not on whatsapp'];
+return invalid.some(term => text.includes(term)) ? 'sem_whatsapp' : null;
+"""
+
+# Clica no OK do popup de erro; aberto, ele seria lido como recusa do próximo número
+# (argumento: seletor do botão do popup)
+_DISMISS_POPUP_JS = """
+const button = document.querySelector(arguments[0]);
+if (button) button.click();
+return !!button;
+"""
+
+# Guarda o anexo na página como File, reaproveitado em todos os chats até a página recarregar
+# (argumentos: hash, nome, tipo MIME, conteúdo em base64)
+_STAGE_ATTACHMENT_JS = """
+const binary = atob(arguments[3]);
+const bytes = new Uint8Array(binary.length);
+for (let i = 0; i < binary.length; i++) bytes[i] = binary.charCodeAt(i);
+window.__galateiaAttachments = window.__galateiaAttachments || {};
+window.__galateiaAttachments[arguments[0]] = new File([bytes], arguments[1], {type: arguments[2]});
+return bytes.length;
+"""
+
+# Verdadeiro se o anexo já está guardado na página (argumento: hash)
+_ATTACHMENT_STAGED_JS = """
+return !!(window.__galateiaAttachments && window.__galateiaAttachments[arguments[0]]);
+"""
+
+# Cola o anexo guardado no campo de texto, como um arquivo da área de transferência; o WhatsApp
+# Web abre a prévia com o campo de legenda (argumentos: hash, seletor do campo de texto)
+_PASTE_ATTACHMENT_JS = """
+const file = (window.__galateiaAttachments || {})[arguments[0]];
+const composer = document.querySelector(arguments[1]);
+if (!file || !composer) return false;
+const data = new DataTransfer();
+data.items.add(file);
+composer.focus();
+composer.dispatchEvent(new ClipboardEvent('paste', {clipboardData: data, bubbles: true, cancelable: true}));
+return true;
+"""
+
+# Insere texto no elemento editável com foco (argumentos: elemento, texto)
+_INSERT_TEXT_JS = "arguments[0].focus(); return document.execCommand('insertText', false, arguments[1]);"
+
+# Instâncias mantidas vivas entre execuções (reruns do Streamlit, jobs do MessageSender)
+_shared_helpers = {}
+_shared_lock = threading.Lock()
+
+class BaseWhatsAppHelper:
+    def __init__(self, headless=False, user_data_dir=None, send_timeout=20, confirm_timeout=10, sync_timeout=30,
+                 navigation=NAVIGATION_APP, chat_switch_timeout=5, base_url=WHATSAPP_URL, selectors=None,
+                 upload_timeout=60, max_chat_switch_fallbacks=MAX_CHAT_SWITCH_FALLBACKS):
+        """
+        Envio, seletores e anexos comuns aos backends; as subclasses (WhatsAppHelper e
+        CDPWhatsAppHelper) implementam a execução de scripts na página e as esperas
+        Args:
+            Os mesmos de WhatsAppHelper, exceto driver_factory
+        """
+        self.selectors = selectors or get_selector_registry()
+        # Seletores do chat aberto já conferidos nesta sessão (ver _verify_chat_selectors)
+        self._chat_selectors_ok = False
+        self.base_url = base_url.rstrip("/")
+        self.headless = headless
+        self.user_data_dir = user_data_dir
+        self.send_timeout = send_timeout
+        self.confirm_timeout = confirm_timeout
+        self.sync_timeout = sync_timeout
+        self.navigation = navigation
+        self.chat_switch_timeout = chat_switch_timeout
+        self.upload_timeout = upload_timeout
+        self.max_chat_switch_fallbacks = max_chat_switch_fallbacks
+        self._chat_switch_fallbacks = 0
+        with metrics.timer("setup_driver"):
+            self._setup_driver()
+
+    # --- Primitivas de cada backend ---
+
+    def _setup_driver(self):
+        """Abre o navegador"""
+        raise NotImplementedError
+
+    def _authenticate(self, timeout):
+        """Executa a autenticação (ver authenticate_whatsapp)"""
+        raise NotImplementedError
+
+    def _send(self, phone, message, attachment=None):
+        """Executa o envio para um número já normalizado (ver send_message_status)"""
+        raise NotImplementedError
+
+    def _missing_selectors(self, names):
+        """
+        Seletores sem nenhum elemento na página atual
+        Args:
+            names (Sequence[str]): Seletores que devem estar presentes
+        Returns:
+            List[str]: Seletores sem resultado
+        """
+        raise NotImplementedError
+
+    def _close_error_popup(self):
+        """Clica no OK do popup de erro e aguarda ele sumir; retorna False se continuar aberto"""
+        raise NotImplementedError
+
+    def _attachment_staged(self, attachment):
+        """Verdadeiro se o anexo já está guardado na página"""
+        raise NotImplementedError
+
+    def _store_attachment(self, attachment):
+        """Guarda o anexo na página"""
+        raise NotImplementedError
+
+    def reload_page(self):
+        """Recarrega o WhatsApp Web na mesma aba, liberando a memória acumulada pela página"""
+        raise NotImplementedError
+
+    # --- Lógica comum ---
+
+    def authenticate_whatsapp(self, timeout=120):
+        """
+        Autentica no WhatsApp Web
+        Args:
+            timeout (int): Tempo máximo de espera em segundos (padrão: 120s)
+        Returns:
+            bool: True se autenticado com sucesso, False caso contrário
+        """
+        with metrics.timer("authenticate"):
+            authenticated = self._authenticate(timeout)
+        metrics.inc("authentications", result="ok" if authenticated else "erro")
+        return authenticated
+
+    def check_selectors(self):
+        """
+        Confere os seletores da página principal com o WhatsApp Web já autenticado
+        Raises:
+            SelectorHealthError: Se algum seletor não encontra mais nenhum elemento
+        """
+        self.selectors.refresh()
+        missing = self._missing_selectors(PAGE_SELECTORS)
+        if missing:
+            raise SelectorHealthError(
+                f"Interface do WhatsApp Web mudou: seletores sem resultado: {', '.join(missing)} "
+                f"(versão {self.selectors.version} de {self.selectors.path})"
+            )
+
+    def _verify_chat_selectors(self):
+        """
+        Chamado quando o botão de enviar não aparece antes da primeira mensagem confirmada:
+        com a página carregada, distingue uma mudança na interface de uma lentidão passageira
+        Raises:
+            SelectorHealthError: Se os seletores do chat não encontram nenhum elemento
+        """
+        if self._chat_selectors_ok:
+            return
+        try:
+            if self._missing_selectors(PAGE_SELECTORS):
+                return
+            missing = self._missing_selectors(CHAT_SELECTORS)
+        except Exception as e:
+            logger.warning(f"Não foi possível conferir os seletores do chat: {str(e)}")
+            return
+        if missing:
+            raise SelectorHealthError(
+                f"Interface do WhatsApp Web mudou: seletores do chat sem resultado: {', '.join(missing)} "
+                f"(versão {self.selectors.version} de {self.selectors.path})"
+            )
+
+    def send_message(self, phone, message, attachment=None):
+        """
+        Envia mensagem para um número específico
+        Args:
+            phone (str): Número do telefone (com ou sem código do país)
+            message (str): Mensagem a ser enviada (legenda, quando houver anexo)
+            attachment (Attachment): Arquivo enviado junto com a mensagem
+        Returns:
+            bool: True se o envio foi confirmado pelo WhatsApp, False caso contrário
+        """
+        return self.send_message_status(phone, message, attachment) == STATUS_SENT
+
+    def send_message_status(self, phone, message, attachment=None):
+        """
+        Envia mensagem para um número específico e aguarda a confirmação no DOM
+        Args:
+            phone (str): Número do telefone (com ou sem código do país)
+            message (str): Mensagem a ser enviada (legenda, quando houver anexo)
+            attachment (Attachment): Arquivo enviado junto com a mensagem; é transferido
+                para a página uma única vez e reaproveitado nos envios seguintes
+        Returns:
+            str: STATUS_SENT, STATUS_PENDING, STATUS_FAILED ou STATUS_NOT_ON_WHATSAPP
+        """
+        with metrics.timer("send_message"):
+            if self.selectors.refresh():
+                self._chat_selectors_ok = False
+            formatted = format_phone(phone)
+            if not formatted:
+                logger.error(f"Número inválido: {phone}")
+                status = STATUS_FAILED
+            else:
+                status = self._send(formatted, message, attachment)
+            if status == STATUS_NOT_ON_WHATSAPP:
+                logger.warning(f"Número {formatted} não está no WhatsApp")
+                self._dismiss_error_popup()
+        metrics.inc("messages", status=status)
+        return status
+
+    def _log_confirmation(self, phone, status):
+        """Registra o resultado do clique em enviar (check, relógio ou mensagem parada no campo)"""
+        if status == STATUS_SENT:
+            self._chat_selectors_ok = True
+            logger.info(f"Mensagem enviada com sucesso para {phone}")
+        elif status == STATUS_PENDING:
+            metrics.inc("timeouts", cause="confirm")
+            logger.warning(f"Mensagem para {phone} ainda pendente após {self.confirm_timeout}s")
+        else:
+            metrics.inc("timeouts", cause="confirm")
+            logger.error(f"Mensagem para {phone} não saiu do campo de texto")
+
+    def _dismiss_error_popup(self):
+        """Fecha o popup de número inválido; se ele não sumir, recarrega a página"""
+        try:
+            if not self._close_error_popup():
+                logger.warning("Popup de número inválido continua aberto, recarregando o WhatsApp Web")
+                self.reload_page()
+        except Exception as e:
+            logger.warning(f"Não foi possível fechar o popup de número inválido: {str(e)}")
+
+    def stage_attachment(self, attachment):
+        """
+        Transfere o anexo para a página, se ainda não estiver lá (de novo apenas após uma recarga)
+        Args:
+            attachment (Attachment): Arquivo a guardar na página
+        """
+        if self._attachment_staged(attachment):
+            return
+        with metrics.timer("attachment_transfer"):
+            self._store_attachment(attachment)
+        metrics.inc("attachment_transfers")
+        logger.info(f"Anexo {attachment.name} ({attachment.size} bytes) transferido para a página")
+
+    def _chat_switch_failed(self):
+        """Conta as falhas seguidas da troca de chat; no limite, passa a navegar pela URL"""
+        self._chat_switch_fallbacks += 1
+        limit = self.max_chat_switch_fallbacks
+        if limit and self._chat_switch_fallbacks >= limit and self.navigation == NAVIGATION_APP:
+            self.navigation = NAVIGATION_URL
+            metrics.inc("navigation_switches")
+            logger.warning(f"{limit} falhas seguidas ao abrir o chat no app: navegando pela URL até o fim da sessão")
+
+
+class WhatsAppHelper(BaseWhatsAppHelper):
+    def __init__(self, headless=False, user_data_dir=None, send_timeout=20, confirm_timeout=10, sync_timeout=30,
+                 navigation=NAVIGATION_APP, chat_switch_timeout=5, base_url=WHATSAPP_URL, driver_factory=None,
+                 selectors=None, upload_timeout=60, max_chat_switch_fallbacks=MAX_CHAT_SWITCH_FALLBACKS):
         """
         Inicializa o WhatsAppHelper
         Args:
             headless (bool): Se True, executa o Chrome em modo headless (sem interface gráfica)
+            user_data_dir (str): Diretório do perfil do Chrome; quando informado, a sessão
+                do WhatsApp Web é reaproveitada entre execuções sem novo QR code
+            send_timeout (int): Tempo máximo de espera pelo botão de enviar (segundos)
+            confirm_timeout (int): Tempo máximo de espera pelo check de envio (segundos)
+            sync_timeout (int): Tempo máximo de espera pela sincronização inicial dos chats (segundos)
+            navigation (str): NAVIGATION_APP troca de chat sem recarregar a página (com retorno
+                à URL em caso de falha); NAVIGATION_URL recarrega a página a cada destinatário
+            chat_switch_timeout (int): Tempo máximo para abrir o chat dentro do app (segundos)
+            base_url (str): Endereço do WhatsApp Web (ex.: o simulador local de fake_whatsapp)
+            driver_factory (Callable): Recebe as ChromeOptions e retorna o driver; permite usar
+                outro navegador ou o FakeWhatsAppDriver (padrão: webdriver.Chrome)
+            selectors (SelectorRegistry): Seletores do WhatsApp Web (padrão: whatsapp_selectors.json)
+            upload_timeout (int): Tempo máximo de espera pelo check de envio de um anexo (segundos)
+            max_chat_switch_fallbacks (int): Falhas seguidas da troca de chat no app antes de
+                passar a navegar pela URL até o fim da sessão (None desativa)
         """
         self.driver = None
-        self.headless = headless
-        self._setup_driver()
+        self.driver_factory = driver_factory
+        super().__init__(headless, user_data_dir, send_timeout, confirm_timeout, sync_timeout, navigation,
+                         chat_switch_timeout, base_url, selectors, upload_timeout, max_chat_switch_fallbacks)
     
     def _setup_driver(self):
         """Configura e inicializa o driver do Chrome"""
@@ -37,41 +367,57 @@ class WhatsAppHelper:
                 options.add_argument("--window-size=1920,1080")
                 logger.info("Modo headless ativado")
             
+            if self.user_data_dir:
+                os.makedirs(self.user_data_dir, exist_ok=True)
+                options.add_argument(f"--user-data-dir={os.path.abspath(self.user_data_dir)}")
+                logger.info(f"Usando perfil persistente do Chrome: {self.user_data_dir}")
+            
             # Inicializa o driver
-            self.driver = webdriver.Chrome(options=options)
+            if self.driver_factory:
+                self.driver = self.driver_factory(options)
+            else:
+                self.driver = webdriver.Chrome(options=options)
             logger.info("Driver do Chrome inicializado com sucesso")
             
         except Exception as e:
             logger.error(f"Erro ao configurar o driver: {str(e)}")
             raise
 
-    def authenticate_whatsapp(self, timeout=120):
-        """
-        Autentica no WhatsApp Web
-        Args:
-            timeout (int): Tempo máximo de espera em segundos (padrão: 120s)
-        Returns:
-            bool: True se autenticado com sucesso, False caso contrário
-        """
+    def _authenticate(self, timeout):
+        """Executa a autenticação (ver authenticate_whatsapp)"""
         try:
+            # Sessão já carregada nesta instância: nada a fazer
+            if self.is_authenticated():
+                logger.info("WhatsApp Web já autenticado")
+                return True
+
             logger.info("Iniciando autenticação do WhatsApp Web...")
-            self.driver.get("https://web.whatsapp.com")
+            self.driver.get(self.base_url)
             
-            # Primeiro aguarda o QR code aparecer
+            # Aguarda o QR code ou a lista de chats (sessão restaurada do perfil)
             logger.info("Aguardando QR code...")
-            WebDriverWait(self.driver, 40).until(
-                EC.presence_of_element_located((By.XPATH, '//div[@data-testid="qrcode"]'))
+            WebDriverWait(self.driver, 40, poll_frequency=POLL_INTERVAL).until(
+                lambda driver: self.selectors.find(driver, "chat_list") or self.selectors.find(driver, "qrcode"),
+                message="qrcode"
             )
+            if self.is_authenticated():
+                logger.info("Sessão restaurada do perfil do Chrome, sem QR code")
+                return True
             logger.info("QR code exibido. Por favor, escaneie com seu celular.")
             
             # Depois aguarda o elemento principal do chat ser carregado
             logger.info("Aguardando autenticação...")
-            WebDriverWait(self.driver, timeout).until(
-                EC.presence_of_element_located((By.XPATH, '//div[@data-testid="chat-list"]'))
+            WebDriverWait(self.driver, timeout, poll_frequency=POLL_INTERVAL).until(
+                lambda driver: self.selectors.find(driver, "chat_list")
             )
             
-            # Aguarda mais alguns segundos para garantir que tudo carregou
-            time.sleep(10)
+            # Aguarda o fim da sincronização inicial (barra de progresso some da tela)
+            try:
+                WebDriverWait(self.driver, self.sync_timeout, poll_frequency=POLL_INTERVAL).until(
+                    lambda driver: not self.selectors.find(driver, "sync_progress")
+                )
+            except TimeoutException:
+                logger.warning(f"Sincronização dos chats ainda em andamento após {self.sync_timeout}s")
             logger.info("WhatsApp Web autenticado com sucesso!")
             return True
             
@@ -85,43 +431,281 @@ class WhatsAppHelper:
             logger.error(f"Erro durante autenticação: {str(e)}")
             return False
 
-    def send_message(self, phone, message):
-        """
-        Envia mensagem para um número específico
-        Args:
-            phone (str): Número do telefone (com ou sem código do país)
-            message (str): Mensagem a ser enviada
-        Returns:
-            bool: True se enviado com sucesso, False caso contrário
-        """
+    def _missing_selectors(self, names):
+        return self.selectors.health_check(self.driver, names)
+
+    def _close_error_popup(self):
+        self.driver.execute_script(_DISMISS_POPUP_JS, self.selectors.css("error_popup_button"))
         try:
-            # Formata o número e a URL
-            phone = str(phone).replace("+", "").replace(" ", "").replace("-", "")
-            if not phone.startswith("55"):
-                phone = "55" + phone
-            
-            # Abre o chat e envia a mensagem
-            self.driver.get(f"https://web.whatsapp.com/send?phone={phone}&text={message}")
-            
-            # Aguarda e clica no botão de enviar
-            send_button = WebDriverWait(self.driver, 20).until(
-                EC.presence_of_element_located((By.XPATH, '//button[@data-testid="compose-btn-send"]'))
+            WebDriverWait(self.driver, self.chat_switch_timeout, poll_frequency=POLL_INTERVAL).until(
+                lambda driver: not driver.execute_script(_ERROR_STATE_JS, self.selectors.css("error_popup"))
             )
-            send_button.click()
-            
-            time.sleep(2)  # Aguarda o envio
-            logger.info(f"Mensagem enviada com sucesso para {phone}")
             return True
+        except TimeoutException:
+            return False
+
+    def _attachment_staged(self, attachment):
+        return self.driver.execute_script(_ATTACHMENT_STAGED_JS, attachment.digest)
+
+    def _store_attachment(self, attachment):
+        self.driver.execute_script(
+            _STAGE_ATTACHMENT_JS, attachment.digest, attachment.name, attachment.mime, attachment.base64
+        )
+
+    def _send(self, phone, message, attachment=None):
+        """Executa o envio para um número já normalizado (ver send_message_status)"""
+        stage = "navigate"
+        try:
+            # Abre o chat: dentro do app já carregado ou, em último caso, pela URL
+            # (com anexo, o texto vai na legenda da prévia, não no campo de texto)
+            text = "" if attachment else message
+            with metrics.timer("navigate"):
+                opened = self._open_chat_in_app(phone, text) if self.navigation == NAVIGATION_APP else None
+                if opened == STATUS_NOT_ON_WHATSAPP:
+                    return STATUS_NOT_ON_WHATSAPP
+                if not opened:
+                    self.driver.get(f"{self.base_url}/send?phone={phone}&text={quote(text)}")
+
+            if attachment is not None:
+                stage = "attachment"
+                return self._send_attachment(phone, message, attachment)
+            
+            # Aguarda o botão de enviar, parando assim que surgir um popup de erro
+            stage = "send_button"
+            with metrics.timer("wait_send_button"):
+                send_button = WebDriverWait(self.driver, self.send_timeout, poll_frequency=POLL_INTERVAL).until(
+                    lambda driver: driver.execute_script(_ERROR_STATE_JS, self.selectors.css("error_popup"))
+                    or next(iter(self.selectors.find(driver, "send_button")), None)
+                )
+            if send_button == STATUS_NOT_ON_WHATSAPP:
+                return STATUS_NOT_ON_WHATSAPP
+
+            # Clica e aguarda o balão da mensagem aparecer com o check de envio
+            stage = "confirm"
+            with metrics.timer("confirm"):
+                outgoing_before = len(self.selectors.find(self.driver, "outgoing_message"))
+                send_button.click()
+                status = self._wait_for_confirmation(outgoing_before)
+            self._log_confirmation(phone, status)
+            return status
             
         except TimeoutException:
+            metrics.inc("timeouts", cause=stage)
             logger.error(f"Tempo excedido ao tentar enviar mensagem para {phone}")
-            return False
+            if stage == "send_button":
+                self._verify_chat_selectors()
+            return STATUS_FAILED
         except Exception as e:
+            metrics.inc("errors", stage=stage)
             logger.error(f"Erro ao enviar mensagem para {phone}: {str(e)}")
+            return STATUS_FAILED
+
+    def _send_attachment(self, phone, caption, attachment):
+        """
+        Cola o anexo guardado na página no chat aberto e envia com a legenda
+        Args:
+            phone (str): Número já normalizado
+            caption (str): Legenda (mensagem renderizada do template)
+            attachment (Attachment): Arquivo a enviar
+        Returns:
+            str: STATUS_SENT, STATUS_PENDING, STATUS_FAILED ou STATUS_NOT_ON_WHATSAPP
+        """
+        wait = WebDriverWait(self.driver, self.send_timeout, poll_frequency=POLL_INTERVAL)
+        ready = wait.until(
+            lambda driver: driver.execute_script(_ERROR_STATE_JS, self.selectors.css("error_popup"))
+            or next(iter(self.selectors.find(driver, "composer")), None)
+        )
+        if ready == STATUS_NOT_ON_WHATSAPP:
+            return STATUS_NOT_ON_WHATSAPP
+
+        self.stage_attachment(attachment)
+        with metrics.timer("attach"):
+            if not self.driver.execute_script(_PASTE_ATTACHMENT_JS, attachment.digest, self.selectors.css("composer")):
+                raise RuntimeError(f"Anexo {attachment.name} não encontrado na página")
+            caption_box = wait.until(lambda driver: next(iter(self.selectors.find(driver, "attachment_caption")), None))
+            if caption and not self.driver.execute_script(_INSERT_TEXT_JS, caption_box, caption):
+                caption_box.send_keys(caption)
+            send_button = wait.until(lambda driver: next(iter(self.selectors.find(driver, "attachment_send")), None))
+
+        # O check só aparece quando o upload termina: mede o tempo de envio do arquivo
+        with metrics.timer("attachment_upload"):
+            outgoing_before = len(self.selectors.find(self.driver, "outgoing_message"))
+            send_button.click()
+            status = self._wait_for_confirmation(outgoing_before, self.upload_timeout)
+        if status == STATUS_SENT:
+            self._chat_selectors_ok = True
+            logger.info(f"Anexo {attachment.name} enviado com sucesso para {phone}")
+        else:
+            metrics.inc("timeouts", cause="attachment_upload")
+            logger.warning(f"Anexo para {phone} sem confirmação após {self.upload_timeout}s ({status})")
+        return status
+
+    def _open_chat_in_app(self, phone, message):
+        """
+        Abre o chat do destinatário sem recarregar o WhatsApp Web e digita a mensagem
+        Args:
+            phone (str): Número já normalizado
+            message (str): Mensagem a ser digitada no campo de texto
+        Returns:
+            str: CHAT_OPENED se a mensagem foi digitada, STATUS_NOT_ON_WHATSAPP se o WhatsApp
+                recusou o número, ou None para usar a URL
+        """
+        if not self.is_authenticated():
+            return None
+        try:
+            self.driver.execute_script(_OPEN_CHAT_JS, phone)
+            opened = WebDriverWait(self.driver, self.chat_switch_timeout, poll_frequency=POLL_INTERVAL).until(
+                lambda driver: driver.execute_script(_ERROR_STATE_JS, self.selectors.css("error_popup"))
+                or driver.execute_script(_CHAT_OPENED_JS, self.selectors.css("composer"))
+            )
+            self._chat_switch_fallbacks = 0
+            if opened == STATUS_NOT_ON_WHATSAPP:
+                return STATUS_NOT_ON_WHATSAPP
+            composer = self.selectors.find(self.driver, "composer")[0]
+            composer.click()
+            # Insere o texto de uma vez; digita linha a linha se o editor recusar
+            inserted = not message or self.driver.execute_script(_INSERT_TEXT_JS, composer, message)
+            if not inserted:
+                for position, line in enumerate(message.split("\n")):
+                    if position:
+                        composer.send_keys(Keys.SHIFT, Keys.ENTER)
+                    composer.send_keys(line)
+            return CHAT_OPENED
+        except Exception as e:
+            metrics.inc("fallbacks", stage="chat_switch")
+            logger.warning(f"Falha ao abrir o chat de {phone} no app, recarregando pela URL: {str(e)}")
+            self._chat_switch_failed()
+            return None
+
+    def _wait_for_confirmation(self, outgoing_before, timeout=None):
+        """
+        Acompanha o último balão de saída até o check de envio ou o fim do prazo
+        Args:
+            outgoing_before (int): Quantidade de balões de saída antes do clique
+            timeout (float): Prazo em segundos (padrão: confirm_timeout)
+        Returns:
+            str: STATUS_SENT, STATUS_PENDING ou STATUS_FAILED
+        """
+        status = None
+        deadline = time.monotonic() + (timeout or self.confirm_timeout)
+        while time.monotonic() < deadline:
+            status = self.driver.execute_script(
+                _OUTGOING_STATE_JS, outgoing_before,
+                self.selectors.css("outgoing_message"), self.selectors.css("message_check")
+            )
+            if status == STATUS_SENT:
+                break
+            time.sleep(POLL_INTERVAL)
+        return status or STATUS_FAILED
+
+    def is_alive(self):
+        """
+        Verifica se o navegador ainda responde
+        Returns:
+            bool: True se o driver está ativo
+        """
+        if not self.driver:
             return False
+        try:
+            self.driver.current_url
+            return True
+        except Exception:
+            return False
+
+    def is_authenticated(self):
+        """
+        Verifica, sem recarregar a página, se a lista de chats já está visível
+        Returns:
+            bool: True se o WhatsApp Web está autenticado
+        """
+        try:
+            if not self.driver.current_url.startswith(self.base_url):
+                return False
+            return bool(self.selectors.find(self.driver, "chat_list"))
+        except Exception:
+            return False
+
+    def reload_page(self):
+        """Recarrega o WhatsApp Web na mesma aba, liberando a memória acumulada pela página"""
+        self.driver.get(self.base_url)
+
+    def restart(self):
+        """Fecha o navegador e abre outro com as mesmas opções (o perfil em disco mantém o login)"""
+        if self.driver:
+            try:
+                self.driver.quit()
+            except Exception as e:
+                logger.warning(f"Erro ao encerrar o navegador anterior: {str(e)}")
+            self.driver = None
+        with metrics.timer("setup_driver"):
+            self._setup_driver()
+
+    def browser_pid(self):
+        """
+        Processo raiz do navegador (o chromedriver, pai do Chrome)
+        Returns:
+            int: PID, ou None se não houver processo local (ex.: driver simulado)
+        """
+        process = getattr(getattr(self.driver, "service", None), "process", None)
+        return getattr(process, "pid", None)
 
     def close(self):
         """Fecha o navegador"""
         if self.driver:
             self.driver.quit()
+            self.driver = None
             logger.info("Navegador fechado")
+
+
+def create_helper(backend=BACKEND_SELENIUM, **options):
+    """
+    Cria o helper do backend escolhido; todos expõem a mesma API do WhatsAppHelper
+    Args:
+        backend (str): BACKEND_SELENIUM ou BACKEND_CDP
+        **options: Argumentos do construtor do helper
+    Returns:
+        WhatsAppHelper ou CDPWhatsAppHelper
+    """
+    if backend == BACKEND_CDP:
+        from cdp_helper import CDPWhatsAppHelper
+        return CDPWhatsAppHelper(**options)
+    if backend != BACKEND_SELENIUM:
+        raise ValueError(f"Backend desconhecido: {backend}")
+    return WhatsAppHelper(**options)
+
+
+def get_shared_helper(headless=False, user_data_dir=DEFAULT_PROFILE_DIR, backend=BACKEND_SELENIUM, **options):
+    """
+    Retorna um WhatsAppHelper de longa duração, reaproveitado entre execuções
+    Args:
+        headless (bool): Se True, executa o Chrome em modo headless
+        user_data_dir (str): Diretório do perfil persistente do Chrome
+        backend (str): BACKEND_SELENIUM ou BACKEND_CDP
+        **options: Demais argumentos do helper, usados ao criar a instância
+    Returns:
+        WhatsAppHelper: Instância ativa para o perfil informado
+    """
+    key = (os.path.abspath(user_data_dir) if user_data_dir else None, headless, backend)
+    with _shared_lock:
+        helper = _shared_helpers.get(key)
+        if helper is None or not helper.is_alive():
+            if helper is not None:
+                logger.info("Navegador compartilhado não responde, reiniciando...")
+                try:
+                    helper.close()
+                except Exception:
+                    pass
+            helper = create_helper(backend, headless=headless, user_data_dir=user_data_dir, **options)
+            _shared_helpers[key] = helper
+        return helper
+
+
+def close_shared_helpers():
+    """Fecha todos os navegadores compartilhados"""
+    with _shared_lock:
+        for helper in _shared_helpers.values():
+            try:
+                helper.close()
+            except Exception as e:
+                logger.error(f"Erro ao fechar navegador: {str(e)}")
+        _shared_helpers.clear()
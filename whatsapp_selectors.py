@@ -0,0 +1,192 @@
+import json
+import logging
+import os
+import threading
+import time
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+# Arquivo de seletores versionado junto com o código (pode ser trocado sem reiniciar)
+DEFAULT_SELECTORS_PATH = os.getenv(
+    "GALATEIA_SELECTORS", os.path.join(os.path.dirname(os.path.abspath(__file__)), "whatsapp_selectors.json")
+)
+
+# Valores de selenium.webdriver.common.by.By, repetidos para não depender do Selenium
+BY_CSS = "css selector"
+BY_XPATH = "xpath"
+
+# Seletores obrigatórios com o WhatsApp Web carregado e com um chat aberto
+PAGE_SELECTORS = ("chat_list",)
+CHAT_SELECTORS = ("composer", "send_button")
+
+# Intervalo mínimo entre verificações de alteração do arquivo (segundos)
+RELOAD_INTERVAL = 5
+
+
+class SelectorHealthError(RuntimeError):
+    """A interface do WhatsApp Web não corresponde mais aos seletores configurados"""
+
+
+def parse_locator(locator: str) -> Tuple[str, str]:
+    """
+    Converte um seletor do arquivo de configuração em (estratégia, valor)
+    Args:
+        locator (str): Seletor CSS, ou XPath quando começa com '/' ou '('
+    Returns:
+        Tuple[str, str]: (BY_CSS ou BY_XPATH, seletor)
+    """
+    return (BY_XPATH, locator) if locator.startswith(("/", "(")) else (BY_CSS, locator)
+
+
+class SelectorRegistry:
+    def __init__(self, path: str = DEFAULT_SELECTORS_PATH):
+        """
+        Seletores do WhatsApp Web carregados de um arquivo JSON versionado, com
+        alternativas em ordem de preferência (CSS primeiro) e estatísticas de uso
+        Args:
+            path (str): Arquivo JSON com 'version' e 'selectors' (nome -> lista de seletores)
+        """
+        self.path = path
+        self.version = None
+        self._locators: Dict[str, List[Tuple[str, str]]] = {}
+        self._preferred: Dict[str, int] = {}
+        self._stats: Dict[str, Dict] = {}
+        self._lock = threading.Lock()
+        self._mtime = None
+        self._checked_at = 0.0
+        self.load()
+
+    def load(self):
+        """Carrega (ou recarrega) o arquivo de seletores"""
+        with open(self.path, encoding='utf-8') as f:
+            config = json.load(f)
+        selectors = config.get("selectors") or {}
+        if not selectors or any(not locators for locators in selectors.values()):
+            raise ValueError(f"Arquivo de seletores sem definições válidas: {self.path}")
+        with self._lock:
+            self.version = config.get("version", "?")
+            self._locators = {name: [parse_locator(locator) for locator in locators]
+                              for name, locators in selectors.items()}
+            self._preferred = {}
+            self._mtime = os.path.getmtime(self.path)
+        logger.info(f"Seletores do WhatsApp Web carregados (versão {self.version})")
+
+    def refresh(self) -> bool:
+        """
+        Recarrega o arquivo se ele mudou desde a última leitura (no máximo a cada RELOAD_INTERVAL)
+        Returns:
+            bool: True se uma nova versão foi carregada
+        """
+        now = time.monotonic()
+        if now - self._checked_at < RELOAD_INTERVAL:
+            return False
+        self._checked_at = now
+        try:
+            if os.path.getmtime(self.path) == self._mtime:
+                return False
+            previous = self.version
+            self.load()
+        except (OSError, ValueError) as e:
+            logger.error(f"Arquivo de seletores inválido, mantendo a versão {self.version}: {str(e)}")
+            return False
+        logger.info(f"Seletores atualizados: versão {previous} -> {self.version}")
+        return True
+
+    def locators(self, name: str) -> List[Tuple[str, str]]:
+        """Alternativas de um seletor, em ordem de preferência"""
+        try:
+            return self._locators[name]
+        except KeyError:
+            raise ValueError(f"Seletor não configurado: {name}") from None
+
+    def css(self, name: str) -> str:
+        """
+        Alternativas CSS de um seletor como uma lista CSS única, para uso em JavaScript
+        Args:
+            name (str): Nome do seletor
+        Returns:
+            str: Seletores CSS separados por vírgula
+        """
+        css = [value for by, value in self.locators(name) if by == BY_CSS]
+        if not css:
+            raise ValueError(f"Seletor sem alternativa CSS: {name}")
+        return ", ".join(css)
+
+    def find(self, driver, name: str) -> list:
+        """
+        Procura os elementos de um seletor, começando pela última alternativa que funcionou
+        Args:
+            driver: WebDriver (ou objeto com find_elements(by, value))
+            name (str): Nome do seletor
+        Returns:
+            list: Elementos encontrados pela primeira alternativa com resultado (vazia se nenhuma)
+        """
+        locators = self.locators(name)
+        preferred = self._preferred.get(name, 0)
+        order = [preferred] + [position for position in range(len(locators)) if position != preferred]
+        start = time.perf_counter()
+        elements, hit = [], None
+        for position in order:
+            elements = driver.find_elements(*locators[position])
+            if elements:
+                hit = position
+                break
+        self._record(name, locators, hit, time.perf_counter() - start)
+        return elements
+
+    def _record(self, name: str, locators: Sequence[Tuple[str, str]], hit: Optional[int], seconds: float):
+        with self._lock:
+            stats = self._stats.setdefault(name, {"lookups": 0, "misses": 0, "seconds": 0.0, "hits": {}})
+            stats["lookups"] += 1
+            stats["seconds"] += seconds
+            if hit is None:
+                stats["misses"] += 1
+                return
+            value = locators[hit][1]
+            stats["hits"][value] = stats["hits"].get(value, 0) + 1
+            if hit != self._preferred.get(name, 0):
+                self._preferred[name] = hit
+                if hit:
+                    metrics.inc("selector_fallbacks", selector=name)
+                    logger.warning(f"Seletor '{name}' encontrado pela alternativa {hit + 1}: {value}")
+
+    def health_check(self, driver, names: Sequence[str]) -> List[str]:
+        """
+        Verifica se cada seletor encontra algum elemento na página atual
+        Args:
+            driver: WebDriver com a página carregada
+            names (Sequence[str]): Seletores que devem estar presentes
+        Returns:
+            List[str]: Seletores sem nenhum elemento (vazia se a interface está como esperado)
+        """
+        return [name for name in names if not self.find(driver, name)]
+
+    def stats(self) -> Dict[str, Dict]:
+        """
+        Estatísticas de uso por seletor
+        Returns:
+            Dict: lookups, misses, tempo total e acertos por alternativa de cada seletor
+        """
+        with self._lock:
+            return {
+                name: {**stats, "hits": dict(stats["hits"]),
+                       "mean_ms": stats["seconds"] / stats["lookups"] * 1000 if stats["lookups"] else None}
+                for name, stats in self._stats.items()
+            }
+
+
+_registries = {}
+_registries_lock = threading.Lock()
+
+
+def get_selector_registry(path: str = DEFAULT_SELECTORS_PATH) -> SelectorRegistry:
+    """Retorna o registro de seletores compartilhado para o arquivo informado"""
+    key = os.path.abspath(path)
+    with _registries_lock:
+        registry = _registries.get(key)
+        if registry is None:
+            registry = _registries[key] = SelectorRegistry(path)
+        return registry